@@ -73,6 +73,8 @@ app_forge.gen_health_routes(model_forge)  # * add health and cache routes
 app_forge.gen_table_routes(model_forge)  # * add db.table routes (ORM CRUD)
 app_forge.gen_view_routes(model_forge)  # * add db.view routes
 app_forge.gen_fn_routes(model_forge)  # * add db.[fn, proc, trigger] routes
+app_forge.gen_batch_routes(model_forge)  # * add the transactional /batch route
+app_forge.gen_fanout_routes(model_forge)  # * add the concurrent /fanout route
 
 app_forge.print_welcome(
     db_manager=db_manager
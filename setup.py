@@ -27,6 +27,11 @@ setup(
             "isort>=5.9.3,<6.0.0",  # import sorting
             "mypy>=0.910,<1.0",  # static type checking
         ],
+        "async": [  # Async drivers (DriverType.ASYNC)
+            "asyncpg>=0.30.0",  # pgsql (async)
+            "aiosqlite>=0.21.0",  # sqlite (async)
+            "greenlet>=3.1.1",  # sqlalchemy asyncio support
+        ],
     },
     # Metadata to display on PyPI
     long_description=open("README.md").read(),
@@ -11,4 +11,10 @@ Please migrate to prism-py for future development.
 # * PREDLUEDE * #
 from forge.forge import *
 from forge.tools.model import ModelForge
-from forge.tools.db import DBForge, DBConfig, PoolConfig
+from forge.tools.db import DBForge, DBConfig, PoolConfig, ReplicaConfig, ReplicaStrategy
+from forge.tools.db import TenancyConfig
+from forge.tools.coalesce import CoalesceConfig
+from forge.tools.entity_cache import EntityCacheConfig, PGNotifyChannel, SocketChannel
+from forge.tools.resident import ResidentConfig
+from forge.tools.matview import MatViewConfig
+from forge.tools.jobs import JobConfig
@@ -1,20 +1,33 @@
+import asyncio
+import contextlib
+import functools
+from concurrent.futures import Executor
 from datetime import datetime
-from typing import Optional
+from typing import Any, Callable, Optional
 from fastapi import FastAPI
 
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Dict
 from fastapi import APIRouter
 
-from forge.core.logging import bold, gray, cyan, underline, italic, green
+from forge.core.logging import bold, gray, cyan, underline, italic, green, yellow
 from forge.gen.health import *
 from forge.gen.metadata import *
 from forge.tools.db import DBForge
 from forge.tools.model import ModelForge
+from forge.tools.coalesce import WriteCoalescer
+from forge.tools.resident import ResidentTable
+from forge.tools.tenant import TenantRouting
+from forge.tools.timeout import CancelOnDisconnect
 from forge.gen.view import gen_view_route
 from forge.gen.table import gen_table_crud
-from forge.gen.fn import gen_fn_route
+from forge.gen.fn import FunctionVolatility, gen_fn_route
+from forge.gen.batch import gen_batch_route
+from forge.gen.fanout import gen_fanout_route
+from forge.gen.jobs import gen_job_routes
+from forge.tools.db import PoolConfig
+from forge.tools.jobs import JobConfig, JobQueue
 
 
 class ForgeInfo(BaseModel):
@@ -42,6 +55,34 @@ class Forge(BaseModel):
         default=None, description="FastAPI application instance"
     )
     routers: Dict[str, APIRouter] = Field(default_factory=dict)
+    # ^ Handlers of the generated routes (reused by the batch & fan-out routes)
+    table_handlers: Dict[str, Any] = Field(default_factory=dict)  # { name: CRUD }
+    view_handlers: Dict[str, Callable] = Field(default_factory=dict)  # { name: runner }
+    fn_handlers: Dict[str, Callable] = Field(default_factory=dict)  # { name: runner }
+    db_executor: Optional[Executor] = Field(
+        default=None,
+        description="Bounded thread pool for blocking DB work in async view/fn routes "
+        "(defaults to one sized to the connection pool)",
+    )
+    statement_timeouts: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-route statement timeouts in seconds, by path prefix "
+        "(e.g. {'/public/report_view': 30}); others use DBConfig.statement_timeout",
+    )
+    jobs: Optional[JobConfig] = Field(
+        default=None,
+        description="Background job queue for the procedures (adds /proc/{name}/jobs "
+        "and /jobs routes); None: procedures only run inline",
+    )
+    job_queue: Optional[JobQueue] = Field(default=None)
+    cancel_on_disconnect: bool = Field(
+        default=True,
+        description="Cancel running queries when the client disconnects "
+        "(also required for the per-route statement timeouts)",
+    )
+
+    _tenancy_enabled: bool = PrivateAttr(default=False)
+    _pool_maintenance_enabled: bool = PrivateAttr(default=False)
 
     class Config:
         arbitrary_types_allowed = True
@@ -73,6 +114,52 @@ class Forge(BaseModel):
             allow_headers=["*"],
         )
 
+        # * Per-route statement timeouts & query cancellation on client disconnect
+        if self.cancel_on_disconnect:
+            self.app.add_middleware(
+                CancelOnDisconnect, timeouts=self.statement_timeouts
+            )
+
+    def _enable_tenancy(self, model_forge: ModelForge) -> None:
+        """Resolve the tenant of each request (once, if tenancy is configured)."""
+        db_manager = model_forge.db_manager
+        tenancy = db_manager.config.tenancy
+        if tenancy is None or self._tenancy_enabled:
+            return
+        self.app.add_middleware(
+            TenantRouting, config=tenancy, is_tenant=db_manager.is_tenant
+        )
+        self._tenancy_enabled = True
+
+    def _enable_pool_maintenance(self, model_forge: ModelForge) -> None:
+        """Warm up & validate the async pools from the app's lifespan (once)."""
+        db_manager = model_forge.db_manager
+        if (
+            not db_manager.is_async
+            or not db_manager.maintains_pools
+            or self._pool_maintenance_enabled
+        ):
+            return  # * Sync pools are maintained by DBForge itself
+        app_lifespan = self.app.router.lifespan_context
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            task = asyncio.create_task(db_manager.maintain_pools_async())
+            try:
+                async with app_lifespan(app) as state:
+                    yield state
+            finally:
+                task.cancel()
+
+        self.app.router.lifespan_context = lifespan
+        self._pool_maintenance_enabled = True
+
+    def _get_db_executor(self, model_forge: ModelForge) -> Executor:
+        """Get (or create) the bounded executor for blocking DB work."""
+        if self.db_executor is None:
+            self.db_executor = model_forge.db_manager.create_executor()
+        return self.db_executor
+
     def print_welcome(self, db_manager: DBForge) -> None:
         """Print welcome message with app information."""
         print(
@@ -82,6 +169,8 @@ class Forge(BaseModel):
     # * Route Generators... (table, view, function)
     def gen_table_routes(self, model_forge: ModelForge) -> None:
         """Generate CRUD routes for all tables."""
+        self._enable_tenancy(model_forge)
+        self._enable_pool_maintenance(model_forge)
         for schema in model_forge.include_schemas:
             self.routers[schema] = APIRouter(prefix=f"/{schema}", tags=[schema.upper()])
 
@@ -90,17 +179,47 @@ class Forge(BaseModel):
         for table_key, table_data in model_forge.table_cache.items():
             schema, table_name = table_key.split(".")
             print(f"\t{gray('gen crud for:')} {schema}.{bold(cyan(table_name))}")
-            gen_table_crud(
+            coalesce_config = model_forge.write_coalesce.get(table_key)
+            resident_config = model_forge.resident.get(table_key)
+            self.table_handlers[table_key] = gen_table_crud(
                 table_data=table_data,
                 router=self.routers[schema],
-                db_dependency=model_forge.db_manager.get_db,
+                db_dependency=model_forge.db_manager.db_dependency,
+                read_dependency=model_forge.db_manager.read_dependency,
+                fk_graph=model_forge.db_manager.fk_graph,
+                related_handlers=self.table_handlers,
+                entity_cache=model_forge.entity_caches.get(table_key),
+                resident=(
+                    ResidentTable(
+                        table=table_data[0],
+                        session_factory=model_forge.db_manager.ReadSessionLocal,
+                        config=resident_config,
+                    )
+                    if resident_config
+                    else None
+                ),
+                coalescer=(
+                    WriteCoalescer(
+                        table=table_data[0],
+                        session_factory=functools.partial(
+                            model_forge.db_manager.new_session,
+                            model_forge.db_manager.SessionLocal,
+                        ),
+                        config=coalesce_config,
+                    )
+                    if coalesce_config
+                    else None
+                ),
             )
 
         for schema in model_forge.include_schemas:
             self.app.include_router(self.routers[schema])
 
     def gen_view_routes(self, model_forge: ModelForge) -> None:
-        """Generate routes for all views."""
+        """Generate routes for all views (and start the matview refresh schedules)."""
+        self._enable_tenancy(model_forge)
+        self._enable_pool_maintenance(model_forge)
+        db_manager = model_forge.db_manager
 
         for schema in model_forge.include_schemas:
             self.routers[f"{schema}_views"] = APIRouter(
@@ -112,17 +231,34 @@ class Forge(BaseModel):
         for view_key, view_data in model_forge.view_cache.items():
             schema, view_name = view_key.split(".")
             print(f"\t{gray('gen view for:')} {schema}.{bold(cyan(view_name))}")
-            gen_view_route(
+            self.view_handlers[view_key] = gen_view_route(
                 table_data=view_data,
                 router=self.routers[f"{schema}_views"],
-                db_dependency=model_forge.db_manager.get_db,
+                db_dependency=db_manager.read_dependency,
+                executor=self._get_db_executor(model_forge),
+                matview=model_forge.matviews.get(view_key),
+                refresh_dependency=db_manager.db_dependency,
             )
 
         for schema in model_forge.include_schemas:
             self.app.include_router(self.routers[f"{schema}_views"])
 
+        for view_key, config in model_forge.matview_refresh.items():
+            matview = model_forge.matviews.get(view_key)
+            if matview is None:
+                print(f"{yellow('Matview refresh:')} unknown view {view_key}")
+            elif matview.config is None:  # * Not started yet
+                matview.start(
+                    session_factory=functools.partial(
+                        db_manager.new_session, db_manager.SessionLocal
+                    ),
+                    config=config,
+                )
+
     def gen_fn_routes(self, model_forge: ModelForge) -> None:
         """Generate routes for all functions."""
+        self._enable_tenancy(model_forge)
+        self._enable_pool_maintenance(model_forge)
 
         for schema in model_forge.include_schemas:
             self.routers[f"{schema}_fn"] = APIRouter(
@@ -134,26 +270,150 @@ class Forge(BaseModel):
         for fn_key, fn_metadata in model_forge.fn_cache.items():
             schema, fn_name = fn_key.split(".")
             print(f"\t{gray('gen fn for:')} {schema}.{bold(cyan(fn_name))}")
-            gen_fn_route(
+            runner = gen_fn_route(
                 fn_metadata=fn_metadata,
                 router=self.routers[f"{schema}_fn"],
-                db_dependency=model_forge.db_manager.get_db,
+                # * Only functions that can't write may be served by a replica
+                # * (and on an autocommit session)
+                db_dependency=(
+                    model_forge.db_manager.db_dependency
+                    if fn_metadata.volatility == FunctionVolatility.VOLATILE
+                    else model_forge.db_manager.read_dependency
+                ),
+                executor=self._get_db_executor(model_forge),
+                open_session=functools.partial(
+                    model_forge.db_manager.open_session,
+                    read=fn_metadata.volatility != FunctionVolatility.VOLATILE,
+                ),
             )
+            if runner:
+                self.fn_handlers[fn_key] = runner
 
         # add the routers to the app
         for schema in model_forge.include_schemas:
             self.app.include_router(self.routers[f"{schema}_fn"])
 
+    def gen_proc_routes(self, model_forge: ModelForge) -> None:
+        """Generate routes for all procedures (and their jobs, if `jobs` is set)."""
+        self._enable_tenancy(model_forge)
+        self._enable_pool_maintenance(model_forge)
+        db_manager = model_forge.db_manager
+
+        if self.jobs and self.job_queue is None:
+            # * Own pool (one connection per worker), in AUTOCOMMIT so procedures
+            # * can COMMIT as they go
+            self.job_queue = JobQueue(
+                session_factory=functools.partial(
+                    db_manager.new_session,
+                    db_manager.background_sessionmaker(
+                        "jobs",
+                        PoolConfig(pool_size=self.jobs.workers, max_overflow=0),
+                        autocommit=True,
+                    ),
+                ),
+                config=self.jobs,
+            )
+
+        for schema in model_forge.include_schemas:
+            self.routers[f"{schema}_proc"] = APIRouter(
+                prefix=f"/{schema}", tags=[f"{schema.upper()} Procedures"]
+            )
+
+        print(f"\n{bold('[Generating Procedure Routes]')}")
+
+        for proc_key, proc_metadata in model_forge.proc_cache.items():
+            schema, proc_name = proc_key.split(".")
+            print(f"\t{gray('gen proc for:')} {schema}.{bold(cyan(proc_name))}")
+            runner = gen_fn_route(
+                fn_metadata=proc_metadata,
+                router=self.routers[f"{schema}_proc"],
+                db_dependency=db_manager.db_dependency,
+                executor=self._get_db_executor(model_forge),
+                job_queue=self.job_queue,
+            )
+            if runner:
+                self.fn_handlers[proc_key] = runner
+
+        for schema in model_forge.include_schemas:
+            self.app.include_router(self.routers[f"{schema}_proc"])
+
+        if self.job_queue is not None:
+            self.routers["jobs"] = APIRouter(tags=["Jobs"])
+            gen_job_routes(self.routers["jobs"], self.job_queue)
+            self.app.include_router(self.routers["jobs"])
+
+    def gen_batch_routes(
+        self, model_forge: ModelForge, max_operations: int = 1000
+    ) -> None:
+        """
+        Generate the transactional batch route.
+
+        Must be called after the table and function routes have been generated.
+        At most `max_operations` operations per batch.
+        """
+        self.routers["batch"] = APIRouter(tags=["Batch"])
+
+        print(f"\n{bold('[Generating Batch Routes]')}")
+        print(f"\t{gray('gen batch:')} {bold(cyan('execute_batch'))}")
+
+        gen_batch_route(
+            router=self.routers["batch"],
+            table_handlers=self.table_handlers,
+            fn_handlers=self.fn_handlers,
+            db_dependency=model_forge.db_manager.db_dependency,
+            max_operations=max_operations,
+        )
+
+        self.app.include_router(self.routers["batch"])
+
+    def gen_fanout_routes(
+        self,
+        model_forge: ModelForge,
+        max_calls: int = 100,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        Generate the concurrent view/function fan-out route.
+
+        Must be called after the view and function routes have been generated.
+        At most `max_calls` calls per request, `max_concurrency` running at once
+        (default: half the connection pool).
+        """
+        self.routers["fanout"] = APIRouter(tags=["Batch"])
+
+        print(f"\n{bold('[Generating Fan-out Routes]')}")
+        print(f"\t{gray('gen fanout:')} {bold(cyan('execute_fanout'))}")
+
+        gen_fanout_route(
+            router=self.routers["fanout"],
+            view_handlers=self.view_handlers,
+            fn_handlers=self.fn_handlers,
+            db_manager=model_forge.db_manager,
+            read_only_fns={
+                fn_key
+                for fn_key, fn_metadata in model_forge.fn_cache.items()
+                if fn_metadata.volatility != FunctionVolatility.VOLATILE
+            },
+            executor=self._get_db_executor(model_forge),
+            max_calls=max_calls,
+            max_concurrency=max_concurrency,
+        )
+
+        self.app.include_router(self.routers["fanout"])
+
     # * Metadata Routes
     def gen_metadata_routes(self, model_forge: ModelForge) -> None:
         """Include metadata routes for the app."""
         self.routers["metadata"] = APIRouter(prefix="/dt", tags=["Metadata"])
+        # * Serialized once (and again on every ModelForge.reload)
+        metadata = PrebuiltMetadata(model_forge)
 
         print(f"\n{bold('[Generating Metadata Routes]')}")
 
         for fn in [
             get_schemas,
             get_tables,
+            get_table,
             get_views,
             get_enums,
             get_functions,
@@ -161,29 +421,56 @@ class Forge(BaseModel):
             get_triggers,
         ]:
             print(f"\t{gray('gen metadata:')} {bold(cyan(fn.__name__))}")
-            fn(self.routers["metadata"], model_forge)
+            fn(self.routers["metadata"], metadata)
 
         # * Add the router to the app
         self.app.include_router(self.routers["metadata"])
 
     # * Health Routes
     def gen_health_routes(
-        self, model_forge: ModelForge, start_time: datetime = datetime.now()
+        self,
+        model_forge: ModelForge,
+        start_time: datetime = datetime.now(),
+        probe_interval: float = 10.0,
+        probe_timeout: float = 5.0,
     ) -> None:
-        """Include health routes for the app."""
+        """
+        Include health routes for the app.
+
+        The database status is refreshed every `probe_interval` seconds by a
+        background prober, so health requests never touch the connection pool.
+        """
         h_str = "health"
         self.routers[h_str] = APIRouter(prefix=f"/{h_str}", tags=["Health"])
+        probe = HealthProbe(
+            db_manager=model_forge.db_manager,
+            interval=probe_interval,
+            timeout=probe_timeout,
+        )
 
         print(f"\n{bold('[Generating Health Routes]')}")
         [
             print(f"\t{gray(f'gen {h_str}:')} {bold(cyan(fn.__name__))}")
-            for fn in [health_root, cache, clear_cache, ping]
+            for fn in [
+                health_root,
+                liveness,
+                readiness,
+                cache,
+                clear_cache,
+                pool,
+                matviews,
+                ping,
+            ]
         ]
 
         # Add health routes with start time
-        health_root(self.routers[h_str], model_forge, start_time)
+        health_root(self.routers[h_str], model_forge, start_time, probe)
+        liveness(self.routers[h_str])
+        readiness(self.routers[h_str], probe)
         clear_cache(self.routers[h_str], model_forge, start_time)
         cache(self.routers[h_str], model_forge, start_time)
+        pool(self.routers[h_str], model_forge.db_manager)
+        matviews(self.routers[h_str], model_forge)
         ping(self.routers[h_str])
 
         # * Add the router to the app
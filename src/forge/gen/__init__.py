@@ -1,14 +1,28 @@
+import asyncio
+import inspect
 import json
-from typing import Callable, List, Dict, Any, Optional, Type, Union
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple, Type, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import Table
+from sqlalchemy import Table, UniqueConstraint, any_, bindparam, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from uuid import UUID
-from pydantic import BaseModel, create_model, Field
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model, Field
 from enum import Enum
 from sqlalchemy import Enum as SQLAlchemyEnum
 from enum import Enum as PyEnum
 
+from forge.tools.coalesce import WriteCoalescer
+from forge.tools.db import is_async_dependency, session_handler
+from forge.tools.entity_cache import EntityCache, request_key, schedule_invalidation
+from forge.tools.query import QueryBuilder, fields_model, options_model
+from forge.tools.relations import IN_CHUNK_SIZE, FKGraph, Relation, load_related
+from forge.tools.resident import ResidentTable
+from forge.tools.tenant import current_tenant
+from forge.tools.timeout import StatementTimeout
 from forge.tools.sql_mapping import *
 
 
@@ -23,6 +37,12 @@ class CRUD:
         router: APIRouter,
         db_dependency: Callable,
         prefix: str = "",
+        coalescer: Optional[WriteCoalescer] = None,
+        read_dependency: Optional[Callable] = None,
+        fk_graph: Optional[FKGraph] = None,
+        related_handlers: Optional[Dict[str, "CRUD"]] = None,
+        entity_cache: Optional[EntityCache] = None,
+        resident: Optional[ResidentTable] = None,
     ):
         """Initialize CRUD handler with common parameters."""
         self.table = table
@@ -30,10 +50,39 @@ class CRUD:
         self.sqlalchemy_model = sqlalchemy_model
         self.router = router
         self.db_dependency = db_dependency
+        # Session dependency for the read route (e.g. a read replica)
+        self.read_dependency = read_dependency or db_dependency
         self.prefix = prefix
+        # Optional micro-batching of single-row inserts (see WriteCoalescer)
+        self.coalescer = coalescer
+        # Relations available to `?expand=` (and the handlers of related tables)
+        self.relations = fk_graph.relations(table.key) if fk_graph else {}
+        self.related_handlers = related_handlers if related_handlers is not None else {}
+        # Optional cache of records by primary key (see EntityCache)
+        self.entity_cache = entity_cache
+        # Optional in-memory copy of the table serving the read route
+        self.resident = resident
 
         # Create query params model once for reuse
         self.query_params = self._create_query_params()
+        # Statements of the read route (filters, ordering, paging & projection)
+        self.query_builder = QueryBuilder(table)
+        self.query_options = options_model(table, pydantic_model.__name__)
+        # Candidate ON CONFLICT targets (PK first, then unique constraints/indexes)
+        self.conflict_targets = self._get_conflict_targets()
+        # Primary key columns & their Python types (for the PK-addressed routes)
+        self.pk_columns = list(table.primary_key.columns)
+        self.pk_types = {
+            c.name: get_eq_type(str(c.type), nullable=False) for c in self.pk_columns
+        }
+        # Key columns' Python types, to compare request & database key values
+        self.key_adapters = self._get_key_adapters()
+        if self.resident:
+            self.resident.start(self._to_model)
+        if self.coalescer:  # * Coalesced inserts invalidate the cached copies too
+            self.coalescer.on_insert = lambda db, rows: self._invalidate(
+                db, [self._pk_of(row) for row in rows]
+            )
 
     def _create_query_params(self) -> Type[BaseModel]:
         """Create a Pydantic model for query parameters."""
@@ -68,18 +117,141 @@ class CRUD:
         """Generate route path with optional prefix."""
         base_path = f"/{self.table.name.lower()}"
         if operation:
-            base_path = f"AAA{base_path}/{operation}"
+            base_path = f"{base_path}/{operation}"
         return f"{self.prefix}{base_path}"
 
+    def _get_conflict_targets(self) -> List[Tuple[str, ...]]:
+        """Collect the column sets that can be used as an ON CONFLICT target."""
+        targets: List[Tuple[str, ...]] = []
+        if self.table.primary_key.columns:
+            targets.append(tuple(c.name for c in self.table.primary_key.columns))
+        for constraint in self.table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.columns:
+                targets.append(tuple(c.name for c in constraint.columns))
+        for index in self.table.indexes:
+            if index.unique and index.columns:
+                targets.append(tuple(c.name for c in index.columns))
+        # * Remove duplicates (a unique constraint is usually reflected as an index too)
+        return list(dict.fromkeys(targets))
+
+    def _get_key_adapters(self) -> Dict[str, Optional[TypeAdapter]]:
+        """Validators of the PK & unique columns (None: no usable Python type)."""
+        adapters: Dict[str, Optional[TypeAdapter]] = {}
+        for name in dict.fromkeys(c for t in self.conflict_targets for c in t):
+            py_type = get_eq_type(str(self.table.c[name].type), nullable=False)
+            try:
+                adapters[name] = None if py_type is Any else TypeAdapter(py_type)
+            except Exception:  # * e.g. JSONB & array columns
+                adapters[name] = None
+        return adapters
+
+    def _key(self, columns: Iterable[str], values: Iterable[Any]) -> Tuple[Any, ...]:
+        """
+        Comparable form of a key: each value as its column's Python type.
+
+        The same key can come as different types from a request and from the
+        driver (e.g. '1' and 1, a str and a UUID). Values without a usable type
+        (or that don't validate) are compared as strings.
+        """
+        key = []
+        for column, value in zip(columns, values):
+            if isinstance(value, PyEnum):
+                value = value.value
+            adapter = self.key_adapters.get(column)
+            if value is not None:
+                try:
+                    value = adapter.validate_python(value) if adapter else str(value)
+                except ValidationError:
+                    value = str(value)
+            key.append(value)
+        return tuple(key)
+
+    def _to_model(self, resource: Any) -> BaseModel:
+        """Convert an ORM instance or result row into the table's Pydantic model."""
+        return self.pydantic_model.model_validate(self._to_record(resource))
+
+    def _to_record(
+        self, resource: Any, fields: Optional[Tuple[str, ...]] = None
+    ) -> Dict[str, Any]:
+        """Column values of a row (only `fields`, if given), JSONB & arrays parsed."""
+        record_dict = {}
+        for column in self.table.columns:
+            if fields and column.name not in fields:
+                continue
+            value = getattr(resource, column.name)
+            field_type = get_eq_type(str(column.type))
+
+            if isinstance(field_type, JSONBType):
+                if value is not None:
+                    # Parse JSONB data if it's a string
+                    if isinstance(value, str):
+                        try:
+                            record_dict[column.name] = json.loads(value)
+                        except json.JSONDecodeError:
+                            record_dict[column.name] = value
+                    else:
+                        record_dict[column.name] = value
+                else:
+                    record_dict[column.name] = None
+            elif isinstance(field_type, ArrayType):
+                if value is not None:
+                    if isinstance(value, str):
+                        # Handle PostgreSQL array string format
+                        cleaned_value = value.strip("{}").split(",")
+                        record_dict[column.name] = [
+                            field_type.item_type(item.strip('"'))
+                            for item in cleaned_value
+                            if item.strip()
+                        ]
+                    elif isinstance(value, list):
+                        record_dict[column.name] = [
+                            field_type.item_type(item)
+                            for item in value
+                            if item is not None
+                        ]
+                    else:
+                        record_dict[column.name] = value
+                else:
+                    record_dict[column.name] = []
+            else:
+                record_dict[column.name] = value
+        return record_dict
+
     def create(self) -> None:
         """Add CREATE route."""
-
-        @self.router.post(
+        route = self.router.post(
             self._get_route_path(),
             response_model=self.pydantic_model,
             summary=f"Create {self.table.name}",
             description=f"Create a new {self.table.name} record",
         )
+
+        if self.coalescer and is_async_dependency(self.db_dependency):
+            # * Await the coalesced batch instead of blocking the event loop
+            @route
+            async def create_coalesced(
+                resource: self.pydantic_model,
+            ) -> self.pydantic_model:
+                data = resource.model_dump(exclude_unset=True)
+                try:
+                    row = await asyncio.wait_for(
+                        asyncio.wrap_future(self.coalescer.submit(data)),
+                        timeout=self.coalescer.config.timeout,
+                    )
+                    return self._to_model(row)
+                except asyncio.TimeoutError:
+                    raise StatementTimeout(self.coalescer.config.timeout)
+                except StatementTimeout:
+                    raise
+                except Exception as e:
+                    raise HTTPException(
+                        status_code=400, detail=f"Creation failed: {str(e)}"
+                    )
+
+            return
+
+        @route
+        @session_handler(self.db_dependency)
         def create_resource(
             resource: self.pydantic_model, db: Session = Depends(self.db_dependency)
         ) -> self.pydantic_model:
@@ -95,112 +267,277 @@ class CRUD:
             #         data.pop(column.name, None)
 
             try:
-                db_resource = self.sqlalchemy_model(**data)
-                db.add(db_resource)
+                if self.coalescer:  # * Committed as part of a coalesced batch
+                    return self._to_model(self.coalescer.insert(data))
+                record = self._create_record(db, data)
                 db.commit()
-                db.refresh(db_resource)
-                result_dict = {
-                    column.name: getattr(db_resource, column.name)
-                    for column in self.table.columns
-                }
-                return self.pydantic_model(**result_dict)
+                return record
+            except StatementTimeout:
+                db.rollback()
+                raise
             except Exception as e:
                 db.rollback()
                 raise HTTPException(
                     status_code=400, detail=f"Creation failed: {str(e)}"
                 )
 
+    def _create_record(self, db: Session, data: Dict[str, Any]) -> BaseModel:
+        """Insert one record (flushed, not committed) and return it as a model."""
+        db_resource = self.sqlalchemy_model(**data)
+        db.add(db_resource)
+        db.flush()
+        db.refresh(db_resource)
+        self._invalidate(db, [self._pk_of(db_resource)])
+        result_dict = {
+            column.name: getattr(db_resource, column.name)
+            for column in self.table.columns
+        }
+        return self.pydantic_model(**result_dict)
+
     def read(self) -> None:
         """Add READ route with enhanced JSONB handling."""
 
         @self.router.get(
             self._get_route_path(),
-            response_model=List[self.pydantic_model],
+            # * Projected records (fields) only carry the requested columns
+            response_model=List[
+                Union[self.pydantic_model, fields_model(self.pydantic_model)]
+            ],
+            response_model_exclude_unset=True,
             summary=f"Get {self.table.name} resources",
-            description=f"Retrieve {self.table.name} records with optional filtering",
+            description=f"Retrieve {self.table.name} records with optional filtering, "
+            "ordering, paging (limit & offset) and projection (fields)",
         )
+        @session_handler(self.read_dependency)
         def read_resources(
-            db: Session = Depends(self.db_dependency),
+            db: Session = Depends(self.read_dependency),
             filters: self.query_params = Depends(),
+            options: self.query_options = Depends(),
+            expand: Optional[List[str]] = Query(
+                default=None,
+                description="Related resources to embed (comma separated): "
+                + (", ".join(self.relations) or "none"),
+            ),
         ) -> List[self.pydantic_model]:
-            query = db.query(self.sqlalchemy_model)
             filters_dict = filters.model_dump(exclude_unset=True)
+            options_dict = options.model_dump(exclude_none=True)
+
+            # * Resident tables answer from memory (the template schema only)
+            resident = self.resident
+            if (
+                resident
+                and resident.serving
+                and not (expand or options_dict or current_tenant.get())
+            ):
+                return resident.select(filters_dict)
+
+            fields = self.query_builder.fields(options_dict.get("fields"))
+            if expand:  # * Expanding needs the whole rows (projected afterwards)
+                options_dict.pop("fields", None)
+            statement, params = self.query_builder.build(filters_dict, options_dict)
+            rows = db.execute(statement, params).all()
+
+            # Process results
+            if expand:
+                return self._expanded(db, rows, expand, fields)
+            if fields:  # * Only the requested columns
+                return [self._to_record(row, fields) for row in rows]
+            return [self._to_model(row) for row in rows]
+
+    def _expanded(
+        self,
+        db: Session,
+        rows: List[Any],
+        expand: List[str],
+        fields: Optional[Tuple[str, ...]] = None,
+    ) -> Any:
+        """
+        Rows with their related resources embedded (one IN query per relation).
+
+        Forward relations replace the FK column with the referenced record
+        (null if it doesn't exist); reverse ones add a list under their name.
+        With `fields`, only those columns (and the expanded names) are kept.
+        """
+        names = list(dict.fromkeys(n.strip() for e in expand for n in e.split(",")))
+        unknown = [name for name in names if name not in self.relations]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot expand {unknown} (available: {list(self.relations)})",
+            )
+
+        records = [self._to_model(row).model_dump() for row in rows]
+        for name in filter(None, names):
+            relation = self.relations[name]
+            for record, related in zip(records, load_related(db, relation, rows)):
+                record[name] = (
+                    [self._related_record(relation, r) for r in related]
+                    if relation.many
+                    else self._related_record(relation, related)
+                )
+        if fields:
+            keep = set(fields).union(names)
+            records = [{k: v for k, v in r.items() if k in keep} for r in records]
+        return JSONResponse(jsonable_encoder(records))
+
+    def _related_record(self, relation: Relation, row: Any) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        handler = self.related_handlers.get(relation.target.key)
+        if handler is None:  # * Table without routes (e.g. excluded schema)
+            return dict(row._mapping)
+        return handler._to_model(row).model_dump()
+
+    @property
+    def _pk_addressable(self) -> bool:
+        """Whether every PK column can be a path parameter / batch key."""
+        return bool(self.pk_columns) and not any(
+            isinstance(t, (JSONBType, ArrayType)) for t in self.pk_types.values()
+        )
 
-            # Build query with filters
-            for field_name, value in filters_dict.items():
-                if value is not None:
-                    column = getattr(self.sqlalchemy_model, field_name)
-                    field_type = get_eq_type(str(column.type))
-
-                    if isinstance(field_type, (JSONBType, ArrayType)):
-                        # Skip JSONB and array filtering for now
-                        # You could add custom JSONB filtering logic here if needed
-                        continue
-                    elif isinstance(column.type, SQLAlchemyEnum):
-                        if isinstance(value, str):
-                            query = query.filter(column == value)
-                        elif isinstance(value, PyEnum):
-                            query = query.filter(column == value.value)
-                    else:
-                        query = query.filter(column == value)
-
-            # Execute query and process results
-            resources = query.all()
-            processed_records = []
-
-            for resource in resources:
-                record_dict = {}
-                for column in self.table.columns:
-                    value = getattr(resource, column.name)
-                    field_type = get_eq_type(str(column.type))
-
-                    if isinstance(field_type, JSONBType):
-                        if value is not None:
-                            # Parse JSONB data if it's a string
-                            if isinstance(value, str):
-                                try:
-                                    record_dict[column.name] = json.loads(value)
-                                except json.JSONDecodeError:
-                                    record_dict[column.name] = value
-                            else:
-                                record_dict[column.name] = value
-                        else:
-                            record_dict[column.name] = None
-                    elif isinstance(field_type, ArrayType):
-                        if value is not None:
-                            if isinstance(value, str):
-                                # Handle PostgreSQL array string format
-                                cleaned_value = value.strip("{}").split(",")
-                                record_dict[column.name] = [
-                                    field_type.item_type(item.strip('"'))
-                                    for item in cleaned_value
-                                    if item.strip()
-                                ]
-                            elif isinstance(value, list):
-                                record_dict[column.name] = [
-                                    field_type.item_type(item)
-                                    for item in value
-                                    if item is not None
-                                ]
-                            else:
-                                record_dict[column.name] = value
-                        else:
-                            record_dict[column.name] = []
-                    else:
-                        record_dict[column.name] = value
+    def read_by_pk(self) -> None:
+        """Add GET route for one record by primary key (one path segment per column)."""
+        if not self._pk_addressable:
+            return
 
-                # Validate the processed record
-                try:
-                    validated_record = self.pydantic_model.model_validate(record_dict)
-                    processed_records.append(validated_record)
-                except Exception as e:
-                    print(
-                        f"Validation error for record in {self.table.name}: {record_dict}"
-                    )
-                    print(f"Error: {str(e)}")
-                    raise
+        def read_resource(db: Session, **pk: Any) -> self.pydantic_model:
+            key = tuple(pk[c.name] for c in self.pk_columns)
+            record = self._records_by_keys(db, [key])[0]
+            if record is None:
+                shown = key[0] if len(key) == 1 else key
+                raise HTTPException(
+                    status_code=404, detail=f"{self.table.name} {shown} not found"
+                )
+            return record
+
+        # * The path parameters depend on the table, so the signature is built here
+        read_resource.__signature__ = inspect.Signature(
+            [
+                inspect.Parameter(
+                    "db",
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=Depends(self.read_dependency),
+                    annotation=Session,
+                )
+            ]
+            + [
+                inspect.Parameter(
+                    c.name,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    annotation=(
+                        str if self.pk_types[c.name] is Any else self.pk_types[c.name]
+                    ),
+                )
+                for c in self.pk_columns
+            ]
+        )
+        self.router.get(
+            self._get_route_path("/".join(f"{{{c.name}}}" for c in self.pk_columns)),
+            response_model=self.pydantic_model,
+            summary=f"Get {self.table.name} by primary key",
+            description=f"Retrieve one {self.table.name} record by its primary key",
+        )(session_handler(self.read_dependency)(read_resource))
+
+    def batch_get(self) -> None:
+        """Add POST route fetching many records by primary key, in input order."""
+        if not self._pk_addressable:
+            return
+        if len(self.pk_columns) == 1:
+            key_type = self.pk_types[self.pk_columns[0].name]
+        else:
+            key_type = create_model(
+                f"{self.pydantic_model.__name__}Key",
+                **{name: (t, ...) for name, t in self.pk_types.items()},
+            )
 
-            return processed_records
+        @self.router.post(
+            self._get_route_path("batch-get"),
+            response_model=List[Optional[self.pydantic_model]],
+            summary=f"Get {self.table.name} by primary keys",
+            description=f"Retrieve {self.table.name} records by a list of primary "
+            "keys in one query. Results follow the input order (null if not found)",
+        )
+        @session_handler(self.read_dependency)
+        def batch_get_resources(
+            keys: List[key_type],
+            db: Session = Depends(self.read_dependency),
+        ) -> List[Optional[self.pydantic_model]]:
+            if len(keys) > 10_000:
+                raise HTTPException(status_code=400, detail="Too many keys (max 10000)")
+            if len(self.pk_columns) == 1:
+                key_tuples = [(key,) for key in keys]
+            else:
+                key_tuples = [
+                    tuple(getattr(key, c.name) for c in self.pk_columns) for key in keys
+                ]
+            return self._records_by_keys(db, key_tuples)
+
+    def _records_by_keys(
+        self, db: Session, keys: List[Tuple[Any, ...]]
+    ) -> List[Optional[BaseModel]]:
+        """Records by primary key (None if missing), through the entity cache."""
+        cache = self.entity_cache
+        if cache is None:
+            rows = self._fetch_by_keys(db, keys)
+            return [self._to_model(row) if row is not None else None for row in rows]
+
+        cache_keys = [request_key(self._pk_key(key)) for key in keys]
+        records = [cache.get(cache_key) for cache_key in cache_keys]
+        missing = list(dict.fromkeys(k for k, r in zip(keys, records) if r is None))
+        if missing:
+            generation = cache.generation()
+            found = {}
+            for key, row in zip(missing, self._fetch_by_keys(db, missing)):
+                if row is not None:
+                    found[key] = self._to_model(row)
+                    cache.put(request_key(self._pk_key(key)), found[key], generation)
+            records = [
+                r if r is not None else found.get(k) for k, r in zip(keys, records)
+            ]
+        return records
+
+    def _pk_of(self, record: Any) -> Tuple[Any, ...]:
+        return tuple(getattr(record, c.name) for c in self.pk_columns)
+
+    def _pk_key(self, pk: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        """Comparable form of a primary key (see `_key`)."""
+        return self._key([c.name for c in self.pk_columns], pk)
+
+    def _invalidate(self, db: Session, pks: Iterable[Tuple[Any, ...]]) -> None:
+        """Drop `pks` from the in-memory copies of the table once `db` commits."""
+        pks = [self._pk_key(pk) for pk in pks]  # * As the cached reads key them
+        schedule_invalidation(db, self.entity_cache, pks)
+        schedule_invalidation(db, self.resident, pks)
+
+    def _fetch_by_keys(self, db: Session, keys: List[Tuple[Any, ...]]) -> List[Any]:
+        """
+        Rows matching each primary key in `keys` (None if missing), in order.
+
+        Single-column keys on PostgreSQL go as one array parameter (`= ANY(:keys)`),
+        others as IN lists (tuple IN for composite keys), in chunks.
+        """
+        distinct = list(dict.fromkeys(keys))
+        statement = select(self.table)
+        if len(self.pk_columns) == 1 and db.get_bind().dialect.name == "postgresql":
+            column = self.pk_columns[0]
+            keys_param = bindparam("keys", type_=ARRAY(column.type))
+            statement = statement.where(column == any_(keys_param))
+            batches = [(statement, {"keys": [key[0] for key in distinct]})]
+        else:
+            if len(self.pk_columns) == 1:
+                match_on, values = self.pk_columns[0], [key[0] for key in distinct]
+            else:
+                match_on, values = tuple_(*self.pk_columns), distinct
+            batches = [
+                (statement.where(match_on.in_(values[i : i + IN_CHUNK_SIZE])), {})
+                for i in range(0, len(values), IN_CHUNK_SIZE)
+            ]
+
+        found: Dict[Tuple[Any, ...], Any] = {}
+        for batch, params in batches:
+            for row in db.execute(batch, params):
+                found[self._pk_key(self._pk_of(row))] = row
+        return [found.get(self._pk_key(key)) for key in keys]
 
     # todo: Fix the return "updated_data"
     # todo: - The "updated_data" currently returns [] for all cases
@@ -214,6 +551,7 @@ class CRUD:
             summary=f"Update {self.table.name}",
             description=f"Update {self.table.name} records that match the filter criteria",
         )
+        @session_handler(self.db_dependency)
         def update_resource(
             resource: self.pydantic_model,
             db: Session = Depends(self.db_dependency),
@@ -226,40 +564,52 @@ class CRUD:
                 raise HTTPException(status_code=400, detail="No filters provided")
 
             try:
-                query = db.query(self.sqlalchemy_model)
-                for attr, value in filters_dict.items():
-                    if value is not None:
-                        query = query.filter(
-                            getattr(self.sqlalchemy_model, attr) == value
-                        )
-
-                old_data = [
-                    self.pydantic_model.model_validate(data.__dict__)
-                    for data in query.all()
-                ]
-
-                if not old_data:
-                    raise HTTPException(
-                        status_code=404, detail="No matching resources found"
-                    )
-
-                updated_count = query.update(update_data)
+                result = self._update_records(db, update_data, filters_dict)
                 db.commit()
-
-                updated_data = [
-                    self.pydantic_model.model_validate(data.__dict__)
-                    for data in query.all()
-                ]
-
-                return {
-                    "updated_count": updated_count,
-                    "old_data": [d.model_dump() for d in old_data],
-                    "updated_data": [d.model_dump() for d in updated_data],
-                }
+                return result
+            except StatementTimeout:
+                db.rollback()
+                raise
             except Exception as e:
                 db.rollback()
                 raise HTTPException(status_code=400, detail=f"Update failed: {str(e)}")
 
+    def _filtered_query(self, db: Session, filters_dict: Dict[str, Any]) -> Any:
+        """Build an ORM query with equality filters on the given columns."""
+        query = db.query(self.sqlalchemy_model)
+        for attr, value in filters_dict.items():
+            if value is not None:
+                query = query.filter(getattr(self.sqlalchemy_model, attr) == value)
+        return query
+
+    def _update_records(
+        self, db: Session, update_data: Dict[str, Any], filters_dict: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Update the matching records (flushed, not committed)."""
+        query = self._filtered_query(db, filters_dict)
+
+        old_data = [
+            self.pydantic_model.model_validate(data.__dict__) for data in query.all()
+        ]
+
+        if not old_data:
+            raise HTTPException(status_code=404, detail="No matching resources found")
+
+        updated_count = query.update(update_data)
+        db.flush()
+
+        updated_data = [
+            self.pydantic_model.model_validate(data.__dict__) for data in query.all()
+        ]
+        # * Old and new keys (the update may change the primary key)
+        self._invalidate(db, map(self._pk_of, old_data + updated_data))
+
+        return {
+            "updated_count": updated_count,
+            "old_data": [d.model_dump() for d in old_data],
+            "updated_data": [d.model_dump() for d in updated_data],
+        }
+
     def delete(self) -> None:
         """Add DELETE route."""
 
@@ -269,6 +619,7 @@ class CRUD:
             summary=f"Delete {self.table.name}",
             description=f"Delete {self.table.name} records that match the filter criteria",
         )
+        @session_handler(self.db_dependency)
         def delete_resource(
             db: Session = Depends(self.db_dependency),
             filters: self.query_params = Depends(),
@@ -278,41 +629,156 @@ class CRUD:
             if not filters_dict:
                 raise HTTPException(status_code=400, detail="No filters provided")
 
-            query = db.query(self.sqlalchemy_model)
-            for attr, value in filters_dict.items():
-                if value is not None:
-                    query = query.filter(getattr(self.sqlalchemy_model, attr) == value)
-
             try:
-                # Get resources before deletion
-                to_delete = query.all()
-                if not to_delete:
-                    return {"message": "No resources found matching the criteria"}
-
-                # Store the data before deletion
-                deleted_resources = [
-                    self.pydantic_model.model_validate(resource.__dict__).model_dump()
-                    for resource in to_delete
-                ]
-
-                # Perform deletion
-                deleted_count = query.delete(synchronize_session=False)
+                result = self._delete_records(db, filters_dict)
                 db.commit()
-
-                return {
-                    "message": f"{deleted_count} resource(s) deleted successfully",
-                    "deleted_resources": deleted_resources,
-                }
+                return result
+            except StatementTimeout:
+                db.rollback()
+                raise
             except Exception as e:
                 db.rollback()
                 raise HTTPException(
                     status_code=400, detail=f"Deletion failed: {str(e)}"
                 )
 
+    def _delete_records(
+        self, db: Session, filters_dict: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Delete the matching records (flushed, not committed)."""
+        query = self._filtered_query(db, filters_dict)
+
+        # Get resources before deletion
+        to_delete = query.all()
+        if not to_delete:
+            return {"message": "No resources found matching the criteria"}
+
+        # Store the data before deletion
+        deleted_resources = [
+            self.pydantic_model.model_validate(resource.__dict__).model_dump()
+            for resource in to_delete
+        ]
+
+        # Perform deletion
+        deleted_count = query.delete(synchronize_session=False)
+        self._invalidate(db, map(self._pk_of, to_delete))
+
+        return {
+            "message": f"{deleted_count} resource(s) deleted successfully",
+            "deleted_resources": deleted_resources,
+        }
+
+    def upsert(self) -> None:
+        """Add bulk UPSERT route (INSERT ... ON CONFLICT DO UPDATE)."""
+        if not self.conflict_targets:
+            return  # * Nothing to resolve conflicts on (no PK or unique constraint)
+
+        @self.router.post(
+            self._get_route_path("upsert"),
+            response_model=List[self.pydantic_model],
+            summary=f"Upsert {self.table.name}",
+            description=f"Insert or update a batch of {self.table.name} records. "
+            f"Conflicts are resolved on the first of {self.conflict_targets} "
+            "fully present in each record (records repeating a key: the last one "
+            "wins). Results follow the input order",
+        )
+        @session_handler(self.db_dependency)
+        def upsert_resources(
+            resources: List[self.pydantic_model],
+            db: Session = Depends(self.db_dependency),
+            chunk_size: int = Query(default=500, ge=1, le=10_000),
+        ) -> List[self.pydantic_model]:
+            try:
+                records = [r.model_dump(exclude_unset=True) for r in resources]
+                rows = self._upsert_records(db, records, chunk_size)
+                db.commit()
+                return [self._to_model(row) for row in rows]
+            except HTTPException:
+                db.rollback()
+                raise
+            except Exception as e:
+                db.rollback()
+                raise HTTPException(status_code=400, detail=f"Upsert failed: {str(e)}")
+
+    def _upsert_records(
+        self, db: Session, records: List[Dict[str, Any]], chunk_size: int = 500
+    ) -> List[Any]:
+        """
+        Upsert records in chunks, returning the resulting row of each (input order).
+
+        Records repeating a conflict key are written once (the last one wins) and
+        all get the resulting row.
+        """
+        match db.get_bind().dialect.name:
+            case "postgresql":
+                insert_fn = pg_insert
+            case "sqlite":
+                insert_fn = sqlite_insert
+            case dialect:
+                raise HTTPException(
+                    status_code=400, detail=f"Upsert not supported for {dialect}"
+                )
+
+        # * Conflict target of each record (the first one it fully includes)
+        targets = []
+        for record in records:
+            target = next(
+                (t for t in self.conflict_targets if set(t) <= set(record)), None
+            )
+            if target is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Records must include one of {self.conflict_targets}",
+                )
+            targets.append(target)
+        keys = [
+            (target, self._key(target, [record[c] for c in target]))
+            for record, target in zip(records, targets)
+        ]
+        # * Repeated keys: the last record wins (a statement can't update a row twice)
+        written = sorted({key: i for i, key in enumerate(keys)}.values())
+
+        found: Dict[Any, Any] = {}
+        for start in range(0, len(written), chunk_size):
+            # * One statement per distinct column set (executemany needs uniform keys)
+            groups: Dict[Tuple[str, ...], List[int]] = {}
+            for i in written[start : start + chunk_size]:
+                groups.setdefault(tuple(records[i]), []).append(i)
+
+            for columns, positions in groups.items():
+                target = targets[positions[0]]
+                stmt = insert_fn(self.table)
+                # * Key-only records get a no-op update so RETURNING still yields them
+                update_cols = [c for c in columns if c not in target] or list(target)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(target),
+                    set_={c: stmt.excluded[c] for c in update_cols},
+                )
+                result = db.execute(
+                    stmt.returning(*self.table.columns), [records[i] for i in positions]
+                )
+                # * Match returned rows back to their records through the conflict key
+                for row in result:
+                    key = self._key(target, [row._mapping[c] for c in target])
+                    found[(target, key)] = row
+
+        unmatched = [i for i, key in enumerate(keys) if key not in found]
+        if unmatched:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Upserted rows not matched back to records {unmatched[:10]}",
+            )
+        rows = [found[key] for key in keys]  # * Input order (repeats included)
+        self._invalidate(db, map(self._pk_of, found.values()))
+        return rows
+
     def generate_all(self) -> None:
         """Generate all CRUD routes."""
         # print(f"\tGen {gray("CRUD")} -> {self.table.name}")
         self.create()
         self.read()
+        self.read_by_pk()
+        self.batch_get()
         self.update()
         self.delete()
+        self.upsert()
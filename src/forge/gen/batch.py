@@ -0,0 +1,158 @@
+from typing import Any, Callable, Dict, List, Literal
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from forge.gen import CRUD
+from forge.tools.db import session_handler
+from forge.tools.timeout import StatementTimeout
+
+
+class BatchOperation(BaseModel):
+    """A single operation inside a batch request"""
+
+    op: Literal["create", "update", "delete", "fn"] = Field(
+        ..., description="Operation to run"
+    )
+    target: str = Field(..., description="Target as 'schema.table' or 'schema.fn'")
+    data: Dict[str, Any] = Field(
+        default_factory=dict, description="Record data (create/update) or fn params"
+    )
+    filters: Dict[str, Any] = Field(
+        default_factory=dict, description="Equality filters (update/delete)"
+    )
+
+
+class BatchResult(BaseModel):
+    """Result of a single batch operation"""
+
+    index: int
+    op: str
+    target: str
+    result: Any = None
+
+
+def _resolve_refs(value: Any, results: List[Any]) -> Any:
+    """
+    Replace `{"$ref": "<index>.<field>"}` placeholders with values from earlier results.
+
+    This lets an operation use e.g. the generated id of a record created before it.
+    """
+    match value:
+        case {"$ref": str(ref)} if len(value) == 1:
+            index, _, field = ref.partition(".")
+            resolved = results[int(index)]
+            if isinstance(resolved, BaseModel):
+                resolved = resolved.model_dump()
+            return resolved[field] if field else resolved
+        case dict():
+            return {k: _resolve_refs(v, results) for k, v in value.items()}
+        case list():
+            return [_resolve_refs(v, results) for v in value]
+        case _:
+            return value
+
+
+def _run_operation(
+    db: Session,
+    operation: BatchOperation,
+    table_handlers: Dict[str, CRUD],
+    fn_handlers: Dict[str, Callable[[Session, Dict[str, Any]], Any]],
+) -> Any:
+    """Run one operation on the shared session (without committing)."""
+    if operation.op == "fn":
+        if operation.target not in fn_handlers:
+            raise ValueError(f"Unknown function '{operation.target}'")
+        return fn_handlers[operation.target](db, operation.data)
+
+    if operation.target not in table_handlers:
+        raise ValueError(f"Unknown table '{operation.target}'")
+    crud = table_handlers[operation.target]
+
+    filters = crud.query_params.model_validate(operation.filters).model_dump(
+        exclude_unset=True
+    )
+    if operation.op in ("update", "delete") and not filters:
+        raise ValueError("No filters provided")
+
+    match operation.op:
+        case "create":
+            data = crud.pydantic_model.model_validate(operation.data)
+            return crud._create_record(db, data.model_dump(exclude_unset=True))
+        case "update":
+            data = crud.pydantic_model.model_validate(operation.data)
+            return crud._update_records(
+                db, data.model_dump(exclude_unset=True), filters
+            )
+        case "delete":
+            return crud._delete_records(db, filters)
+
+
+def gen_batch_route(
+    router: APIRouter,
+    table_handlers: Dict[str, CRUD],
+    fn_handlers: Dict[str, Callable[[Session, Dict[str, Any]], Any]],
+    db_dependency: Callable,
+    max_operations: int = 1000,
+) -> None:
+    """
+    Generate a route that runs an ordered list of operations in one transaction.
+
+    Args:
+        router: FastAPI router instance
+        table_handlers: CRUD handlers by 'schema.table'
+        fn_handlers: Function runners by 'schema.fn'
+        db_dependency: Database session dependency
+        max_operations: Most operations in one batch (400 above it)
+    """
+
+    @router.post(
+        "/batch",
+        response_model=List[BatchResult],
+        summary="Execute a batch of operations",
+        description="Run create/update/delete/fn operations in order, in a single "
+        "transaction. Values shaped like {'$ref': '<index>.<field>'} are replaced "
+        "by the result of an earlier operation. Any failure rolls back the batch.",
+    )
+    @session_handler(db_dependency)
+    def execute_batch(
+        operations: List[BatchOperation], db: Session = Depends(db_dependency)
+    ) -> List[BatchResult]:
+        if len(operations) > max_operations:
+            raise HTTPException(
+                status_code=400, detail=f"Too many operations (max {max_operations})"
+            )
+        results: List[Any] = []
+        for index, operation in enumerate(operations):
+            try:
+                operation = operation.model_copy(
+                    update={
+                        "data": _resolve_refs(operation.data, results),
+                        "filters": _resolve_refs(operation.filters, results),
+                    }
+                )
+                results.append(
+                    _run_operation(db, operation, table_handlers, fn_handlers)
+                )
+            except StatementTimeout:
+                db.rollback()
+                raise
+            except Exception as e:
+                db.rollback()
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                raise HTTPException(
+                    status_code=400,
+                    detail={
+                        "index": index,
+                        "op": operation.op,
+                        "target": operation.target,
+                        "error": detail,
+                    },
+                )
+        db.commit()
+
+        return [
+            BatchResult(index=i, op=o.op, target=o.target, result=r)
+            for i, (o, r) in enumerate(zip(operations, results))
+        ]
@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import time
+import weakref
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Literal, Optional, Set
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from forge.tools.db import DBForge, PoolConfig
+
+
+class FanoutCall(BaseModel):
+    """A single view/function invocation inside a fan-out request"""
+
+    name: str = Field(..., description="Key of this call in the response")
+    kind: Literal["view", "fn"] = Field(..., description="Kind of target")
+    target: str = Field(..., description="Target as 'schema.view' or 'schema.fn'")
+    params: Dict[str, Any] = Field(
+        default_factory=dict, description="View filters or function params"
+    )
+
+
+class FanoutResult(BaseModel):
+    """Result of a single fan-out call"""
+
+    result: Any = None
+    error: Optional[str] = None
+    elapsed_ms: float
+
+
+class FanoutResponse(BaseModel):
+    """Results keyed by call name, plus the wall time of the whole request"""
+
+    elapsed_ms: float
+    results: Dict[str, FanoutResult]
+
+
+def gen_fanout_route(
+    router: APIRouter,
+    view_handlers: Dict[str, Callable[[Session, Dict[str, Any]], Any]],
+    fn_handlers: Dict[str, Callable[[Session, Dict[str, Any]], Any]],
+    db_manager: DBForge,
+    executor: Executor,
+    read_only_fns: Set[str] = frozenset(),
+    max_calls: int = 100,
+    max_concurrency: Optional[int] = None,
+) -> None:
+    """
+    Generate a route that runs several view/function calls concurrently.
+
+    Every call gets its own session (and so its own pooled connection), so the
+    request takes about as long as the slowest call instead of their sum.
+
+    Args:
+        router: FastAPI router instance
+        view_handlers: View runners by 'schema.view'
+        fn_handlers: Function runners by 'schema.fn'
+        db_manager: Database manager (provides the session factories)
+        executor: Thread pool for the calls when using sync sessions
+        read_only_fns: Functions that may run on a read replica (like the views)
+        max_calls: Most calls in one request (400 above it)
+        max_concurrency: Most calls running at once, across all fan-out requests
+            (default: half the connection pool, so other routes keep connections)
+    """
+    if max_concurrency is None:
+        pool = db_manager.config.pool_config or PoolConfig()
+        max_concurrency = max(1, (pool.pool_size + pool.max_overflow) // 2)
+    # * One semaphore per event loop (made on first use, inside the loop)
+    slots: "weakref.WeakKeyDictionary[Any, asyncio.Semaphore]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def _run_sync(
+        session_factory: Callable, runner: Callable, params: Dict[str, Any]
+    ) -> Any:
+        with db_manager.new_session(session_factory) as session:
+            return runner(session, params)
+
+    async def _run(call: FanoutCall) -> FanoutResult:
+        loop = asyncio.get_running_loop()
+        if loop not in slots:
+            slots[loop] = asyncio.Semaphore(max_concurrency)
+        async with slots[loop]:
+            return await _run_call(call)
+
+    async def _run_call(call: FanoutCall) -> FanoutResult:
+        handlers = view_handlers if call.kind == "view" else fn_handlers
+        start = time.perf_counter()
+        try:
+            if call.target not in handlers:
+                raise ValueError(f"Unknown {call.kind} '{call.target}'")
+            runner = handlers[call.target]
+            if call.kind == "view" or call.target in read_only_fns:
+                session_factory = db_manager.read_sessionmaker()
+            elif db_manager.is_async:
+                session_factory = db_manager.AsyncSessionLocal
+            else:
+                session_factory = db_manager.SessionLocal
+
+            if db_manager.is_async:
+                async with db_manager.new_session(session_factory) as session:
+                    result = await session.run_sync(runner, call.params)
+            else:
+                result = await asyncio.get_running_loop().run_in_executor(
+                    executor,
+                    contextvars.copy_context().run,
+                    _run_sync,
+                    session_factory,
+                    runner,
+                    call.params,
+                )
+            error = None
+        except Exception as e:
+            result, error = None, str(e)
+        return FanoutResult(
+            result=result,
+            error=error,
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+
+    @router.post(
+        "/fanout",
+        response_model=FanoutResponse,
+        summary="Run view/function calls concurrently",
+        description="Run a list of view and function calls in parallel, each on its "
+        "own connection. Returns the results keyed by call name with per-call timing. "
+        "A failing call reports its error without affecting the others.",
+    )
+    async def execute_fanout(calls: List[FanoutCall]) -> FanoutResponse:
+        if len(calls) > max_calls:
+            raise HTTPException(
+                status_code=400, detail=f"Too many calls (max {max_calls})"
+            )
+        names = [call.name for call in calls]
+        if len(set(names)) != len(names):
+            raise HTTPException(status_code=400, detail="Call names must be unique")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(_run(call) for call in calls))
+        return FanoutResponse(
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+            results=dict(zip(names, results)),
+        )
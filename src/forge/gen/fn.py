@@ -1,14 +1,26 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Executor
 from enum import Enum
 from typing import Any, Callable, Dict, List, Tuple, Optional, Type, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict, create_model
-from sqlalchemy import text
+from sqlalchemy import Result, TextClause, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from forge.core.logging import *
 from forge.gen import CRUD
-from forge.tools.sql_mapping import ArrayType, get_eq_type
+from forge.tools.db import run_db
+from forge.tools.jobs import JobQueue, JobStatus, QueueFull
+from forge.tools.sql_mapping import ArrayType, JSONBType, get_eq_type
+from forge.tools.tenant import tenant_schema
+
+# * Rows fetched per round trip from the server-side cursor of a streamed response
+STREAM_CHUNK_ROWS = 1000
 
 # ? Metadata for some function ---------------------------------------------------
 
@@ -400,11 +412,34 @@ def gen_fn_route(
     fn_metadata: FunctionMetadata,  # Pass the function cache
     router: APIRouter,
     db_dependency: Callable,
-) -> None:
-    """Generate route for a specific PostgreSQL function/procedure."""
+    executor: Optional[Executor] = None,
+    open_session: Optional[Callable[[], Union[Session, AsyncSession]]] = None,
+    job_queue: Optional[JobQueue] = None,
+) -> Optional[Callable[[Session, Dict[str, Any]], Any]]:
+    """
+    Generate route for a specific PostgreSQL function/procedure.
+
+    Sync session calls run on `executor` (if given) to keep the event loop free.
+    Set-returning functions take `limit`/`offset`, and `stream` when given
+    `open_session` (the session of a streamed response outlives the request's).
+    Procedures can also be queued as background jobs on `job_queue`.
+
+    Returns a `(db, params) -> result` runner for the generated route (so other
+    routes can call the same function), or None if the object type is unsupported.
+    """
 
     FunctionInputModel, FunctionOutputModel, is_set = create_fn_models(fn_metadata)
     is_scalar = fn_metadata.type == FunctionType.SCALAR
+    # * Built once (per tenant schema), reused by every call
+    statement_for = functools.lru_cache(maxsize=None)(
+        functools.partial(fn_statement, fn_metadata)
+    )
+    batch_statement_for = functools.lru_cache(maxsize=None)(
+        functools.partial(fn_batch_statement, fn_metadata)
+    )
+    paged_statement_for = functools.lru_cache(maxsize=None)(
+        functools.partial(fn_statement, fn_metadata, paged=True)
+    )
 
     match fn_metadata.object_type:
         case ObjectType.PROCEDURE:
@@ -419,35 +454,149 @@ def gen_fn_route(
             async def execute_procedure(
                 params: FunctionInputModel, db: Session = Depends(db_dependency)
             ):
+                return await run_db(
+                    db,
+                    _execute_proc,
+                    statement=statement_for(tenant_schema(fn_metadata.schema)),
+                    params=params,
+                    executor=executor,
+                )
+
+            if job_queue is not None:
+
+                @router.post(
+                    f"/proc/{fn_metadata.name}/jobs",
+                    response_model=JobStatus,
+                    status_code=202,
+                    summary=f"Queue {fn_metadata.name} procedure",
+                    description=f"Run the {fn_metadata.name} procedure in the "
+                    "background. Returns the job, to follow at /jobs/{id}",
+                )
+                def submit_procedure(params: FunctionInputModel) -> JobStatus:
+                    try:
+                        job = job_queue.submit(
+                            f"{fn_metadata.schema}.{fn_metadata.name}",
+                            statement_for(tenant_schema(fn_metadata.schema)),
+                            params.model_dump(),
+                        )
+                    except QueueFull as e:
+                        raise HTTPException(status_code=503, detail=str(e))
+                    return job.status()
+
+            def run_procedure(db: Session, data: Dict[str, Any]) -> Dict[str, str]:
                 return _execute_proc(
                     db=db,
-                    params=params,
-                    fn_name=fn_metadata.name,
-                    schema=fn_metadata.schema,
+                    statement=statement_for(tenant_schema(fn_metadata.schema)),
+                    params=FunctionInputModel.model_validate(data),
                 )
+
+            return run_procedure
         case ObjectType.FUNCTION:
+            if is_set:
+
+                @router.post(
+                    f"/fn/{fn_metadata.name}",
+                    response_model=List[FunctionOutputModel],
+                    summary=f"Execute {fn_metadata.name} function",
+                    description=fn_metadata.description
+                    or f"Execute the {fn_metadata.name} function",
+                )
+                async def execute_set_function(
+                    params: FunctionInputModel,
+                    db: Session = Depends(db_dependency),
+                    limit: Optional[int] = Query(None, ge=1, description="Row limit"),
+                    offset: Optional[int] = Query(None, ge=0, description="Skipped"),
+                    stream: bool = Query(
+                        False,
+                        description="Send the rows as they are read from a "
+                        "server-side cursor (same JSON array)",
+                    ),
+                ):
+                    statement = paged_statement_for(tenant_schema(fn_metadata.schema))
+                    page = {"forge_limit": limit, "forge_offset": offset}
+                    if stream and open_session:
+                        return await _stream_fn(
+                            session=open_session(),
+                            statement=statement,
+                            params={**params.model_dump(), **page},
+                            output_model=FunctionOutputModel,
+                            executor=executor,
+                        )
+                    return await run_db(
+                        db,
+                        _execute_fn,
+                        statement=statement,
+                        params=params,
+                        output_model=FunctionOutputModel,
+                        is_set=is_set,
+                        page=page,
+                        executor=executor,
+                    )
+
+            else:
+
+                @router.post(
+                    f"/fn/{fn_metadata.name}",
+                    response_model=FunctionOutputModel,
+                    summary=f"Execute {fn_metadata.name} function",
+                    description=fn_metadata.description
+                    or f"Execute the {fn_metadata.name} function",
+                )
+                async def execute_function(
+                    params: FunctionInputModel, db: Session = Depends(db_dependency)
+                ):
+                    return await run_db(
+                        db,
+                        _execute_fn,
+                        statement=statement_for(tenant_schema(fn_metadata.schema)),
+                        params=params,
+                        output_model=FunctionOutputModel,
+                        is_set=is_set,
+                        is_scalar=is_scalar,
+                        executor=executor,
+                    )
 
             @router.post(
-                f"/fn/{fn_metadata.name}",
-                response_model=List[FunctionOutputModel]
+                f"/fn/{fn_metadata.name}/batch",
+                response_model=List[List[FunctionOutputModel]]
                 if is_set
-                else FunctionOutputModel,
-                summary=f"Execute {fn_metadata.name} function",
-                description=fn_metadata.description
-                or f"Execute the {fn_metadata.name} function",
+                else List[FunctionOutputModel],
+                summary=f"Execute {fn_metadata.name} function for many inputs",
+                description=f"Call {fn_metadata.name} once per input in a single "
+                "statement. Results follow the input order"
+                + (" (one list of rows per input)" if is_set else ""),
             )
-            async def execute_function(
-                params: FunctionInputModel, db: Session = Depends(db_dependency)
+            async def execute_function_batch(
+                inputs: List[FunctionInputModel], db: Session = Depends(db_dependency)
             ):
+                if len(inputs) > 10_000:
+                    raise HTTPException(
+                        status_code=400, detail="Too many inputs (max 10000)"
+                    )
+                schema = tenant_schema(fn_metadata.schema)
+                return await run_db(
+                    db,
+                    _execute_fn_batch,
+                    statement=batch_statement_for(schema),
+                    fallback=statement_for(schema),
+                    inputs=inputs,
+                    output_model=FunctionOutputModel,
+                    is_set=is_set,
+                    is_scalar=is_scalar,
+                    executor=executor,
+                )
+
+            def run_function(db: Session, data: Dict[str, Any]) -> Any:
                 return _execute_fn(
                     db=db,
-                    params=params,
-                    fn_name=fn_metadata.name,
-                    schema=fn_metadata.schema,
+                    statement=statement_for(tenant_schema(fn_metadata.schema)),
+                    params=FunctionInputModel.model_validate(data),
                     output_model=FunctionOutputModel,
                     is_set=is_set,
                     is_scalar=is_scalar,
                 )
+
+            return run_function
         case ObjectType.TRIGGER:
             print("Trigger functions not yet supported")
         case ObjectType.AGGREGATE:
@@ -456,31 +605,76 @@ def gen_fn_route(
             print("Window functions not yet supported")
         case _:
             print("Unknown object type")
+    return None
+
+
+def fn_statement(
+    fn_metadata: FunctionMetadata, schema: Optional[str] = None, paged: bool = False
+) -> TextClause:
+    """
+    Build the statement that calls a function (SELECT) or procedure (CALL).
+
+    `schema` overrides the function's schema (e.g. with a tenant's schema).
+    `paged` adds `LIMIT :forge_limit OFFSET :forge_offset` (NULL: no limit/offset).
+    """
+    param_list = ", ".join(f":{p.name}" for p in fn_metadata.parameters)
+    target = f"{schema or fn_metadata.schema}.{fn_metadata.name}({param_list})"
+    if fn_metadata.object_type == ObjectType.PROCEDURE:
+        return text(f"CALL {target}")
+    if paged:
+        return text(f"SELECT * FROM {target} LIMIT :forge_limit OFFSET :forge_offset")
+    return text(f"SELECT * FROM {target}")
+
+
+def fn_batch_statement(
+    fn_metadata: FunctionMetadata, schema: Optional[str] = None
+) -> Optional[TextClause]:
+    """
+    Build the statement that calls a function once per row of its unnested inputs.
+
+    Each parameter is bound as an array; `unnest ... WITH ORDINALITY` turns them
+    back into one row per input, numbered so results can be matched to inputs.
+    None when the parameters can't be passed that way (no parameters, OUT
+    parameters, array or JSON parameters: unnest would flatten them).
+    """
+    params = fn_metadata.parameters
+    if not params or any(
+        p.mode not in ("IN", "VARIADIC")
+        or p.type.endswith("[]")
+        or isinstance(get_eq_type(p.type), (ArrayType, JSONBType))
+        for p in params
+    ):
+        return None
+
+    arrays = ", ".join(f"CAST(:{p.name} AS {p.type}[])" for p in params)
+    columns = ", ".join(f'"{p.name}"' for p in params)
+    args = ", ".join(f'p."{p.name}"' for p in params)
+    target = f"{schema or fn_metadata.schema}.{fn_metadata.name}({args})"
+    return text(
+        f"SELECT p.forge_ord, f.* FROM unnest({arrays}) WITH ORDINALITY "
+        f"AS p({columns}, forge_ord) CROSS JOIN LATERAL {target} AS f"
+    )
 
 
 def _execute_proc(
-    db: Session, params: BaseModel, fn_name: str, schema: str
+    db: Session, statement: TextClause, params: BaseModel
 ) -> Dict[str, str]:
     """Execute a stored procedure."""
-    param_list = [f":{p}" for p in params.model_fields.keys()]
-    query = f"CALL {schema}.{fn_name}({', '.join(param_list)})"
-    db.execute(text(query), params.model_dump())
+    db.execute(statement, params.model_dump())
     return {"status": "success"}
 
 
 def _execute_fn(
     db: Session,
+    statement: TextClause,
     params: BaseModel,
-    fn_name: str,
-    schema: str,
     output_model: Type[BaseModel],
     is_set: bool = False,
     is_scalar: bool = False,
+    page: Optional[Dict[str, Any]] = None,
 ) -> Union[List[BaseModel], BaseModel]:
-    """Execute a database function."""
-    param_list = [f":{p}" for p in params.model_fields.keys()]
-    query = f"SELECT * FROM {schema}.{fn_name}({', '.join(param_list)})"
-    result = db.execute(text(query), params.model_dump())
+    """Execute a database function (`page`: limit/offset of a paged statement)."""
+    result = db.execute(statement, {**params.model_dump(), **(page or {})})
 
     if is_set:
         records = result.fetchall()
@@ -492,3 +686,136 @@ def _execute_fn(
         return output_model.model_validate(transformed_data)
 
     return output_model.model_validate(dict(record._mapping))
+
+
+def _begin_stream(db: Session) -> None:
+    """Start the transaction a server-side cursor needs (reads may be AUTOCOMMIT)."""
+    bind = db.get_bind()
+    if (
+        bind.dialect.name == "postgresql"
+        and bind.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    ):
+        db.connection(execution_options={"isolation_level": "READ COMMITTED"})
+
+
+def _open_stream(db: Session, statement: TextClause, params: Dict[str, Any]) -> Result:
+    """Execute `statement` on a server-side cursor, read in `STREAM_CHUNK_ROWS`."""
+    _begin_stream(db)
+    return db.execute(
+        statement,
+        params,
+        execution_options={"stream_results": True, "yield_per": STREAM_CHUNK_ROWS},
+    )
+
+
+async def _stream_fn(
+    session: Union[Session, AsyncSession],
+    statement: TextClause,
+    params: Dict[str, Any],
+    output_model: Type[BaseModel],
+    executor: Optional[Executor] = None,
+) -> StreamingResponse:
+    """
+    Stream the rows of a set-returning function as a JSON array.
+
+    The statement runs before the response starts (so its errors are reported
+    as usual), then rows are validated and serialized one at a time as they are
+    fetched. `session` is closed when the body is done.
+    """
+
+    def serialize(rows: List[Any]) -> str:
+        return ",".join(
+            output_model.model_validate(dict(row._mapping)).model_dump_json()
+            for row in rows
+        )
+
+    if isinstance(session, AsyncSession):
+        try:
+            await session.run_sync(_begin_stream)
+            result = await session.stream(
+                statement, params, execution_options={"yield_per": STREAM_CHUNK_ROWS}
+            )
+        except BaseException:
+            await session.close()
+            raise
+
+        async def body():
+            try:
+                separator = "["
+                async for rows in result.partitions():
+                    yield separator + serialize(rows)
+                    separator = ","
+                yield "[]" if separator == "[" else "]"
+            finally:
+                await session.close()
+
+    else:
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor,
+                contextvars.copy_context().run,
+                _open_stream,
+                session,
+                statement,
+                params,
+            )
+        except BaseException:
+            session.close()
+            raise
+
+        def body():
+            try:
+                separator = "["
+                for rows in result.partitions():
+                    yield separator + serialize(rows)
+                    separator = ","
+                yield "[]" if separator == "[" else "]"
+            finally:
+                session.close()
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+def _execute_fn_batch(
+    db: Session,
+    statement: Optional[TextClause],
+    fallback: TextClause,
+    inputs: List[BaseModel],
+    output_model: Type[BaseModel],
+    is_set: bool = False,
+    is_scalar: bool = False,
+) -> List[Union[List[BaseModel], BaseModel]]:
+    """
+    Execute a database function once per input, results in input order.
+
+    Uses the unnest statement (one round trip) when there is one, or else calls
+    the function input by input on the same connection.
+    """
+    if statement is None:
+        return [
+            _execute_fn(db, fallback, params, output_model, is_set, is_scalar)
+            for params in inputs
+        ]
+    if not inputs:
+        return []
+
+    dumped = [params.model_dump() for params in inputs]
+    arrays = {name: [d[name] for d in dumped] for name in dumped[0]}
+    rows: Dict[int, List[Any]] = {}
+    for row in db.execute(statement, arrays):
+        rows.setdefault(row[0], []).append(row)
+
+    def to_output(row: Any) -> BaseModel:
+        if is_scalar:
+            return output_model.model_validate({"result": row[1]})
+        values = dict(row._mapping)
+        values.pop("forge_ord")
+        return output_model.model_validate(values)
+
+    # * ORDINALITY numbers the inputs from 1
+    if is_set:
+        return [
+            [to_output(row) for row in rows.get(i, [])]
+            for i in range(1, len(inputs) + 1)
+        ]
+    return [to_output(rows[i][0]) for i in range(1, len(inputs) + 1)]
@@ -1,19 +1,17 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
 from datetime import datetime
-from pydantic import BaseModel
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
 from fastapi import APIRouter, Response
+from sqlalchemy import text
 
+from forge.tools.db import DBForge
+from forge.tools.entity_cache import EntityCacheStats
+from forge.tools.matview import MatViewStatus
 from forge.tools.model import ModelForge
-
-
-class HealthStatus(BaseModel):
-    status: str
-    timestamp: datetime
-    version: str
-    uptime: float
-    database: bool
-
-
-from pydantic import BaseModel, Field
+from forge.tools.pool import PoolStatus
 
 
 class HealthStatus(BaseModel):
@@ -21,39 +19,156 @@ class HealthStatus(BaseModel):
 
     status: str = Field(..., description="Current health status")
     timestamp: datetime = Field(..., description="Current timestamp")
-    version: str = Field(..., description="API version")
+    version: str = Field(..., description="Database version")
     uptime: float = Field(..., description="Server uptime in seconds")
-    # database: bool = Field(..., description="Database connection status")
+    database: bool = Field(..., description="Database connection status")
+    db_latency_ms: Optional[float] = Field(None, description="Last probe latency")
+    checked_at: Optional[datetime] = Field(None, description="Last probe time")
+    error: Optional[str] = Field(None, description="Last probe error (if any)")
     # environment: str = Field(..., description="Current environment")
 
 
+class DBProbeResult(BaseModel):
+    """Snapshot of the database status taken by the background prober"""
+
+    connected: bool = False
+    latency_ms: Optional[float] = None
+    version: str = "Unknown"
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class HealthProbe:
+    """
+    Background prober that keeps a cached snapshot of the database status.
+
+    Health routes read the snapshot instead of checking out connections on every
+    request, so load balancer probes don't compete with real traffic for the pool.
+    """
+
+    def __init__(
+        self, db_manager: DBForge, interval: float = 10.0, timeout: float = 5.0
+    ):
+        self.db_manager = db_manager
+        self.interval = interval
+        self.timeout = timeout
+        self.result = DBProbeResult()
+        self._pending: Optional[Future] = None
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="forge-probe"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="forge-health-probe", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        Database reachable, the last probe is recent enough to trust and the
+        pools configured with `warm_up` are filled.
+        """
+        if not self.db_manager.pools_warm:
+            return False
+        if not self.result.connected or self.result.checked_at is None:
+            return False
+        age = (datetime.now() - self.result.checked_at).total_seconds()
+        return age <= self.interval * 3
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def refresh(self) -> DBProbeResult:
+        """Run one probe (bounded by `timeout`) and update the cached result."""
+        if self._pending is not None and not self._pending.done():
+            # * The previous probe is still hanging: don't pile up more of them
+            self.result = self.result.model_copy(
+                update={"connected": False, "error": "probe still pending"}
+            )
+            return self.result
+
+        self._pending = self._executor.submit(self._probe)
+        try:
+            self.result = self._pending.result(timeout=self.timeout)
+        except TimeoutError:
+            self.result = DBProbeResult(
+                version=self.result.version,
+                checked_at=datetime.now(),
+                error=f"probe timed out after {self.timeout}s",
+            )
+        except Exception as e:
+            self.result = DBProbeResult(
+                version=self.result.version, checked_at=datetime.now(), error=str(e)
+            )
+        return self.result
+
+    def _probe(self) -> DBProbeResult:
+        version = self.result.version
+        start = time.perf_counter()
+        with self.db_manager.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            latency_ms = (time.perf_counter() - start) * 1000
+            query = self.db_manager.version_query
+            if version == "Unknown" and query:  # * Only fetched once
+                version = str(conn.execute(text(query)).scalar()).split("\n")[0]
+        return DBProbeResult(
+            connected=True,
+            latency_ms=latency_ms,
+            version=version,
+            checked_at=datetime.now(),
+        )
+
+
 def health_root(
     dt_router: APIRouter,
     model_forge: ModelForge,
     start_time: datetime,
+    probe: HealthProbe,
     environment: str = "development",
 ):
-    def check_db_connection() -> bool:
-        try:
-            model_forge.db_manager.exec_raw_sql("SELECT 1")
-            return True
-        except Exception:
-            return False
-
     @dt_router.get("", response_model=HealthStatus)
     def health_check():
-        """Basic health check endpoint"""
-        is_connected = check_db_connection()
+        """Basic health check endpoint (served from the background probe)"""
+        result = probe.result
         return HealthStatus(
-            status="healthy" if is_connected else "degraded",
+            status="healthy" if result.connected else "degraded",
             timestamp=datetime.now(),
-            version=model_forge.db_manager.get_db_version(),
+            version=result.version,
             uptime=(datetime.now() - start_time).total_seconds(),
-            # database=is_connected,  # Add database status
+            database=result.connected,
+            db_latency_ms=result.latency_ms,
+            checked_at=result.checked_at,
+            error=result.error,
             # environment=environment  # Add environment
         )
 
 
+def liveness(dt_router: APIRouter):
+    @dt_router.get("/live", status_code=200)
+    def live():
+        """Liveness probe: the process is up and serving requests"""
+        return {"status": "alive"}
+
+
+def readiness(dt_router: APIRouter, probe: HealthProbe):
+    @dt_router.get("/ready", status_code=200)
+    def ready(response: Response):
+        """Readiness probe: the database is reachable (503 otherwise)"""
+        if not probe.is_ready:
+            response.status_code = 503
+            error = probe.result.error
+            if not probe.db_manager.pools_warm:
+                error = "connection pools warming up"
+            return {"status": "not ready", "error": error}
+        return {"status": "ready"}
+
+
 class CacheStatus(BaseModel):
     last_updated: datetime
     total_items: int
@@ -63,6 +178,7 @@ class CacheStatus(BaseModel):
     functions_cached: int
     procedures_cached: int
     triggers_cached: int
+    entity_caches: Dict[str, EntityCacheStats] = Field(default_factory=dict)
 
 
 def cache(dt_router: APIRouter, model_forge: ModelForge, start_time: datetime):
@@ -82,7 +198,7 @@ def cache(dt_router: APIRouter, model_forge: ModelForge, start_time: datetime):
         # counter = [len(cache) for cache in [model_forge.table_cache, model_forge.view_cache, model_forge.enum_cache, model_forge.fn_cache, model_forge.proc_cache, model_forge.trig_cache]]
 
         return CacheStatus(
-            last_updated=start_time,  # You might want to track actual cache updates
+            last_updated=model_forge.loaded_at,
             total_items=sum(counter),
             tables_cached=counter[0],
             views_cached=counter[1],
@@ -90,6 +206,10 @@ def cache(dt_router: APIRouter, model_forge: ModelForge, start_time: datetime):
             functions_cached=counter[3],
             procedures_cached=counter[4],
             triggers_cached=counter[5],
+            entity_caches={
+                key: entity_cache.stats()
+                for key, entity_cache in model_forge.entity_caches.items()
+            },
         )
 
 
@@ -98,12 +218,29 @@ def clear_cache(dt_router: APIRouter, model_forge: ModelForge, start_time: datet
     def clear_cache():
         """Clear and reload all metadata caches"""
         try:
-            #
+            model_forge.reload()  # * Also rebuilds the prebuilt /dt responses
             return {"status": "success", "message": "Cache cleared and reloaded"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
 
+def pool(dt_router: APIRouter, db_manager: DBForge):
+    @dt_router.get("/pool", response_model=Dict[str, PoolStatus])
+    def pool_status():
+        """Connection pool usage, checkout wait histogram and connection age"""
+        return {
+            name: metrics.snapshot()
+            for name, metrics in db_manager.pool_metrics.items()
+        }
+
+
+def matviews(dt_router: APIRouter, model_forge: ModelForge):
+    @dt_router.get("/matviews", response_model=Dict[str, MatViewStatus])
+    def matview_status():
+        """Refresh durations and staleness of the materialized views"""
+        return {key: matview.status() for key, matview in model_forge.matviews.items()}
+
+
 def ping(dt_router: APIRouter):
     @dt_router.get("/ping", status_code=200)
     def ping():
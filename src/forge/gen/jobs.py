@@ -0,0 +1,59 @@
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query
+
+from forge.tools.jobs import JobQueue, JobState, JobStatus
+
+
+def gen_job_routes(router: APIRouter, job_queue: JobQueue) -> None:
+    """
+    Generate the routes following the procedure jobs of `job_queue`.
+
+    Args:
+        router: FastAPI router instance
+        job_queue: Queue the `/proc/{name}/jobs` routes submit to
+    """
+
+    @router.get(
+        "/jobs",
+        response_model=List[JobStatus],
+        summary="List procedure jobs",
+        description="Jobs queued, running or recently finished (newest first)",
+    )
+    def list_jobs(
+        state: Optional[JobState] = Query(None, description="Only jobs in this state")
+    ) -> List[JobStatus]:
+        jobs = list(job_queue.jobs.values())
+        jobs = [job for job in jobs if state is None or job.state == state]
+        return [job.status() for job in reversed(jobs)]
+
+    @router.get(
+        "/jobs/stats",
+        response_model=Dict[str, int],
+        summary="Count procedure jobs by state",
+    )
+    def job_stats() -> Dict[str, int]:
+        return job_queue.counts()
+
+    @router.get(
+        "/jobs/{job_id}",
+        response_model=JobStatus,
+        summary="Get a procedure job",
+        description="State, timing, notices and result of a job",
+    )
+    def get_job(job_id: str) -> JobStatus:
+        job = job_queue.jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return job.status()
+
+    @router.delete(
+        "/jobs/{job_id}",
+        response_model=JobStatus,
+        summary="Cancel a procedure job",
+        description="Drop a queued job, or cancel the statement of a running one",
+    )
+    def cancel_job(job_id: str) -> JobStatus:
+        job = job_queue.cancel(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+        return job.status()
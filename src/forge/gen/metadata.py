@@ -1,5 +1,9 @@
-from typing import Dict, List, Optional
-from fastapi import APIRouter, HTTPException
+import gzip
+import hashlib
+import json
+from typing import Dict, List, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 
 from forge.gen.enum import EnumInfo
@@ -195,179 +199,237 @@ def parse_trigger_event(trig, default_schema: str) -> TriggerEventMetadata:
     )
 
 
-# --- Endpoint Functions (Refactored) ---
+# --- Prebuilt Responses ---
 
 
-def get_tables(dt_router: APIRouter, model_forge: ModelForge):
-    from fastapi.encoders import jsonable_encoder
+class PrebuiltResponse:
+    """A JSON response serialized once, with its gzip variant and ETag."""
 
+    # * Smaller bodies aren't worth the Content-Encoding overhead
+    GZIP_MIN_SIZE = 1024
+
+    def __init__(self, content: Any):
+        # * Same serialization as FastAPI's JSONResponse
+        self.body = json.dumps(
+            jsonable_encoder(content),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        self.gzipped = (
+            gzip.compress(self.body, mtime=0)
+            if len(self.body) >= self.GZIP_MIN_SIZE
+            else None
+        )
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=16).hexdigest()}"'
+
+    def respond(self, request: Request) -> Response:
+        """The response for `request` (304 if the client has it, gzip if accepted)."""
+        headers = {"ETag": self.etag, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "").split(",")
+        if self.etag in (tag.strip().removeprefix("W/") for tag in if_none_match):
+            return Response(status_code=304, headers=headers)
+        body = self.body
+        if self.gzipped is not None and _accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            body = self.gzipped
+        return Response(body, media_type="application/json", headers=headers)
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class PrebuiltMetadata:
+    """
+    The /dt responses, built and serialized once per schema.
+
+    Rebuilt whenever the ModelForge reloads, so requests only pick a prebuilt
+    body (and its gzip variant) instead of walking every cache.
+    """
+
+    def __init__(self, model_forge: ModelForge):
+        self.model_forge = model_forge
+        self.responses: Dict[Tuple[str, ...], PrebuiltResponse] = {}
+        self.rebuild()
+        model_forge.on_reload(lambda _: self.rebuild())
+
+    def rebuild(self) -> None:
+        mf = self.model_forge
+        responses: Dict[Tuple[str, ...], PrebuiltResponse] = {}
+        schemas: List[SchemaMetadata] = []
+
+        for schema in mf.include_schemas:
+            tables = {
+                name: build_table_metadata(name, table, schema)
+                for name, (table, _) in mf.schema_objects(schema, "tables").items()
+            }
+            triggers = {
+                name: build_trigger_metadata(trig, schema)
+                for name, trig in mf.schema_objects(schema, "triggers").items()
+            }
+            metadata = SchemaMetadata(
+                name=schema,
+                tables=tables,
+                views={
+                    name: build_table_metadata(name, view_table, schema)
+                    for name, (view_table, _) in mf.schema_objects(
+                        schema, "views"
+                    ).items()
+                },
+                enums={
+                    name: SimpleEnumInfo(name=enum_info.name, values=enum_info.values)
+                    for name, enum_info in mf.schema_objects(schema, "enums").items()
+                },
+                functions={
+                    name: build_function_metadata(fn)
+                    for name, fn in mf.schema_objects(schema, "functions").items()
+                },
+                procedures={
+                    name: build_function_metadata(proc)
+                    for name, proc in mf.schema_objects(schema, "procedures").items()
+                },
+                # * The schema tree uses the default event metadata
+                triggers={
+                    name: trigger.model_copy(
+                        update={
+                            "trigger_data": TriggerEventMetadata(
+                                timing="AFTER",
+                                events=["UPDATE"],
+                                table_schema=schema,
+                                table_name="",
+                            )
+                        }
+                    )
+                    for name, trigger in triggers.items()
+                },
+            )
+            schemas.append(metadata)
+
+            for kind, items in [
+                ("tables", metadata.tables),
+                ("views", metadata.views),
+                ("enums", metadata.enums),
+                ("functions", metadata.functions),
+                ("procedures", metadata.procedures),
+                ("triggers", triggers),
+            ]:
+                if items:
+                    responses[(schema, kind)] = PrebuiltResponse(list(items.values()))
+            for name, table in tables.items():
+                responses[(schema, "tables", name)] = PrebuiltResponse(table)
+
+        if schemas:
+            responses[("schemas",)] = PrebuiltResponse(schemas)
+        self.responses = responses  # * Swapped at once: readers never see a mix
+
+    def respond(self, request: Request, *key: str) -> Optional[Response]:
+        prebuilt = self.responses.get(key)
+        return prebuilt.respond(request) if prebuilt else None
+
+
+def build_trigger_metadata(trig, schema: str) -> TriggerMetadataResponse:
+    """Convert a trigger object to TriggerMetadataResponse."""
+    return TriggerMetadataResponse(
+        name=trig.name,
+        schema=trig.schema,
+        object_type=ObjectType(trig.object_type),
+        type=trig.type,
+        description=trig.description,
+        parameters=[build_function_param_metadata(p) for p in trig.parameters],
+        is_strict=trig.is_strict,
+        trigger_data=parse_trigger_event(trig, schema),
+    )
+
+
+# --- Endpoint Functions ---
+
+
+def get_tables(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/{schema}/tables", response_model=List[TableMetadata])
-    def get_tables_by_schema(schema: str):
-        tables = [
-            build_table_metadata(table.name, table, schema)
-            for table, _ in model_forge.table_cache.values()
-            if table.schema == schema
-        ]
-        if not tables:
+    def get_tables_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "tables")
+        if response is None:
             raise HTTPException(status_code=404, detail=f"Schema '{schema}' not found")
-        # This encoder will exclude fields set to None (i.e. is_pk and is_enum if not true)
-        return jsonable_encoder(tables, exclude_none=True)
+        return response
+
 
+def get_table(dt_router: APIRouter, metadata: PrebuiltMetadata):
+    @dt_router.get("/{schema}/tables/{name}", response_model=TableMetadata)
+    def get_table_by_name(schema: str, name: str, request: Request):
+        response = metadata.respond(request, schema, "tables", name)
+        if response is None:
+            raise HTTPException(
+                status_code=404, detail=f"Table '{schema}.{name}' not found"
+            )
+        return response
 
-def get_views(dt_router: APIRouter, model_forge: ModelForge):
+
+def get_views(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/{schema}/views", response_model=List[TableMetadata])
-    def get_views_by_schema(schema: str):
-        views = []
-        for key, (view_table, _) in model_forge.view_cache.items():
-            view_schema, view_name = key.split(".", 1)
-            if view_schema == schema:
-                views.append(build_table_metadata(view_name, view_table, schema))
-        if not views:
+    def get_views_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "views")
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No views found in schema '{schema}'"
             )
-        return views
+        return response
 
 
-def get_enums(dt_router: APIRouter, model_forge: ModelForge):
+def get_enums(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/{schema}/enums", response_model=List[SimpleEnumInfo])
-    def get_enums_by_schema(schema: str):
-        enums = [
-            SimpleEnumInfo(name=enum_info.name, values=enum_info.values)
-            for enum_info in model_forge.enum_cache.values()
-            if enum_info.schema == schema
-        ]
-        if not enums:
+    def get_enums_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "enums")
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No enums found in schema '{schema}'"
             )
-        return enums
+        return response
 
 
-def get_functions(dt_router: APIRouter, model_forge: ModelForge):
+def get_functions(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/{schema}/functions", response_model=List[FunctionMetadataResponse])
-    def get_fn_by_schema(schema: str):
-        functions = [
-            build_function_metadata(fn)
-            for fn in model_forge.fn_cache.values()
-            if fn.schema == schema
-        ]
-        if not functions:
+    def get_fn_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "functions")
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No functions found in schema '{schema}'"
             )
-        return functions
+        return response
 
 
-def get_procedures(dt_router: APIRouter, model_forge: ModelForge):
+def get_procedures(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get(
         "/{schema}/procedures", response_model=List[FunctionMetadataResponse]
     )
-    def get_proc_by_schema(schema: str):
-        procedures = [
-            build_function_metadata(proc)
-            for proc in model_forge.proc_cache.values()
-            if proc.schema == schema
-        ]
-        if not procedures:
+    def get_proc_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "procedures")
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No procedures found in schema '{schema}'"
             )
-        return procedures
+        return response
 
 
-def get_triggers(dt_router: APIRouter, model_forge: ModelForge):
+def get_triggers(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/{schema}/triggers", response_model=List[TriggerMetadataResponse])
-    def get_triggers_by_schema(schema: str):
-        triggers = [
-            TriggerMetadataResponse(
-                name=trig.name,
-                schema=trig.schema,
-                object_type=ObjectType(trig.object_type),
-                type=trig.type,
-                description=trig.description,
-                parameters=[build_function_param_metadata(p) for p in trig.parameters],
-                is_strict=trig.is_strict,
-                trigger_data=parse_trigger_event(trig, schema),
-            )
-            for trig in model_forge.trig_cache.values()
-            if trig.schema == schema
-        ]
-        if not triggers:
+    def get_triggers_by_schema(schema: str, request: Request):
+        response = metadata.respond(request, schema, "triggers")
+        if response is None:
             raise HTTPException(
                 status_code=404, detail=f"No triggers found in schema '{schema}'"
             )
-        return triggers
+        return response
 
 
-def get_schemas(dt_router: APIRouter, model_forge: ModelForge):
+def get_schemas(dt_router: APIRouter, metadata: PrebuiltMetadata):
     @dt_router.get("/schemas", response_model=List[SchemaMetadata])
-    def get_schemas():
-        schemas = []
-        for schema_name in model_forge.include_schemas:
-            schema_tables = {
-                key.split(".")[1]: build_table_metadata(
-                    key.split(".")[1], table_data[0], schema_name
-                )
-                for key, table_data in model_forge.table_cache.items()
-                if key.split(".")[0] == schema_name
-            }
-            schema_views = {
-                key.split(".")[1]: build_table_metadata(
-                    key.split(".")[1], view_table, schema_name
-                )
-                for key, (view_table, _) in model_forge.view_cache.items()
-                if key.split(".")[0] == schema_name
-            }
-            schema_enums = {
-                enum_name: SimpleEnumInfo(name=enum_info.name, values=enum_info.values)
-                for enum_name, enum_info in model_forge.enum_cache.items()
-                if enum_info.schema == schema_name
-            }
-            schema_functions = {
-                key.split(".")[1]: build_function_metadata(fn_metadata)
-                for key, fn_metadata in model_forge.fn_cache.items()
-                if key.split(".")[0] == schema_name
-            }
-            schema_procedures = {
-                key.split(".")[1]: build_function_metadata(proc_metadata)
-                for key, proc_metadata in model_forge.proc_cache.items()
-                if key.split(".")[0] == schema_name
-            }
-            # For triggers, we use default event metadata (as per your original code)
-            schema_triggers = {
-                key.split(".")[1]: TriggerMetadataResponse(
-                    name=trig_metadata.name,
-                    schema=trig_metadata.schema,
-                    object_type=trig_metadata.object_type,
-                    type=trig_metadata.type,
-                    description=trig_metadata.description,
-                    parameters=[
-                        build_function_param_metadata(p)
-                        for p in trig_metadata.parameters
-                    ],
-                    is_strict=trig_metadata.is_strict,
-                    trigger_data=TriggerEventMetadata(
-                        timing="AFTER",
-                        events=["UPDATE"],
-                        table_schema=schema_name,
-                        table_name="",
-                    ),
-                )
-                for key, trig_metadata in model_forge.trig_cache.items()
-                if key.split(".")[0] == schema_name
-            }
-            schemas.append(
-                SchemaMetadata(
-                    name=schema_name,
-                    tables=schema_tables,
-                    views=schema_views,
-                    enums=schema_enums,
-                    functions=schema_functions,
-                    procedures=schema_procedures,
-                    triggers=schema_triggers,
-                )
-            )
-        if not schemas:
+    def get_schemas(request: Request):
+        response = metadata.respond(request, "schemas")
+        if response is None:
             raise HTTPException(status_code=404, detail="No schemas found")
-        return schemas
+        return response
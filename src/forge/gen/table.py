@@ -6,6 +6,10 @@ from sqlalchemy.orm import DeclarativeBase, declared_attr
 from sqlalchemy.ext.declarative import declared_attr
 
 from forge.gen import CRUD
+from forge.tools.coalesce import WriteCoalescer
+from forge.tools.entity_cache import EntityCache
+from forge.tools.relations import FKGraph
+from forge.tools.resident import ResidentTable
 from forge.tools.sql_mapping import ArrayType, JSONBType, get_eq_type
 
 from typing import *
@@ -134,7 +138,13 @@ def gen_table_crud(
     table_data: Tuple[Table, Tuple[Type[BaseModel], Type[BaseSQLModel]]],
     router: APIRouter,
     db_dependency: Callable,
-) -> None:
+    coalescer: Optional[WriteCoalescer] = None,
+    read_dependency: Optional[Callable] = None,
+    fk_graph: Optional[FKGraph] = None,
+    related_handlers: Optional[Dict[str, CRUD]] = None,
+    entity_cache: Optional[EntityCache] = None,
+    resident: Optional[ResidentTable] = None,
+) -> CRUD:
     """
     Generate CRUD routes for a database table.
 
@@ -142,14 +152,31 @@ def gen_table_crud(
         table_data: Tuple containing (Table, (PydanticModel, SQLAlchemyModel))
         router: FastAPI router instance
         db_dependency: Database session dependency
+        coalescer: Optional write coalescer used by the create route
+        read_dependency: Session dependency for the read route (defaults to db_dependency)
+        fk_graph: Foreign-key graph, enables `?expand=` on the read route
+        related_handlers: CRUD handlers by table key, to serialize expanded rows
+        entity_cache: Optional cache of records for the primary key routes
+        resident: Optional in-memory copy of the table for the read route
         tags: Optional list of tags for the routes
         prefix: Optional prefix for the routes
+
+    Returns:
+        The CRUD handler, so its operations can be reused (e.g. by batch routes)
     """
     table, (pydantic_model, sqlalchemy_model) = table_data
-    CRUD(
+    crud = CRUD(
         table=table,
         pydantic_model=pydantic_model,
         sqlalchemy_model=sqlalchemy_model,
         router=router,
         db_dependency=db_dependency,
-    ).generate_all()
+        coalescer=coalescer,
+        read_dependency=read_dependency,
+        fk_graph=fk_graph,
+        related_handlers=related_handlers,
+        entity_cache=entity_cache,
+        resident=resident,
+    )
+    crud.generate_all()
+    return crud
@@ -1,10 +1,24 @@
 import json
-from typing import Callable, Dict, List, Optional, Type, Any, Tuple
-from fastapi import APIRouter, Depends
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Type, Any, Tuple, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field, ConfigDict, create_model
-from sqlalchemy import Table, MetaData, Engine, inspect, text
+from sqlalchemy import Table, MetaData, Engine, inspect, select
 from sqlalchemy.orm import Session
 
+from forge.tools.db import run_db
+from forge.tools.matview import (
+    MaterializedView,
+    MatViewStatus,
+    RefreshInProgress,
+    matview_names,
+)
+from forge.tools.query import (
+    OPTION_NAMES,
+    QueryBuilder,
+    fields_model,
+    options_model,
+)
 from forge.tools.sql_mapping import get_eq_type, JSONBType, ArrayType
 
 
@@ -31,8 +45,7 @@ def create_view_model(
     sample_data = {}
     try:
         with next(db_dependency()) as db:
-            query = f"SELECT * FROM {schema}.{view_table.name} LIMIT 1"
-            result = db.execute(text(query)).first()
+            result = db.execute(select(view_table).limit(1)).first()
             if result:
                 sample_data = dict(result._mapping)
     except Exception as e:
@@ -111,8 +124,12 @@ def load_views(
         if schema not in include_schemas:
             continue
 
+        inspector = inspect(engine)
+        # * Materialized views are read like plain ones (see `MaterializedView`)
+        names = set(inspector.get_view_names(schema=schema))
+        names.update(matview_names(inspector, schema))
         for table in metadata.tables.values():
-            if table.name in inspect(engine).get_view_names(schema=schema):
+            if table.schema == schema and table.name in names:
                 query_model, result_model = create_view_model(
                     table, schema, db_dependency
                 )
@@ -130,7 +147,10 @@ def gen_view_route(
     table_data: Tuple[Table, Tuple[Type[BaseModel], Type[BaseModel]]],
     router: APIRouter,
     db_dependency: Callable,
-) -> None:
+    executor: Optional[Executor] = None,
+    matview: Optional[MaterializedView] = None,
+    refresh_dependency: Optional[Callable] = None,
+) -> Callable[[Session, Dict[str, Any]], List[BaseModel]]:
     """
     Generate FastAPI route for a database view.
 
@@ -138,98 +158,153 @@ def gen_view_route(
         table_data: Tuple containing (Table, (QueryModel, ResponseModel))
         router: FastAPI router instance
         db_dependency: Database session dependency
+        executor: Thread pool for the (blocking) sync session queries
+        matview: Refresh state, if the view is materialized (adds `/refresh`)
+        refresh_dependency: Session dependency for the refresh (on the primary)
+
+    Returns:
+        A `(db, filters) -> records` runner for the view (used by the fan-out route)
     """
     table, (query_model, response_model) = table_data
     schema = table.schema
     view_name = table.name
+    builder = QueryBuilder(table)
+    options_params = options_model(table, f"View_{view_name}")
 
     @router.get(
         f"/{view_name}",
-        response_model=List[response_model],
+        # * Projected records (fields) only carry the requested columns
+        response_model=List[Union[response_model, fields_model(response_model)]],
+        response_model_exclude_unset=True,
         # tags=[f"{schema.upper()} Views"],
         summary=f"Get {view_name} view data",
-        description=f"Retrieve records from the {view_name} view with optional filtering",
+        description=f"Retrieve records from the {view_name} view with optional filtering, "
+        "ordering, paging (limit & offset) and projection (fields)",
     )
     async def get_view_data(
         db: Session = Depends(db_dependency),
         filters: query_model = Depends(),
+        options: options_params = Depends(),
     ) -> List[response_model]:
-        # Build query with filters
-        query_parts = [f"SELECT * FROM {schema}.{table.name}"]
-        params = {}
-
-        # Handle filters
-        filter_conditions = []
-        for field_name, value in filters.model_dump(exclude_unset=True).items():
-            if value is not None:
-                column = getattr(table.c, field_name)
-                if isinstance(get_eq_type(str(column.type)), (JSONBType, ArrayType)):
-                    continue
-                else:
-                    param_name = f"param_{field_name}"
-                    filter_conditions.append(f"{field_name} = :{param_name}")
-                    params[param_name] = value
-
-        if filter_conditions:
-            query_parts.append("WHERE " + " AND ".join(filter_conditions))
-
-        # Execute query
-        result = db.execute(text(" ".join(query_parts)), params)
-
-        # Process results
-        processed_records = []
-        for row in result:
-            record_dict = dict(row._mapping)
-            processed_record = {}
-
-            # Process each column value
-            for column_name, value in record_dict.items():
-                column = table.c[column_name]
-                field_type = get_eq_type(str(column.type), value)
-
-                if isinstance(field_type, JSONBType):
-                    if value is not None:
-                        # Parse JSONB data
-                        if isinstance(value, str):
-                            json_data = json.loads(value)
-                        else:
-                            json_data = value
-                        processed_record[column_name] = json_data
+        records = await run_db(
+            db,
+            _query_view,
+            table=table,
+            response_model=response_model,
+            filters_dict=filters.model_dump(exclude_unset=True),
+            builder=builder,
+            options=options.model_dump(),
+            executor=executor,
+        )
+        return records
+
+    if matview is not None:
+
+        @router.post(
+            f"/{view_name}/refresh",
+            response_model=MatViewStatus,
+            summary=f"Refresh the {view_name} materialized view",
+            description="REFRESH MATERIALIZED VIEW (CONCURRENTLY when the view has "
+            "a unique index and is populated); 409 if a refresh is already running",
+        )
+        async def refresh_view(
+            db: Session = Depends(refresh_dependency or db_dependency),
+            concurrently: bool = Query(True, description="Don't block readers"),
+        ) -> MatViewStatus:
+            try:
+                return await run_db(
+                    db, matview.refresh, concurrently=concurrently, executor=executor
+                )
+            except RefreshInProgress as e:
+                raise HTTPException(status_code=409, detail=str(e))
+
+    def run_view(db: Session, filters: Dict[str, Any]) -> List[BaseModel]:
+        options = {k: filters[k] for k in OPTION_NAMES if k in filters}
+        return _query_view(
+            db,
+            table=table,
+            response_model=response_model,
+            builder=builder,
+            filters_dict=query_model.model_validate(filters).model_dump(
+                exclude_unset=True
+            ),
+            options=options_params.model_validate(options).model_dump(),
+        )
+
+    return run_view
+
+
+def _query_view(
+    db: Session,
+    table: Table,
+    response_model: Type[BaseModel],
+    filters_dict: Dict[str, Any],
+    builder: Optional[QueryBuilder] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """
+    Query a view with equality filters and the read options, validating the rows.
+
+    With a `fields` option the records are dicts of only those columns.
+    """
+    builder = builder or QueryBuilder(table)
+    statement, params = builder.build(filters_dict, options)
+    result = db.execute(statement, params)
+    fields = builder.fields((options or {}).get("fields"))
+
+    # Process results
+    processed_records = []
+    for row in result:
+        record_dict = dict(row._mapping)
+        processed_record = {}
+
+        # Process each column value
+        for column_name, value in record_dict.items():
+            column = table.c[column_name]
+            field_type = get_eq_type(str(column.type), value)
+
+            if isinstance(field_type, JSONBType):
+                if value is not None:
+                    # Parse JSONB data
+                    if isinstance(value, str):
+                        json_data = json.loads(value)
                     else:
-                        processed_record[column_name] = None
-                elif isinstance(field_type, ArrayType):
-                    if value is not None:
-                        if isinstance(value, str):
-                            cleaned_value = value.strip("{}").split(",")
-                            processed_record[column_name] = [
-                                field_type.item_type(item.strip('"'))
-                                for item in cleaned_value
-                                if item.strip()
-                            ]
-                        elif isinstance(value, list):
-                            processed_record[column_name] = [
-                                field_type.item_type(item)
-                                for item in value
-                                if item is not None
-                            ]
-                        else:
-                            processed_record[column_name] = value
+                        json_data = value
+                    processed_record[column_name] = json_data
+                else:
+                    processed_record[column_name] = None
+            elif isinstance(field_type, ArrayType):
+                if value is not None:
+                    if isinstance(value, str):
+                        cleaned_value = value.strip("{}").split(",")
+                        processed_record[column_name] = [
+                            field_type.item_type(item.strip('"'))
+                            for item in cleaned_value
+                            if item.strip()
+                        ]
+                    elif isinstance(value, list):
+                        processed_record[column_name] = [
+                            field_type.item_type(item)
+                            for item in value
+                            if item is not None
+                        ]
                     else:
-                        processed_record[column_name] = []
+                        processed_record[column_name] = value
                 else:
-                    processed_record[column_name] = value
-
-            processed_records.append(processed_record)
+                    processed_record[column_name] = []
+            else:
+                processed_record[column_name] = value
+
+        processed_records.append(processed_record)
+
+    # Validate records using the response model
+    validated_records = []
+    for record in processed_records:
+        validated_record = response_model.model_validate(record)
+        validated_records.append(
+            validated_record.model_dump(include=set(fields))
+            if fields
+            else validated_record
+        )
 
-        # Validate records using the response model
-        validated_records = []
-        for record in processed_records:
-            try:
-                validated_record = response_model.model_validate(record)
-                validated_records.append(validated_record)
-            except Exception as e:
-                print(f"Validation error for record in {table.name}: {record}")
-                print(f"Error: {str(e)}")
-                raise
-
-        return validated_records
+    return validated_records
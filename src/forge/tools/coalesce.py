@@ -0,0 +1,177 @@
+"""
+WriteCoalescer: micro-batching of single-row inserts.
+
+Concurrent `create` requests on a table are collected for up to `max_delay_ms`
+(or `max_batch` rows) and written with one multi-row INSERT in one transaction.
+Each request waits until that transaction commits and gets its own row back.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from sqlalchemy import Table, insert
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import Session
+
+from forge.core.logging import yellow
+from forge.tools.tenant import current_tenant
+from forge.tools.timeout import StatementTimeout
+
+
+class CoalesceConfig(BaseModel):
+    """Write coalescing configuration for a table."""
+
+    max_delay_ms: float = Field(default=5.0, gt=0, description="Max wait per batch")
+    max_batch: int = Field(default=100, ge=1, description="Max rows per batch")
+    timeout: float = Field(
+        default=30.0, gt=0, description="Max seconds a request waits for its row"
+    )
+
+
+class WriteCoalescer:
+    """Collect concurrent inserts on a table and flush them as one transaction."""
+
+    def __init__(
+        self,
+        table: Table,
+        session_factory: Callable[[], Session],
+        config: CoalesceConfig = CoalesceConfig(),
+    ):
+        self.table = table
+        self.session_factory = session_factory
+        self.config = config
+        # * Called with each flush's session & inserted rows, before it commits
+        # * (e.g. to invalidate the cached copies of the table)
+        self.on_insert: Optional[Callable[[Session, List[Any]], None]] = None
+        self._queue: "queue.Queue[Tuple[Dict[str, Any], Future, Any]]" = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name=f"coalesce-{table.name}", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, data: Dict[str, Any]) -> Future:
+        """Queue a row for insertion; the future resolves to the inserted row."""
+        future: Future = Future()
+        self._queue.put((data, future, current_tenant.get()))
+        return future
+
+    def insert(self, data: Dict[str, Any]) -> Any:
+        """
+        Insert a row through the coalescer, blocking until it is committed.
+
+        Raises StatementTimeout after `config.timeout` seconds (the row is dropped
+        if its batch hasn't started yet, otherwise it may still be committed).
+        """
+        future = self.submit(data)
+        try:
+            return future.result(timeout=self.config.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise StatementTimeout(self.config.timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]  # * Block until the first row arrives
+            try:
+                self._run_batch(batch)
+            except Exception as e:  # * Never let the worker die
+                print(
+                    f"{yellow('Coalescer')} {self.table.name} {yellow('failed:')} {e}"
+                )
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _run_batch(self, batch: List[Tuple[Dict[str, Any], Future, Any]]) -> None:
+        """Collect more rows (until the deadline) and flush them by tenant."""
+        deadline = time.monotonic() + self.config.max_delay_ms / 1000
+        while len(batch) < self.config.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # * Claim the futures: requests cancelled meanwhile (e.g. the client
+        # * left) are skipped, and claimed ones can't be cancelled anymore
+        batch[:] = [row for row in batch if row[1].set_running_or_notify_cancel()]
+        # * Rows of different tenants go to different schemas (and transactions)
+        by_tenant: Dict[Any, List[Tuple[Dict[str, Any], Future]]] = {}
+        for data, future, tenant in batch:
+            by_tenant.setdefault(tenant, []).append((data, future))
+        for tenant, rows in by_tenant.items():
+            token = current_tenant.set(tenant)
+            try:
+                self._flush(rows)
+            finally:
+                current_tenant.reset(token)
+
+    def _flush(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        """Write a batch in one transaction, resolving every request's future."""
+        try:
+            with self.session_factory() as session:
+                rows = self._insert_batch(session, [data for data, _ in batch])
+                if self.on_insert:
+                    self.on_insert(session, rows)
+                session.commit()
+        except Exception:
+            # * Something in the batch failed: isolate the failing rows
+            self._flush_isolated(batch)
+            return
+
+        for (_, future), row in zip(batch, rows):
+            future.set_result(row)
+
+    def _insert_batch(self, session: Session, records: List[Dict[str, Any]]) -> List:
+        """Insert records (grouped by column set) and return rows in input order."""
+        rows: List[Any] = [None] * len(records)
+        groups: Dict[Tuple[str, ...], List[int]] = {}
+        for i, record in enumerate(records):
+            groups.setdefault(tuple(record), []).append(i)
+
+        for positions in groups.values():
+            params = [records[i] for i in positions]
+            try:
+                result = session.execute(
+                    insert(self.table).returning(
+                        *self.table.columns, sort_by_parameter_order=True
+                    ),
+                    params,
+                )
+                group_rows = result.all()
+            except InvalidRequestError:
+                # * The dialect can't guarantee RETURNING order for this table,
+                # * so insert row by row (still one connection and one commit)
+                stmt = insert(self.table).returning(*self.table.columns)
+                group_rows = [session.execute(stmt, p).one() for p in params]
+            for i, row in zip(positions, group_rows):
+                rows[i] = row
+        return rows
+
+    def _flush_isolated(self, batch: List[Tuple[Dict[str, Any], Future]]) -> None:
+        """Insert each row in its own savepoint so one bad row fails only itself."""
+        stmt = insert(self.table).returning(*self.table.columns)
+        try:
+            with self.session_factory() as session:
+                outcomes = []
+                for data, _ in batch:
+                    try:
+                        with session.begin_nested():
+                            outcomes.append((True, session.execute(stmt, data).one()))
+                    except Exception as e:
+                        outcomes.append((False, e))
+                if self.on_insert:
+                    self.on_insert(session, [row for ok, row in outcomes if ok])
+                session.commit()
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), (ok, outcome) in zip(batch, outcomes):
+            future.set_result(outcome) if ok else future.set_exception(outcome)
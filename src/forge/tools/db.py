@@ -1,12 +1,50 @@
 from sqlalchemy import CursorResult, Inspector, MetaData, Table, inspect, text
 from sqlalchemy.engine import Engine, create_engine
 from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.ext.automap import automap_base
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Dict, Generator, List, Optional, Type, Union
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr, model_validator
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from enum import Enum
 from contextlib import contextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor
+import asyncio
+import contextvars
+import functools
+import inspect as pyinspect
+import itertools
+import re
+import threading
+import time
 from forge.core.logging import bold, italic, gray, green, red, yellow
+from forge.tools.pool import (
+    PoolMetrics,
+    validate_idle,
+    validate_idle_async,
+    warm_up,
+    warm_up_async,
+)
+from forge.tools.entity_cache import install_invalidation
+from forge.tools.matview import matview_names
+from forge.tools.relations import FKGraph
+from forge.tools.tenant import current_tenant
+from forge.tools.timeout import install_timeouts, watch_engine
 
 
 class DBType(str, Enum):
@@ -25,6 +63,13 @@ class DriverType(str, Enum):
     ASYNC = "async"
 
 
+class ReplicaStrategy(str, Enum):
+    """How reads are spread over the replicas."""
+
+    ROUND_ROBIN = "round_robin"
+    LEAST_BUSY = "least_busy"  # * Fewest checked-out connections
+
+
 class PoolConfig(BaseModel):
     """Database connection pool configuration."""
 
@@ -33,6 +78,11 @@ class PoolConfig(BaseModel):
     pool_timeout: int = 30
     pool_recycle: int = 1800
     pool_pre_ping: bool = True
+    # * Forge options (not passed to SQLAlchemy)
+    warm_up: bool = False  # * Open `pool_size` connections at startup
+    # ^ Ping idle connections every N seconds in the background: an alternative
+    # ^ to pool_pre_ping that keeps checkouts free of round trips (turns it off)
+    validate_interval: Optional[float] = None
 
     model_config = ConfigDict(
         json_schema_extra={
@@ -46,6 +96,64 @@ class PoolConfig(BaseModel):
         }
     )
 
+    @model_validator(mode="after")
+    def _check_validation(self) -> "PoolConfig":
+        if self.validate_interval:
+            if self.pool_pre_ping and "pool_pre_ping" in self.model_fields_set:
+                raise ValueError("Set either 'pool_pre_ping' or 'validate_interval'")
+            self.pool_pre_ping = False
+        return self
+
+    def engine_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments for `create_engine` (without the Forge options)."""
+        return self.model_dump(exclude={"warm_up", "validate_interval"})
+
+
+class ReplicaConfig(BaseModel):
+    """Read replica endpoint (unset fields are taken from the primary config)."""
+
+    host: Optional[str] = None
+    port: Optional[int] = None
+    database: Optional[str] = None
+    user: Optional[str] = None
+    password: Optional[str] = None
+    pool_config: Optional[PoolConfig] = Field(default_factory=PoolConfig)
+
+
+class TenancyConfig(BaseModel):
+    """Schema-per-tenant configuration (every tenant schema mirrors the template)."""
+
+    template_schema: str = Field(..., description="Schema the routes are built from")
+    tenants: Optional[List[str]] = Field(default=None, description="Tenant schemas")
+    tenant_pattern: Optional[str] = Field(
+        default=None,
+        description="Regex matching the tenant schemas (e.g. 'tenant_\\w+')",
+    )
+    header: Optional[str] = Field(
+        default="X-Tenant", description="Request header naming the tenant"
+    )
+    path: bool = Field(
+        default=False,
+        description="Resolve the tenant from the first path segment "
+        "('/acme/users' is served by the '/<template>/users' route)",
+    )
+    # ^ Tenants with their own connection pool (the others share the main one)
+    dedicated_pools: Dict[str, PoolConfig] = Field(default_factory=dict)
+
+    @model_validator(mode="after")
+    def _check_tenants(self) -> "TenancyConfig":
+        if self.tenants is None and self.tenant_pattern is None:
+            raise ValueError("Set 'tenants' or 'tenant_pattern'")
+        return self
+
+    def matches(self, schema: str) -> bool:
+        """Whether `schema` is a tenant schema (by name; not checked in the database)."""
+        if schema == self.template_schema:
+            return False
+        if self.tenants is not None and schema in self.tenants:
+            return True
+        return bool(self.tenant_pattern and re.fullmatch(self.tenant_pattern, schema))
+
 
 class DBConfig(BaseModel):
     """Enhanced database configuration with connection pooling."""
@@ -61,6 +169,19 @@ class DBConfig(BaseModel):
     pool_config: Optional[PoolConfig] = Field(default_factory=PoolConfig)
     schema_exclude: List[str] = Field(default=["information_schema", "pg_catalog"])
     ssl_mode: Optional[str] = None  # * idk if this is the right place for this
+    replicas: List[ReplicaConfig] = Field(default_factory=list)
+    replica_strategy: Union[ReplicaStrategy, str] = ReplicaStrategy.ROUND_ROBIN
+    # ^ Replicas lagging more than this (seconds) are skipped (None: no lag checks)
+    max_replica_lag: Optional[float] = None
+    replica_lag_interval: float = 5.0  # * Seconds between replica lag checks
+    # ^ Default time limit (seconds) for the statements of the generated routes
+    statement_timeout: Optional[float] = None
+    # ^ Server-side prepared statements kept per connection (asyncpg; 0 disables)
+    prepared_statement_cache_size: int = 100
+    tenancy: Optional[TenancyConfig] = None  # * Schema-per-tenant routing
+    # ^ Serve reads (GET routes, views, non-volatile fns) on AUTOCOMMIT sessions:
+    # ^ no BEGIN/ROLLBACK round trips and no transaction bookkeeping per request
+    autocommit_reads: bool = True
 
     model_config = ConfigDict(use_enum_values=True)
 
@@ -79,7 +200,7 @@ class DBConfig(BaseModel):
     def url(self) -> str:
         """Generate database URL based on configuration."""
         if self.db_type == DBType.SQLITE:
-            return f"sqlite:///{self.database}"
+            return f"sqlite{self._get_driver()}:///{self.database}"
 
         if self.db_type in (DBType.POSTGRESQL, DBType.MYSQL, DBType.MSSQL):
             if not all([self.user, self.password, self.host]):
@@ -95,6 +216,22 @@ class DBConfig(BaseModel):
 
         raise ValueError(f"Unsupported database type: {self.db_type}")
 
+    def replica_config(self, index: int) -> "DBConfig":
+        """Config of the replica at `index` (inherits everything it doesn't set)."""
+        replica = self.replicas[index]
+        return self.model_copy(
+            update={
+                **replica.model_dump(exclude_none=True, exclude={"pool_config"}),
+                "pool_config": replica.pool_config,
+                "replicas": [],
+            }
+        )
+
+    @property
+    def sync_url(self) -> str:
+        """Database URL using the sync driver (used for reflection and introspection)."""
+        return self.model_copy(update={"driver_type": DriverType.SYNC}).url
+
     def _get_driver(self) -> str:
         """Get appropriate database driver based on configuration."""
         match self.db_type:
@@ -109,11 +246,22 @@ class DBConfig(BaseModel):
             case DBType.MSSQL:
                 return "+pytds" if self.driver_type == DriverType.ASYNC else "+pyodbc"
             case DBType.SQLITE:
-                return ""
+                return "+aiosqlite" if self.driver_type == DriverType.ASYNC else ""
             case _:
                 return ""
 
 
+class ForgeSession(Session):
+    """
+    Session whose transactions get a statement timeout (see `forge.tools.timeout`)
+    and apply their entity cache invalidations on commit (`forge.tools.entity_cache`).
+    """
+
+
+install_timeouts(ForgeSession)
+install_invalidation(ForgeSession)
+
+
 class DBForge(BaseModel):
     """Enhanced database management with extended functionality."""
 
@@ -121,29 +269,168 @@ class DBForge(BaseModel):
     engine: Engine = Field(default=None)
     metadata: MetaData = Field(default_factory=MetaData)
     Base: Type[DeclarativeBase] = Field(default_factory=automap_base)
+    # * Foreign keys of the reflected tables (forward & reverse), built on load
+    fk_graph: FKGraph = Field(default_factory=FKGraph)
     SessionLocal: sessionmaker = Field(default=None)
+    ReadSessionLocal: sessionmaker = Field(default=None)  # * Reads on the primary
+    # ^ Only set when the config uses DriverType.ASYNC
+    async_engine: Optional[AsyncEngine] = Field(default=None)
+    AsyncSessionLocal: Optional[async_sessionmaker] = Field(default=None)
+    AsyncReadSessionLocal: Optional[async_sessionmaker] = Field(default=None)
+    # * Read replicas (same order as `config.replicas`; their sessions are read-only)
+    replica_engines: List[Engine] = Field(default_factory=list)
+    ReplicaSessions: List[sessionmaker] = Field(default_factory=list)
+    async_replica_engines: List[AsyncEngine] = Field(default_factory=list)
+    AsyncReplicaSessions: List[async_sessionmaker] = Field(default_factory=list)
+    # ^ Last measured lag (seconds) by replica index (None: replica unreachable)
+    replica_lag: Dict[int, Optional[float]] = Field(default_factory=dict)
+    # * Pool metrics by engine name ('primary', 'replica-0'...). With an async driver
+    # * the sync engine next to each async one is tracked as '<name>-introspection'
+    pool_metrics: Dict[str, PoolMetrics] = Field(default_factory=dict)
+
+    # * Tenant binds: shared-pool engine views and dedicated engines, by tenant
+    tenant_engines: Dict[str, Union[Engine, AsyncEngine]] = Field(default_factory=dict)
+    # * Pools of background work (e.g. 'jobs'), apart from the routes' pools
+    background_engines: Dict[str, Engine] = Field(default_factory=dict)
+
+    _replica_counter: Any = PrivateAttr(default_factory=itertools.count)
+    _tenant_binds: Dict[Any, Any] = PrivateAttr(default_factory=dict)
+    _tenant_lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _schemas: Any = PrivateAttr(default=(0.0, frozenset()))  # * (checked at, names)
+    _pools_warm: Any = PrivateAttr(default_factory=threading.Event)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     def __init__(self, **data):
         super().__init__(**data)
         self.engine = self._create_engine()
-        self.SessionLocal = sessionmaker(
-            autocommit=False, autoflush=False, bind=self.engine
-        )
+        self.SessionLocal = self._create_sessionmaker(self.engine)
+        self.ReadSessionLocal = self._create_sessionmaker(self.engine, read_only=True)
+        if self.is_async:
+            self.async_engine = self._create_async_engine()
+            self.AsyncSessionLocal = self._create_sessionmaker(self.async_engine)
+            self.AsyncReadSessionLocal = self._create_sessionmaker(
+                self.async_engine, read_only=True
+            )
+        for i in range(len(self.config.replicas)):
+            config, name = self.config.replica_config(i), f"replica-{i}"
+            self.replica_engines.append(self._create_engine(config, name))
+            self.ReplicaSessions.append(
+                self._create_sessionmaker(self.replica_engines[i], read_only=True)
+            )
+            if self.is_async:
+                self.async_replica_engines.append(
+                    self._create_async_engine(config, name)
+                )
+                self.AsyncReplicaSessions.append(
+                    self._create_sessionmaker(
+                        self.async_replica_engines[i], read_only=True
+                    )
+                )
+        if self.replica_engines and self.config.max_replica_lag is not None:
+            self.check_replica_lag()
+            threading.Thread(
+                target=self._monitor_replica_lag, name="forge-replica-lag", daemon=True
+            ).start()
+        if not any(c.warm_up for _, _, c in self.serving_pools()):
+            self._pools_warm.set()
+        if not self.is_async and self.maintains_pools:
+            # * Async pools belong to the app's event loop: see maintain_pools_async
+            threading.Thread(
+                target=self._maintain_pools, name="forge-pool-maintenance", daemon=True
+            ).start()
         # self._test_connection()  # * Uncomment to test connection on initialization
         self._load_metadata()
 
-    def _create_engine(self) -> Engine:
-        """Create SQLAlchemy engine with connection pooling."""
-        pool_kwargs = (
-            self.config.pool_config.model_dump() if self.config.pool_config else {}
+    @property
+    def is_async(self) -> bool:
+        """Whether the configured driver is async (asyncpg, aiomysql, aiosqlite...)."""
+        return self.config.driver_type == DriverType.ASYNC
+
+    @property
+    def db_dependency(self) -> Callable:
+        """Session dependency for the generated routes (async if the driver is)."""
+        return self.get_async_db if self.is_async else self.get_db
+
+    @property
+    def read_dependency(self) -> Callable:
+        """Session dependency for read-only routes (see `get_read_db`)."""
+        return self.get_async_read_db if self.is_async else self.get_read_db
+
+    def _create_engine(
+        self,
+        config: Optional[DBConfig] = None,
+        name: str = "primary",
+        background: bool = False,
+    ) -> Engine:
+        """
+        Create SQLAlchemy engine with connection pooling.
+
+        Always sync: reflection and introspection run on it, even for async configs
+        (`background` engines are sync by design, so they keep their name).
+        """
+        config = config or self.config
+        pool_kwargs = config.pool_config.engine_kwargs() if config.pool_config else {}
+        metrics = PoolMetrics()
+        engine = create_engine(
+            config.sync_url,
+            echo=config.echo,  # ^ Uncomment for verbose logging
+            poolclass=metrics.pool_class(config.sync_url),
+            **pool_kwargs,
         )
-        return create_engine(
-            self.config.url,
-            echo=self.config.echo,  # ^ Uncomment for verbose logging
+        metrics.attach(engine)
+        watch_engine(engine)
+        introspection = self.is_async and not background
+        self.pool_metrics[f"{name}-introspection" if introspection else name] = metrics
+        return engine
+
+    def _create_async_engine(
+        self, config: Optional[DBConfig] = None, name: str = "primary"
+    ) -> AsyncEngine:
+        """Create the async SQLAlchemy engine used by the generated routes."""
+        config = config or self.config
+        pool_kwargs = config.pool_config.engine_kwargs() if config.pool_config else {}
+        metrics = PoolMetrics()
+        connect_args = {}
+        if config.db_type == DBType.POSTGRESQL:  # * asyncpg prepares statements
+            connect_args["prepared_statement_cache_size"] = (
+                config.prepared_statement_cache_size
+            )
+        engine = create_async_engine(
+            config.url,
+            echo=config.echo,
+            poolclass=metrics.pool_class(config.url),
+            connect_args=connect_args,
             **pool_kwargs,
         )
+        metrics.attach(engine.sync_engine)
+        watch_engine(engine.sync_engine)
+        self.pool_metrics[name] = metrics
+        return engine
+
+    def _create_sessionmaker(
+        self, engine: Union[Engine, AsyncEngine], read_only: bool = False
+    ) -> Union[sessionmaker, async_sessionmaker]:
+        """
+        Session factory for an engine, with the default statement timeout.
+
+        `read_only` factories run in AUTOCOMMIT (if `autocommit_reads` is set), on
+        the same pool: the connection isolation level is reset on checkin.
+        """
+        info = {"statement_timeout": self.config.statement_timeout}
+        if read_only and self.config.autocommit_reads:
+            engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        if isinstance(engine, AsyncEngine):
+            return async_sessionmaker(
+                bind=engine, autoflush=False, sync_session_class=ForgeSession, info=info
+            )
+        return sessionmaker(
+            autocommit=False,
+            autoflush=False,
+            bind=engine,
+            class_=ForgeSession,
+            info=info,
+        )
 
     def _test_connection(self) -> None:
         """Test database connection and log connection info."""
@@ -160,6 +447,12 @@ class DBForge(BaseModel):
             raise
         print()
 
+    def reload_metadata(self) -> None:
+        """Forget the reflected metadata and reflect the database again."""
+        self.metadata.clear()
+        self._schemas = (0.0, frozenset())
+        self._load_metadata()
+
     def _load_metadata(self) -> None:
         """Enhanced metadata loading with schema filtering and error handling."""
         inspector: Inspector = inspect(self.engine)
@@ -170,13 +463,16 @@ class DBForge(BaseModel):
 
         self.Base = Base  # Store the actual base class, not the DeclarativeBase
 
-        # Load tables and views into metadata
+        # Load tables, views and materialized views into metadata
         # # todo: Change this to filter the schemas depending on...
         # # todo: User permissions or configuration settings...
-        # # * To enable some kind of MULTI-TENANCY support
-        for schema in sorted(
-            set(inspector.get_schema_names()) - set(self.config.schema_exclude)
-        ):
+        # * Tenant schemas mirror the template, so only the template is reflected
+        tenancy = self.config.tenancy
+        schema_names = inspector.get_schema_names()
+        self._schemas = (time.monotonic(), frozenset(schema_names))
+        for schema in sorted(set(schema_names) - set(self.config.schema_exclude)):
+            if tenancy and tenancy.matches(schema):
+                continue
             [
                 Table(t, self.metadata, autoload_with=self.engine, schema=schema)
                 for t in inspector.get_table_names(schema=schema)
@@ -185,6 +481,11 @@ class DBForge(BaseModel):
                 Table(v, self.metadata, autoload_with=self.engine, schema=schema)
                 for v in inspector.get_view_names(schema=schema)
             ]
+            [
+                Table(m, self.metadata, autoload_with=self.engine, schema=schema)
+                for m in matview_names(inspector, schema)
+            ]
+        self.fk_graph = FKGraph.from_metadata(self.metadata)
 
         # self.Base.prepare(self.engine, reflect=True)
 
@@ -205,27 +506,316 @@ class DBForge(BaseModel):
     def get_db(self) -> Generator[Session, None, None]:
         """Generator for database sessions (FastAPI dependency)."""
         # todo: Add typing to the generator
-        db = self.SessionLocal()
+        db = self.new_session(self.SessionLocal)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def create_executor(self) -> ThreadPoolExecutor:
+        """Thread pool for blocking DB work, sized to the connection pool."""
+        pool = self.config.pool_config or PoolConfig()
+        return ThreadPoolExecutor(
+            max_workers=pool.pool_size + pool.max_overflow,
+            thread_name_prefix="forge-db",
+        )
+
+    async def get_async_db(self) -> AsyncGenerator[AsyncSession, None]:
+        """Async generator for database sessions (FastAPI dependency)."""
+        async with self.new_session(self.AsyncSessionLocal) as db:
+            yield db
+
+    def pick_replica(self) -> Optional[int]:
+        """
+        Index of the replica that should serve the next read.
+
+        Returns None (read from the primary) when there are no replicas or all of
+        them lag more than `max_replica_lag`.
+        """
+        candidates = [
+            i
+            for i in range(len(self.replica_engines))
+            if self.config.max_replica_lag is None
+            or (
+                self.replica_lag.get(i) is not None
+                and self.replica_lag[i] <= self.config.max_replica_lag
+            )
+        ]
+        if not candidates:
+            return None
+        if self.config.replica_strategy == ReplicaStrategy.LEAST_BUSY:
+            return min(
+                candidates, key=lambda i: self.pool_metrics[f"replica-{i}"].in_use()
+            )
+        return candidates[next(self._replica_counter) % len(candidates)]
+
+    def read_sessionmaker(self) -> Union[sessionmaker, async_sessionmaker]:
+        """Session factory for a read (replica or primary, matching the driver)."""
+        replica = self.pick_replica()
+        if self.is_async:
+            if replica is None:
+                return self.AsyncReadSessionLocal
+            return self.AsyncReplicaSessions[replica]
+        if replica is None:
+            return self.ReadSessionLocal
+        return self.ReplicaSessions[replica]
+
+    def get_read_db(self) -> Generator[Session, None, None]:
+        """
+        Generator for read-only sessions (FastAPI dependency).
+
+        Served by a replica if any is configured, on an AUTOCOMMIT connection
+        unless `autocommit_reads` is disabled.
+        """
+        db = self.new_session(self.read_sessionmaker())
         try:
             yield db
         finally:
             db.close()
 
+    async def get_async_read_db(self) -> AsyncGenerator[AsyncSession, None]:
+        """Async generator for read-only sessions (see `get_read_db`)."""
+        async with self.new_session(self.read_sessionmaker()) as db:
+            yield db
+
+    def background_sessionmaker(
+        self, name: str, pool_config: PoolConfig, autocommit: bool = False
+    ) -> sessionmaker:
+        """
+        Sync session factory on a pool of its own, named `name` in `pool_metrics`.
+
+        For background work (e.g. procedure jobs) that must not take connections
+        from the routes. Sessions still go through `new_session` for the tenant.
+        """
+        if name not in self.background_engines:
+            config = self.config.model_copy(update={"pool_config": pool_config})
+            self.background_engines[name] = self._create_engine(
+                config, name, background=True
+            )
+        engine = self.background_engines[name]
+        if autocommit:
+            engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+        return self._create_sessionmaker(engine)
+
+    def open_session(self, read: bool = False) -> Union[Session, AsyncSession]:
+        """
+        New session outside of the route dependencies (e.g. for a streamed body).
+
+        Matches the driver, on the read factories if `read`; closing it is up to
+        the caller.
+        """
+        if read:
+            factory = self.read_sessionmaker()
+        elif self.is_async:
+            factory = self.AsyncSessionLocal
+        else:
+            factory = self.SessionLocal
+        return self.new_session(factory)
+
+    def new_session(
+        self, factory: Union[sessionmaker, async_sessionmaker]
+    ) -> Union[Session, AsyncSession]:
+        """Open a session from `factory`, bound to the current request's tenant."""
+        tenant = current_tenant.get()
+        if tenant is None or self.config.tenancy is None:
+            return factory()
+        return factory(bind=self.tenant_bind(factory.kw["bind"], tenant.schema))
+
+    def tenant_bind(
+        self, engine: Union[Engine, AsyncEngine], tenant: str
+    ) -> Union[Engine, AsyncEngine]:
+        """
+        Engine serving `tenant` in place of `engine`.
+
+        Tenants with a dedicated pool get their own engine; the others share the
+        pool of `engine` through a `schema_translate_map` execution option.
+        """
+        key = (id(engine), tenant)
+        if key in self._tenant_binds:
+            return self._tenant_binds[key]
+
+        tenancy = self.config.tenancy
+        with self._tenant_lock:
+            if key not in self._tenant_binds:
+                is_async = isinstance(engine, AsyncEngine)
+                if tenant in tenancy.dedicated_pools:
+                    name = f"tenant-{tenant}" + ("-async" if is_async else "")
+                    if name not in self.tenant_engines:
+                        config = self.config.model_copy(
+                            update={"pool_config": tenancy.dedicated_pools[tenant]}
+                        )
+                        self.tenant_engines[name] = (
+                            self._create_async_engine(config, f"tenant-{tenant}")
+                            if is_async
+                            else self._create_engine(config, f"tenant-{tenant}")
+                        )
+                    # * Keep the options of `engine` (e.g. AUTOCOMMIT for reads)
+                    engine = self.tenant_engines[name].execution_options(
+                        **engine.get_execution_options()
+                    )
+                self._tenant_binds[key] = engine.execution_options(
+                    schema_translate_map={tenancy.template_schema: tenant}
+                )
+        return self._tenant_binds[key]
+
+    def is_tenant(self, schema: str) -> bool:
+        """
+        Whether `schema` is a configured tenant that exists in the database.
+
+        Only reads the known schemas, since it runs on the event loop: a miss
+        starts a refresh in the background (rate-limited), so new tenants show up
+        on their own a moment later.
+        """
+        tenancy = self.config.tenancy
+        if tenancy is None or not tenancy.matches(schema):
+            return False
+        checked_at, schemas = self._schemas
+        if schema not in schemas and time.monotonic() - checked_at > 5.0:
+            self._schemas = (time.monotonic(), schemas)  # * One refresh at a time
+            threading.Thread(
+                target=self._refresh_schemas, name="tenant-schemas", daemon=True
+            ).start()
+        return schema in schemas
+
+    def _refresh_schemas(self) -> None:
+        try:
+            schemas = frozenset(inspect(self.engine).get_schema_names())
+        except Exception as e:
+            print(f"{yellow('Tenant schemas not refreshed:')} {e}")
+            return
+        self._schemas = (time.monotonic(), schemas)
+
+    @property
+    def lag_query(self) -> Optional[str]:
+        """SQL query returning the replication lag in seconds (None if unknown)."""
+        match self.config.db_type:
+            case DBType.POSTGRESQL:
+                return "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+            case DBType.SQLITE:
+                return "SELECT 0"  # * No replication: local stand-ins never lag
+            case _:
+                return None
+
+    def serving_pools(
+        self,
+    ) -> List[Tuple[str, Union[Engine, AsyncEngine], PoolConfig]]:
+        """(name, engine, pool config) of the pools the generated routes use."""
+        engines = self.async_replica_engines if self.is_async else self.replica_engines
+        pools = [
+            (
+                "primary",
+                self.async_engine if self.is_async else self.engine,
+                self.config.pool_config,
+            )
+        ] + [
+            (f"replica-{i}", engine, self.config.replicas[i].pool_config)
+            for i, engine in enumerate(engines)
+        ]
+        return [(name, engine, config) for name, engine, config in pools if config]
+
+    @property
+    def maintains_pools(self) -> bool:
+        """Whether some pool is warmed up or validated in the background."""
+        return any(c.warm_up or c.validate_interval for _, _, c in self.serving_pools())
+
+    @property
+    def pools_warm(self) -> bool:
+        """Whether the pools configured with `warm_up` are filled (readiness)."""
+        return self._pools_warm.is_set()
+
+    def _log_warm_up(self, name: str, opened: int, size: int) -> None:
+        color = green if opened == size else yellow
+        print(f"\t{gray('warm up:')} {bold(name)} {color(f'{opened}/{size}')}")
+
+    def _maintain_pools(self) -> None:
+        """Warm up the sync pools, then validate their idle connections."""
+        pools = self.serving_pools()
+        for name, engine, config in pools:
+            if config.warm_up:
+                opened = warm_up(engine, config.pool_size)
+                self._log_warm_up(name, opened, config.pool_size)
+        self._pools_warm.set()
+
+        pools = [p for p in pools if p[2].validate_interval]
+        if not pools:
+            return
+        interval = min(config.validate_interval for _, _, config in pools)
+        while True:
+            time.sleep(interval)
+            for name, engine, config in pools:
+                try:
+                    pinged, failed = validate_idle(engine, config.validate_interval)
+                    self.pool_metrics[name].record_validation(pinged, failed)
+                except Exception as e:
+                    print(f"{yellow('Pool')} {name} {yellow('validation failed:')} {e}")
+
+    async def maintain_pools_async(self) -> None:
+        """
+        Async version of `_maintain_pools` (runs until cancelled).
+
+        Async connections are bound to the event loop that opened them, so this
+        must run on the app's loop (Forge starts it from the app's lifespan).
+        """
+        pools = self.serving_pools()
+        for name, engine, config in pools:
+            if config.warm_up:
+                opened = await warm_up_async(engine, config.pool_size)
+                self._log_warm_up(name, opened, config.pool_size)
+        self._pools_warm.set()
+
+        pools = [p for p in pools if p[2].validate_interval]
+        if not pools:
+            return
+        interval = min(config.validate_interval for _, _, config in pools)
+        while True:
+            await asyncio.sleep(interval)
+            for name, engine, config in pools:
+                try:
+                    pinged, failed = await validate_idle_async(
+                        engine, config.validate_interval
+                    )
+                    self.pool_metrics[name].record_validation(pinged, failed)
+                except Exception as e:
+                    print(f"{yellow('Pool')} {name} {yellow('validation failed:')} {e}")
+
+    def check_replica_lag(self) -> Dict[int, Optional[float]]:
+        """Measure the lag of every replica (None for unreachable replicas)."""
+        for i, engine in enumerate(self.replica_engines):
+            try:
+                with engine.connect() as conn:
+                    lag = conn.execute(text(self.lag_query or "SELECT 0")).scalar()
+                self.replica_lag[i] = float(lag or 0)
+            except Exception as e:
+                print(f"{yellow('Replica')} {i} {yellow('lag check failed:')} {e}")
+                self.replica_lag[i] = None
+        return self.replica_lag
+
+    def _monitor_replica_lag(self) -> None:
+        while True:
+            time.sleep(self.config.replica_lag_interval)
+            self.check_replica_lag()
+
     def exec_raw_sql(self, query: str) -> CursorResult:
         """Execute raw SQL query."""
         with self.engine.connect() as connection:
             return connection.execute(text(query))
 
-    def get_db_version(self) -> str:
-        """Get database version information."""
+    @property
+    def version_query(self) -> Optional[str]:
+        """SQL query returning the database version (None if unknown)."""
         match self.config.db_type:
             case DBType.POSTGRESQL | DBType.MYSQL:
-                query = "SELECT version()"
+                return "SELECT version()"
             case DBType.SQLITE:
-                query = "SELECT sqlite_version()"
+                return "SELECT sqlite_version()"
             case DBType.MSSQL:
-                query = "SELECT @@VERSION"
+                return "SELECT @@VERSION"
+            case _:
+                return None
 
+    def get_db_version(self) -> str:
+        """Get database version information."""
+        query = self.version_query
         if query:
             return str(self.exec_raw_sql(query).scalar()).split("\n")[
                 0
@@ -253,16 +843,64 @@ class DBForge(BaseModel):
             return
 
     def analyze_table_relationships(self) -> Dict[str, List[Dict[str, str]]]:
-        """Analyze and return table relationships."""
-        relationships = {}
-        for table_name, table in self.metadata.tables.items():
-            relationships[table_name] = []
-            for fk in table.foreign_keys:
-                relationships[table_name].append(
-                    {
-                        "from_col": fk.parent.name,
-                        "to_table": fk.column.table.name,
-                        "to_col": fk.column.name,
-                    }
-                )
-        return relationships
+        """Analyze and return table relationships (from the FK graph)."""
+        return {
+            table_name: [
+                {"from_col": col, "to_table": rel.target.name, "to_col": to_col}
+                for rel in self.fk_graph.forward.get(table_name, {}).values()
+                for col, to_col in zip(rel.columns, rel.target_columns)
+            ]
+            for table_name in self.metadata.tables
+        }
+
+
+def is_async_dependency(db_dependency: Callable) -> bool:
+    """Check whether a session dependency yields an AsyncSession."""
+    return pyinspect.isasyncgenfunction(db_dependency)
+
+
+async def run_db(
+    db: Union[Session, AsyncSession],
+    fn: Callable,
+    *args,
+    executor: Optional[Executor] = None,
+    **kwargs,
+):
+    """
+    Run a sync database function `fn(session, ...)` from an async route handler.
+
+    AsyncSessions go through `run_sync`, so the handler awaits the database.
+    Sync Sessions run on `executor` (if given) so blocking driver calls don't
+    stall the event loop. The request context (e.g. its query scope) goes along.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    if executor is not None:
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(context.run, fn, db, *args, **kwargs)
+        )
+    return fn(db, *args, **kwargs)
+
+
+def session_handler(db_dependency: Callable) -> Callable[[Callable], Callable]:
+    """
+    Adapt a sync route handler (taking a `db` session kwarg) to its dependency.
+
+    With an async dependency the handler becomes an `async def` that runs the
+    body through `AsyncSession.run_sync`, awaiting the database instead of
+    holding a thread per request. Sync dependencies get the handler unchanged.
+    """
+
+    def decorator(handler: Callable) -> Callable:
+        if not is_async_dependency(db_dependency):
+            return handler
+
+        @functools.wraps(handler)
+        async def async_handler(**kwargs):
+            db: AsyncSession = kwargs.pop("db")
+            return await db.run_sync(lambda session: handler(db=session, **kwargs))
+
+        return async_handler
+
+    return decorator
@@ -0,0 +1,370 @@
+"""
+EntityCache: in-process cache of records by primary key.
+
+Opt-in per table (`ModelForge.entity_cache`), in front of the PK lookup routes
+(`GET /{table}/{pk}` and `POST /{table}/batch-get`), with LRU and TTL eviction.
+
+Writes made through Forge sessions invalidate the keys they touch once their
+transaction commits. With an `InvalidationChannel` the other workers drop them
+too: `PGNotifyChannel` sends a NOTIFY inside the writing transaction (delivered
+on commit), `SocketChannel` sends datagrams to the workers on the same host.
+"""
+
+import json
+import os
+import select
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from forge.core.logging import yellow
+from forge.tools.tenant import current_tenant
+
+
+class EntityCacheConfig(BaseModel):
+    """Entity cache configuration for a table."""
+
+    max_entries: int = Field(default=10_000, ge=1, description="LRU capacity")
+    ttl: float = Field(default=60.0, gt=0, description="Seconds an entry stays valid")
+
+
+class EntityCacheStats(BaseModel):
+    """Counters of an entity cache"""
+
+    entries: int
+    max_entries: int
+    ttl: float
+    hits: int
+    misses: int
+    hit_ratio: Optional[float] = Field(None, description="hits / lookups")
+    evictions: int = Field(..., description="Entries dropped by the LRU limit")
+    expirations: int
+    invalidations: int
+    memory_bytes: int = Field(..., description="Approx. size of the cached records")
+
+
+def cache_key(pk: Tuple[Any, ...], tenant: Optional[str] = None) -> str:
+    """Cache key of a primary key (the same in every worker, see the channels)."""
+    return json.dumps([tenant, list(pk)], default=str)
+
+
+def request_key(pk: Tuple[Any, ...]) -> str:
+    """Cache key of a primary key in the current request's tenant."""
+    tenant = current_tenant.get()
+    return cache_key(pk, tenant.schema if tenant else None)
+
+
+class EntityCache:
+    """LRU + TTL cache of one table's records (as Pydantic models), by PK."""
+
+    def __init__(
+        self,
+        table_key: str,
+        config: EntityCacheConfig = EntityCacheConfig(),
+        channel: Optional["InvalidationChannel"] = None,
+    ):
+        self.table_key = table_key
+        self.config = config
+        self.channel = channel
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0  # * Bumped by every invalidation (see `put`)
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self) -> int:
+        """Token to pass to `put` (taken before reading from the database)."""
+        return self._generation
+
+    def put(self, key: str, value: Any, generation: int) -> None:
+        """
+        Cache `value`, unless something was invalidated since `generation`.
+
+        A read that started before a write committed could otherwise cache the
+        row as it was before that write.
+        """
+        size = len(value.model_dump_json()) if isinstance(value, BaseModel) else 0
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.config.ttl, value, size)
+            self.memory_bytes += size
+            while len(self._entries) > self.config.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                if key in self._entries:
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.memory_bytes = 0
+
+    def _drop(self, key: str) -> None:
+        self.memory_bytes -= self._entries.pop(key)[2]
+
+    def stats(self) -> EntityCacheStats:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return EntityCacheStats(
+                entries=len(self._entries),
+                max_entries=self.config.max_entries,
+                ttl=self.config.ttl,
+                hits=self.hits,
+                misses=self.misses,
+                hit_ratio=self.hits / lookups if lookups else None,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                invalidations=self.invalidations,
+                memory_bytes=self.memory_bytes,
+            )
+
+
+# * Pending invalidations of a session: { cache: {keys} } (applied on commit)
+_PENDING = "forge_entity_invalidations"
+
+
+def schedule_invalidation(
+    session: Session, cache: Optional[EntityCache], pks: Iterable[Tuple[Any, ...]]
+) -> None:
+    """
+    Invalidate `pks` in `cache` once `session`'s transaction commits.
+
+    `cache` may be anything with `invalidate(keys)`, `table_key` and `channel`
+    (e.g. a `ResidentTable`).
+    """
+    if cache is None:
+        return
+    keys = session.info.setdefault(_PENDING, {}).setdefault(cache, set())
+    keys.update(request_key(pk) for pk in pks)
+
+
+def _by_channel(
+    pending: Dict[EntityCache, set],
+) -> Dict["InvalidationChannel", List[Tuple[str, List[str]]]]:
+    channels: Dict[InvalidationChannel, List[Tuple[str, List[str]]]] = {}
+    for cache, keys in pending.items():
+        if cache.channel is not None and keys:
+            channels.setdefault(cache.channel, []).append((cache.table_key, list(keys)))
+    return channels
+
+
+def install_invalidation(session_class: type) -> None:
+    """Apply the invalidations scheduled on `session_class` sessions on commit."""
+
+    @event.listens_for(session_class, "before_commit")
+    def publish_in_transaction(session: Session) -> None:
+        pending = session.info.get(_PENDING)
+        if not pending:
+            return
+        for channel, messages in _by_channel(pending).items():
+            if channel.transactional:
+                channel.publish(messages, session)
+
+    @event.listens_for(session_class, "after_commit")
+    def invalidate(session: Session) -> None:
+        pending = session.info.pop(_PENDING, None)
+        if not pending:
+            return
+        for cache, keys in pending.items():
+            cache.invalidate(keys)
+        for channel, messages in _by_channel(pending).items():
+            if not channel.transactional:
+                channel.publish(messages)
+
+    @event.listens_for(session_class, "after_rollback")
+    def discard(session: Session) -> None:
+        session.info.pop(_PENDING, None)
+
+
+class InvalidationChannel(ABC):
+    """Carries invalidations to the other workers (base class)."""
+
+    # * Whether `publish` runs inside the writing transaction (before its commit)
+    transactional = False
+
+    def __init__(self):
+        self.caches: Dict[str, EntityCache] = {}
+
+    def register(self, cache: EntityCache) -> None:
+        self.caches[cache.table_key] = cache
+        cache.channel = self
+
+    def start(self) -> None:
+        """Start receiving invalidations (from a daemon thread)."""
+        threading.Thread(
+            target=self._listen, name=f"forge-{type(self).__name__}", daemon=True
+        ).start()
+
+    @abstractmethod
+    def publish(
+        self, messages: List[Tuple[str, List[str]]], session: Optional[Session] = None
+    ) -> None:
+        """Send `(table_key, keys)` messages (in `session` if `transactional`)."""
+
+    @abstractmethod
+    def _listen(self) -> None:
+        """Receive invalidations forever, passing their payloads to `_receive`."""
+
+    def _receive(self, payload: str) -> None:
+        try:
+            table_key, keys = json.loads(payload)
+        except (ValueError, TypeError):
+            return
+        if table_key not in self.caches:
+            return
+        if keys is None:  # * The whole table (see `SocketChannel.publish`)
+            self.caches[table_key].clear()
+        else:
+            self.caches[table_key].invalidate(keys)
+
+
+class PGNotifyChannel(InvalidationChannel):
+    """
+    Invalidations over PostgreSQL LISTEN/NOTIFY.
+
+    The NOTIFY is sent inside the writing transaction, so the other workers
+    hear about it exactly when (and only if) it commits.
+    """
+
+    transactional = True
+    # * NOTIFY payloads are limited to 8000 bytes: send the keys in chunks
+    KEYS_PER_NOTIFY = 50
+
+    def __init__(self, engine: Engine, channel: str = "forge_entity_cache"):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+
+    def publish(
+        self, messages: List[Tuple[str, List[str]]], session: Optional[Session] = None
+    ) -> None:
+        for table_key, keys in messages:
+            for i in range(0, len(keys), self.KEYS_PER_NOTIFY):
+                payload = json.dumps([table_key, keys[i : i + self.KEYS_PER_NOTIFY]])
+                session.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": self.channel, "payload": payload},
+                )
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                connection = self.engine.raw_connection()
+                connection.detach()  # * Dedicated to LISTEN, never back to the pool
+                dbapi_conn = connection.dbapi_connection
+                dbapi_conn.autocommit = True
+                with dbapi_conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                while True:
+                    if select.select([dbapi_conn], [], [], 5.0)[0]:
+                        dbapi_conn.poll()
+                        while dbapi_conn.notifies:
+                            self._receive(dbapi_conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f"{yellow('Entity cache LISTEN failed:')} {e}")
+                for cache in self.caches.values():
+                    cache.clear()  # * Invalidations may have been missed
+                time.sleep(1.0)
+
+
+class SocketChannel(InvalidationChannel):
+    """
+    Invalidations over Unix datagram sockets, between workers on one host.
+
+    Every worker binds a socket in `directory` and sends each invalidation to
+    all the other sockets found there (a stand-in for a message broker). When a
+    datagram can't be sent, the peer is told to clear the whole table instead.
+    """
+
+    # * Keep each datagram well under the receive buffer: send the keys in chunks
+    KEYS_PER_MESSAGE = 50
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{os.getpid()}-{id(self)}.sock")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+
+    def publish(
+        self, messages: List[Tuple[str, List[str]]], session: Optional[Session] = None
+    ) -> None:
+        peers = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".sock")
+        ]
+        payloads = [
+            (table_key, json.dumps([table_key, keys[i : i + self.KEYS_PER_MESSAGE]]))
+            for table_key, keys in messages
+            for i in range(0, len(keys), self.KEYS_PER_MESSAGE)
+        ]
+        for peer in peers:
+            if peer == self.path:
+                continue
+            cleared = set()
+            for table_key, payload in payloads:
+                if table_key in cleared:
+                    continue
+                try:
+                    self._socket.sendto(payload.encode(), peer)
+                except (ConnectionRefusedError, FileNotFoundError):
+                    try:
+                        os.remove(peer)  # * Worker gone
+                    except OSError:
+                        pass
+                    break
+                except OSError as e:
+                    # * Keys would be missed: have the peer drop the whole table
+                    print(f"{yellow('Entity cache invalidation not sent:')} {e}")
+                    self._send_clear(table_key, peer)
+                    cleared.add(table_key)
+
+    def _send_clear(self, table_key: str, peer: str) -> None:
+        try:
+            self._socket.sendto(json.dumps([table_key, None]).encode(), peer)
+        except OSError as e:
+            print(f"{yellow('Entity cache clear not sent:')} {e}")
+
+    def _listen(self) -> None:
+        while True:
+            payload = self._socket.recv(65536)
+            self._receive(payload.decode())
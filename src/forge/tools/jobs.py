@@ -0,0 +1,230 @@
+"""
+JobQueue: background execution of long-running stored procedures.
+
+Jobs are queued (up to `max_queued`) and run by `workers` threads on a pool of
+their own, so long procedures never hold the connections of the interactive
+routes. Each procedure also gets a concurrency limit. A job runs in its own
+`QueryScope` (no statement timeout unless configured), which is also how a
+running job gets cancelled.
+"""
+
+import contextvars
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import TextClause
+from sqlalchemy.orm import Session
+
+from forge.tools.timeout import QueryScope, current_scope
+
+
+class JobConfig(BaseModel):
+    """Background procedure job configuration."""
+
+    workers: int = Field(default=2, ge=1, description="Concurrent jobs (= connections)")
+    max_queued: int = Field(default=1000, ge=1, description="Jobs waiting to run")
+    per_procedure: int = Field(
+        default=1, ge=1, description="Default concurrent jobs per procedure"
+    )
+    # ^ Per-procedure overrides:   { "schema.proc": max concurrent jobs }
+    limits: Dict[str, int] = Field(default_factory=dict)
+    timeout: float = Field(default=0, ge=0, description="Statement timeout (0: none)")
+    retention: float = Field(
+        default=3600.0, gt=0, description="Seconds finished jobs stay queryable"
+    )
+
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobStatus(BaseModel):
+    """State and timing of a procedure job"""
+
+    id: str
+    procedure: str
+    state: JobState
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    queued_ms: Optional[float] = Field(None, description="Time spent waiting to run")
+    elapsed_ms: Optional[float] = Field(None, description="Running time so far")
+    notices: List[str] = Field(
+        default_factory=list, description="Messages raised so far (RAISE NOTICE)"
+    )
+    result: Any = None
+    error: Optional[str] = None
+
+
+class QueueFull(Exception):
+    """The job queue has `max_queued` jobs waiting."""
+
+
+class Job:
+    def __init__(
+        self,
+        procedure: str,
+        statement: TextClause,
+        params: Dict[str, Any],
+        context: contextvars.Context,
+    ):
+        self.id = uuid.uuid4().hex
+        self.procedure = procedure
+        self.statement = statement
+        self.params = params
+        self.context = context  # * The submitting request's (e.g. its tenant)
+        self.state = JobState.QUEUED
+        self.submitted = time.monotonic()
+        self.submitted_at = datetime.now()
+        self.started: Optional[float] = None
+        self.started_at: Optional[datetime] = None
+        self.finished: Optional[float] = None
+        self.finished_at: Optional[datetime] = None
+        self.scope = QueryScope()
+        self.dbapi_connection: Any = None  # * While running (to read its notices)
+        self.notices: List[str] = []
+        self.result: Any = None
+        self.error: Optional[str] = None
+
+    def status(self) -> JobStatus:
+        now = time.monotonic()
+        started = self.started or (now if self.state == JobState.QUEUED else None)
+        notices = self.notices
+        if self.dbapi_connection is not None:  # * psycopg2 collects them as they come
+            notices = [str(n).strip() for n in self.dbapi_connection.notices]
+        return JobStatus(
+            id=self.id,
+            procedure=self.procedure,
+            state=self.state,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            queued_ms=(started - self.submitted) * 1000 if started else None,
+            elapsed_ms=(
+                ((self.finished or now) - self.started) * 1000 if self.started else None
+            ),
+            notices=notices,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobQueue:
+    """Queue of procedure calls, run in the background with concurrency limits."""
+
+    def __init__(
+        self, session_factory: Callable[[], Session], config: JobConfig = JobConfig()
+    ):
+        self.session_factory = session_factory
+        self.config = config
+        self.jobs: Dict[str, Job] = {}
+        self._pending: Deque[Job] = deque()
+        self._running: Dict[str, int] = {}  # * Running jobs per procedure
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.workers, thread_name_prefix="forge-job"
+        )
+
+    def limit(self, procedure: str) -> int:
+        return self.config.limits.get(procedure, self.config.per_procedure)
+
+    def submit(
+        self, procedure: str, statement: TextClause, params: Dict[str, Any]
+    ) -> Job:
+        """Queue a call of `procedure` (raises QueueFull when at `max_queued`)."""
+        job = Job(procedure, statement, params, contextvars.copy_context())
+        job.scope.timeout = self.config.timeout
+        with self._lock:
+            self._prune()
+            if len(self._pending) >= self.config.max_queued:
+                raise QueueFull(f"{len(self._pending)} jobs already queued")
+            self.jobs[job.id] = job
+            self._pending.append(job)
+            self._dispatch()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job (None if unknown)."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job.state == JobState.QUEUED:
+                self._pending.remove(job)
+                self._finish(job, JobState.CANCELLED)
+                return job
+        if job.state == JobState.RUNNING:
+            job.scope.cancel()  # * The call fails with QueryCancelled
+        return job
+
+    def _dispatch(self) -> None:
+        """Start the oldest jobs allowed to run (called with the lock held)."""
+        running = sum(self._running.values())
+        for job in list(self._pending):
+            if running >= self.config.workers:
+                break
+            if self._running.get(job.procedure, 0) >= self.limit(job.procedure):
+                continue  # * Later jobs of other procedures may still start
+            self._pending.remove(job)
+            self._running[job.procedure] = self._running.get(job.procedure, 0) + 1
+            running += 1
+            job.state = JobState.RUNNING
+            job.started, job.started_at = time.monotonic(), datetime.now()
+            self._executor.submit(job.context.run, self._run, job)
+
+    def _run(self, job: Job) -> None:
+        current_scope.set(job.scope)
+        state = JobState.FAILED
+        try:
+            with self.session_factory() as session:
+                dbapi_connection = session.connection().connection.dbapi_connection
+                if isinstance(getattr(dbapi_connection, "notices", None), list):
+                    dbapi_connection.notices.clear()
+                    job.dbapi_connection = dbapi_connection
+                session.execute(job.statement, job.params)
+                session.commit()
+            job.result, state = {"status": "success"}, JobState.SUCCEEDED
+        except Exception as e:
+            if job.scope.cancelled:
+                state, job.error = JobState.CANCELLED, "Cancelled"
+            else:
+                job.error = str(e)
+        finally:
+            if job.dbapi_connection is not None:
+                job.notices = job.status().notices
+                job.dbapi_connection = None
+            with self._lock:
+                self._running[job.procedure] -= 1
+                self._finish(job, state)
+                self._dispatch()
+
+    def _finish(self, job: Job, state: JobState) -> None:
+        job.state = state
+        job.finished, job.finished_at = time.monotonic(), datetime.now()
+
+    def _prune(self) -> None:
+        """Forget the jobs finished more than `retention` seconds ago."""
+        horizon = time.monotonic() - self.config.retention
+        for job_id in [
+            job.id
+            for job in self.jobs.values()
+            if job.finished is not None and job.finished < horizon
+        ]:
+            del self.jobs[job_id]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs by state."""
+        with self._lock:
+            states = [job.state.value for job in self.jobs.values()]
+        return {state.value: states.count(state.value) for state in JobState}
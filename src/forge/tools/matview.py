@@ -0,0 +1,245 @@
+"""
+MaterializedView: refresh (on demand and on a schedule) of materialized views.
+
+Materialized views are reflected like plain views and get the same read routes.
+A refresh runs `REFRESH MATERIALIZED VIEW`, `CONCURRENTLY` (readers aren't
+blocked) when the view has a unique index on plain columns and is populated.
+
+Refreshes of a view never overlap: in-process through a lock, and across the
+workers through a transaction-level advisory lock on PostgreSQL (a worker that
+doesn't get it skips its scheduled refresh). Durations and staleness are the
+ones seen by this worker, since PostgreSQL doesn't record refresh times.
+"""
+
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+from sqlalchemy import Table, text
+from sqlalchemy.engine.reflection import Inspector
+from sqlalchemy.orm import Session
+
+from forge.core.logging import bold, gray, yellow
+from forge.tools.tenant import tenant_schema
+from forge.tools.timeout import QueryScope, current_scope
+
+
+class MatViewConfig(BaseModel):
+    """Scheduled refresh configuration for a materialized view."""
+
+    interval: float = Field(..., gt=0, description="Seconds between refreshes")
+    concurrently: bool = Field(
+        default=True, description="Refresh CONCURRENTLY when the view allows it"
+    )
+    timeout: float = Field(default=0, ge=0, description="Statement timeout (0: none)")
+
+
+class MatViewStatus(BaseModel):
+    """Refresh state of a materialized view (as seen by this worker)"""
+
+    unique_index: Optional[List[str]] = Field(
+        None, description="Columns of the unique index allowing CONCURRENTLY"
+    )
+    refresh_interval: Optional[float] = Field(None, description="Scheduled refresh")
+    refreshing: bool = False
+    refreshes: int = 0
+    failures: int = 0
+    skipped: int = Field(0, description="Scheduled refreshes skipped (already running)")
+    concurrent: Optional[bool] = Field(None, description="Last refresh CONCURRENTLY")
+    last_refreshed_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    staleness_s: Optional[float] = Field(
+        None, description="Seconds since the last refresh (None: not refreshed yet)"
+    )
+    last_error: Optional[str] = None
+
+
+class RefreshInProgress(Exception):
+    """The view is already being refreshed (by this worker or another one)."""
+
+
+# * Only populated views can be refreshed CONCURRENTLY
+_PG_POPULATED = (
+    "SELECT ispopulated FROM pg_matviews "
+    "WHERE schemaname = :schema AND matviewname = :name"
+)
+_PG_LOCK = "SELECT pg_try_advisory_xact_lock(hashtext(:key))"
+
+
+def matview_names(inspector: Inspector, schema: str) -> List[str]:
+    """Materialized views of `schema` (none on databases without them)."""
+    try:
+        return inspector.get_materialized_view_names(schema=schema)
+    except NotImplementedError:
+        return []
+
+
+def unique_index(inspector: Inspector, table: Table) -> Optional[List[str]]:
+    """Columns of a unique index usable by `REFRESH ... CONCURRENTLY` (if any)."""
+    try:
+        indexes = inspector.get_indexes(table.name, schema=table.schema)
+    except NotImplementedError:
+        return None
+    for index in indexes:
+        columns = index.get("column_names") or []
+        if (
+            index.get("unique")
+            and columns
+            and None not in columns  # * Expression indexes don't qualify
+            and not index.get("dialect_options", {}).get("postgresql_where")
+        ):
+            return list(columns)
+    return None
+
+
+class MaterializedView:
+    """Refresh state and scheduler of one materialized view."""
+
+    def __init__(self, table: Table, unique_index: Optional[List[str]] = None):
+        self.table = table
+        self.key = table.key
+        self.unique_index = unique_index
+        self.config: Optional[MatViewConfig] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.skipped = 0
+        self.concurrent: Optional[bool] = None
+        self.last_refreshed: Optional[float] = None  # * time.monotonic()
+        self.last_refreshed_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, session: Session, concurrently: bool = True) -> MatViewStatus:
+        """
+        Refresh the view (in the current tenant's schema) and commit.
+
+        Raises RefreshInProgress if a refresh of the view is already running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RefreshInProgress(f"{self.key} is already being refreshed")
+        try:
+            return self._refresh(session, concurrently)
+        finally:
+            self._lock.release()
+
+    def _refresh(self, session: Session, concurrently: bool) -> MatViewStatus:
+        schema, name = tenant_schema(self.table.schema), self.table.name
+        own_schema = schema == self.table.schema  # * Tenants aren't tracked
+        start = time.perf_counter()
+        try:
+            if session.get_bind().dialect.name == "postgresql":
+                key = f"forge_matview:{schema}.{name}"
+                if not session.execute(text(_PG_LOCK), {"key": key}).scalar():
+                    session.rollback()
+                    raise RefreshInProgress(f"{self.key} is being refreshed elsewhere")
+                populated = session.execute(
+                    text(_PG_POPULATED), {"schema": schema, "name": name}
+                ).scalar()
+                concurrently = bool(concurrently and self.unique_index and populated)
+            else:
+                concurrently = False
+            session.execute(
+                text(
+                    "REFRESH MATERIALIZED VIEW "
+                    f'{"CONCURRENTLY " if concurrently else ""}"{schema}"."{name}"'
+                )
+            )
+            session.commit()
+        except RefreshInProgress:
+            raise
+        except Exception as e:
+            if own_schema:
+                self.failures += 1
+                self.last_error = str(e)
+            raise
+
+        if own_schema:
+            self.refreshes += 1
+            self.concurrent = concurrently
+            self.last_refreshed = time.monotonic()
+            self.last_refreshed_at = datetime.now()
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+            self.last_error = None
+        return self.status()
+
+    def start(
+        self, session_factory: Callable[[], Session], config: MatViewConfig
+    ) -> None:
+        """Refresh the view every `config.interval` seconds from a daemon thread."""
+        self.config = config
+        print(
+            f"\t{gray('matview refresh:')} {bold(self.key)} "
+            f"{gray(f'every {config.interval:g}s')}"
+        )
+        threading.Thread(
+            target=self._run,
+            args=(session_factory,),
+            name=f"matview-{self.table.name}",
+            daemon=True,
+        ).start()
+
+    def _run(self, session_factory: Callable[[], Session]) -> None:
+        # * Not bound by the routes' statement timeout
+        current_scope.set(QueryScope(timeout=self.config.timeout))
+        next_at = time.monotonic() + self.config.interval
+        while True:
+            time.sleep(max(next_at - time.monotonic(), 0))
+            if self.last_refreshed is not None:
+                # * Counted from the last refresh (e.g. one made on demand meanwhile)
+                next_at = self.last_refreshed + self.config.interval
+                if next_at > time.monotonic():
+                    continue
+            next_at = time.monotonic() + self.config.interval  # * Even on failure
+            try:
+                with session_factory() as session:
+                    self.refresh(session, concurrently=self.config.concurrently)
+            except RefreshInProgress:
+                self.skipped += 1
+            except Exception as e:
+                print(f"{yellow('Matview')} {self.key} {yellow('not refreshed:')} {e}")
+
+    def status(self) -> MatViewStatus:
+        return MatViewStatus(
+            unique_index=self.unique_index,
+            refresh_interval=self.config.interval if self.config else None,
+            refreshing=self._lock.locked(),
+            refreshes=self.refreshes,
+            failures=self.failures,
+            skipped=self.skipped,
+            concurrent=self.concurrent,
+            last_refreshed_at=self.last_refreshed_at,
+            last_duration_ms=self.last_duration_ms,
+            staleness_s=(
+                time.monotonic() - self.last_refreshed if self.last_refreshed else None
+            ),
+            last_error=self.last_error,
+        )
+
+
+def load_matviews(
+    inspector: Inspector,
+    tables: Dict[str, Table],
+    include_schemas: List[str],
+    previous: Optional[Dict[str, MaterializedView]] = None,
+) -> Dict[str, MaterializedView]:
+    """
+    Materialized views of `include_schemas`, by key ('schema.view').
+
+    The views already in `previous` are kept (with their stats and scheduler),
+    pointing at the newly reflected table.
+    """
+    previous = previous or {}
+    matviews: Dict[str, MaterializedView] = {}
+    for schema in include_schemas:
+        for name in matview_names(inspector, schema):
+            table = tables.get(f"{schema}.{name}")
+            if table is None:
+                continue
+            matview = previous.get(table.key) or MaterializedView(table)
+            matview.table = table
+            matview.unique_index = unique_index(inspector, table)
+            matviews[table.key] = matview
+    return matviews
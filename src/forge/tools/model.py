@@ -3,18 +3,26 @@ ModelForge: Enhanced model management for database entities.
 Handles Pydantic and SQLAlchemy model generation, caching, and type mapping.
 """
 
-from typing import Dict, List, Tuple, Type, Any
-from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 from sqlalchemy import Column, Table, inspect, Enum as SQLAlchemyEnum
 
 from forge.gen.enum import EnumInfo, load_enums
 from forge.gen.fn import FunctionMetadata, load_fn
 from forge.gen.table import BaseSQLModel, load_tables
 from forge.gen.view import load_views
+from forge.tools.coalesce import CoalesceConfig
+from forge.tools.entity_cache import EntityCache, EntityCacheConfig, InvalidationChannel
+from forge.tools.matview import MaterializedView, MatViewConfig, load_matviews
+from forge.tools.resident import ResidentConfig
 from forge.tools.sql_mapping import get_eq_type, JSONBType
 from forge.tools.db import DBForge
 from forge.core.logging import *
 
+# * Kinds of objects in the per-schema index
+SCHEMA_KINDS = ("tables", "views", "enums", "functions", "procedures", "triggers")
+
 
 #  todo: Add some utility for the 'exclude_tables' field
 class ModelForge(BaseModel):
@@ -28,6 +36,16 @@ class ModelForge(BaseModel):
         ..., description="Schemas to include in model generation"
     )
     exclude_tables: List[str] = Field(default_factory=list)
+    # ^ Opt-in insert coalescing:   { "schema.table": CoalesceConfig }
+    write_coalesce: Dict[str, CoalesceConfig] = Field(default_factory=dict)
+    # ^ Opt-in PK lookup caching:   { "schema.table": EntityCacheConfig }
+    entity_cache: Dict[str, EntityCacheConfig] = Field(default_factory=dict)
+    # ^ Carries entity cache invalidations to the other workers (None: local only)
+    cache_channel: Optional[InvalidationChannel] = None
+    # ^ Opt-in in-memory serving of small tables:   { "schema.table": ResidentConfig }
+    resident: Dict[str, ResidentConfig] = Field(default_factory=dict)
+    # ^ Scheduled materialized view refresh:   { "schema.view": MatViewConfig }
+    matview_refresh: Dict[str, MatViewConfig] = Field(default_factory=dict)
 
     # ^ TABLE cache:    { name: (Table, (PydanticModel, SQLAlchemyModel)) }
     table_cache: Dict[str, Tuple[Table, Tuple[Type[BaseModel], Type[BaseSQLModel]]]] = (
@@ -43,15 +61,93 @@ class ModelForge(BaseModel):
     fn_cache: Dict[str, FunctionMetadata] = Field(default_factory=dict)
     proc_cache: Dict[str, FunctionMetadata] = Field(default_factory=dict)
     trig_cache: Dict[str, FunctionMetadata] = Field(default_factory=dict)
+    # ^ Per-schema index:  { schema: { kind: { name: cache entry } } }
+    schema_index: Dict[str, Dict[str, Dict[str, Any]]] = Field(default_factory=dict)
+    loaded_at: datetime = Field(default_factory=datetime.now)
+    # ^ Entity caches:  { "schema.table": EntityCache }
+    entity_caches: Dict[str, EntityCache] = Field(default_factory=dict)
+    # ^ Materialized views (also in view_cache):  { "schema.view": MaterializedView }
+    matviews: Dict[str, MaterializedView] = Field(default_factory=dict)
+
+    _reload_callbacks: List[Callable[["ModelForge"], None]] = PrivateAttr(
+        default_factory=list
+    )
 
     model_config = ConfigDict(arbitrary_types_allowed=True, extra="allow")
 
     def __init__(self, **data):
         super().__init__(**data)
+        self._load_all()
+        self._init_entity_caches()
+
+    def _load_all(self) -> None:
         self._load_models()
         self._load_enums()
         self._load_views()
+        self._load_matviews()
         self._load_fn()
+        self._build_index()
+        self.loaded_at = datetime.now()
+
+    def _build_index(self) -> None:
+        """Index every cache by schema (built once per load, swapped at once)."""
+        index = {
+            schema: {kind: {} for kind in SCHEMA_KINDS}
+            for schema in self.include_schemas
+        }
+
+        def _add(schema: str, kind: str, name: str, entry: Any) -> None:
+            index.setdefault(schema, {k: {} for k in SCHEMA_KINDS})[kind][name] = entry
+
+        for kind, cache in [
+            ("tables", self.table_cache),
+            ("views", self.view_cache),
+            ("functions", self.fn_cache),
+            ("procedures", self.proc_cache),
+            ("triggers", self.trig_cache),
+        ]:
+            for key, entry in cache.items():
+                schema, name = key.split(".", 1)
+                _add(schema, kind, name, entry)
+        for name, enum_info in self.enum_cache.items():
+            _add(enum_info.schema, "enums", name, enum_info)
+        self.schema_index = index
+
+    def _init_entity_caches(self) -> None:
+        for table_key, config in self.entity_cache.items():
+            if table_key not in self.table_cache:
+                print(f"{yellow('Entity cache:')} unknown table {table_key}")
+                continue
+            self.entity_caches[table_key] = EntityCache(table_key, config)
+            if self.cache_channel:
+                self.cache_channel.register(self.entity_caches[table_key])
+        if self.cache_channel and self.entity_caches:
+            self.cache_channel.start()
+
+    def schema_objects(self, schema: str, kind: str) -> Dict[str, Any]:
+        """Objects of `kind` (see SCHEMA_KINDS) in `schema`, by name."""
+        return self.schema_index.get(schema, {}).get(kind, {})
+
+    def get_object(self, schema: str, kind: str, name: str) -> Optional[Any]:
+        """Cache entry of the `kind` object `schema.name` (None if unknown)."""
+        return self.schema_objects(schema, kind).get(name)
+
+    def on_reload(self, callback: Callable[["ModelForge"], None]) -> None:
+        """Call `callback(model_forge)` after every `reload` (e.g. to rebuild caches)."""
+        self._reload_callbacks.append(callback)
+
+    def reload(self) -> None:
+        """
+        Reflect the database again and rebuild every cache.
+
+        Routes generated from the previous caches are kept as they are.
+        """
+        self.db_manager.reload_metadata()
+        self._load_all()
+        for entity_cache in self.entity_caches.values():
+            entity_cache.clear()
+        for callback in self._reload_callbacks:
+            callback(self)
 
     def _load_enums(self) -> None:
         self.enum_cache = load_enums(
@@ -78,6 +174,15 @@ class ModelForge(BaseModel):
             db_dependency=self.db_manager.get_db,
         )
 
+    def _load_matviews(self) -> None:
+        """Find the materialized views (keeping the refresh state of known ones)"""
+        self.matviews = load_matviews(
+            inspector=inspect(self.db_manager.engine),
+            tables={key: table for key, (table, _) in self.view_cache.items()},
+            include_schemas=self.include_schemas,
+            previous=self.matviews,
+        )
+
     def _load_fn(self) -> None:
         fn, proc, trig = load_fn(
             db_dependency=self.db_manager.get_db, include_schemas=self.include_schemas
@@ -132,16 +237,9 @@ class ModelForge(BaseModel):
         # Print each schema's statistics
         for schema in sorted(self.include_schemas):
             # Count items for this schema
-            tables = len(
-                [t for t, _ in self.table_cache.values() if t.schema == schema]
-            )
-            views = len([v for v, _ in self.view_cache.values() if v.schema == schema])
-            enums = len([e for e in self.enum_cache.values() if e.schema == schema])
-            functions = len([f for f in self.fn_cache.values() if f.schema == schema])
-            procedures = len(
-                [p for p in self.proc_cache.values() if p.schema == schema]
-            )
-            triggers = len([t for t in self.trig_cache.values() if t.schema == schema])
+            tables, views, enums, functions, procedures, triggers = [
+                len(self.schema_objects(schema, kind)) for kind in SCHEMA_KINDS
+            ]
             schema_total = tables + views + enums + functions + procedures + triggers
 
             # Update totals
@@ -0,0 +1,299 @@
+"""
+PoolMetrics: connection pool instrumentation.
+
+Hooks the SQLAlchemy pool events (connect, checkout, checkin, invalidate, close)
+and times every checkout, so `pool_size`/`max_overflow` can be sized from data.
+
+Also pool maintenance: warm-up (open the pool's connections before traffic
+arrives) and background validation of idle connections (an alternative to
+`pool_pre_ping`, which pays a round trip on every checkout).
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool
+
+# * Upper bounds (ms) of the checkout wait histogram buckets (the last one is +inf)
+WAIT_BUCKETS_MS: List[float] = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+# * Set while validating idle connections: those checkouts aren't counted
+_validating: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "forge_pool_validating", default=False
+)
+
+
+class PoolStatus(BaseModel):
+    """Snapshot of a connection pool and its counters"""
+
+    pool_class: str
+    size: Optional[int] = Field(None, description="Configured pool_size")
+    checked_out: Optional[int] = Field(None, description="Connections in use")
+    checked_in: Optional[int] = Field(None, description="Idle connections")
+    overflow_in_use: Optional[int] = Field(None, description="Overflow conns in use")
+    connections: int = Field(..., description="Open connections")
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    timeouts: int = 0
+    validations: int = Field(0, description="Idle connections pinged in background")
+    validation_failures: int = 0
+    wait_ms_avg: float = 0.0
+    wait_ms_max: float = 0.0
+    wait_histogram_ms: Dict[str, int] = Field(
+        default_factory=dict, description="Checkout wait counts by bucket (le)"
+    )
+    connection_age_s_avg: Optional[float] = None
+    connection_age_s_max: Optional[float] = None
+
+
+class PoolMetrics:
+    """Counters for a single engine's connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pool: Optional[Pool] = None
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.validations = 0
+        self.validation_failures = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._born: Dict[int, float] = {}  # * id(connection record) -> connect time
+
+    def pool_class(self, url: str) -> Type[Pool]:
+        """Default pool class of the URL's dialect, with timed checkouts."""
+        base = make_url(url).get_dialect().get_pool_class(make_url(url))
+        metrics = self
+
+        class InstrumentedPool(base):
+            def _do_get(self):
+                if _validating.get():
+                    return super()._do_get()
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except sa_exc.TimeoutError:
+                    with metrics._lock:
+                        metrics.timeouts += 1
+                    raise
+                finally:
+                    metrics.record_wait((time.perf_counter() - start) * 1000)
+
+        InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+        return InstrumentedPool
+
+    def attach(self, engine: Engine) -> None:
+        """Listen to the pool events of a (sync) engine."""
+        self.pool = engine.pool
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_conn, record):
+            with self._lock:
+                self.connects += 1
+                self._born[id(record)] = time.monotonic()
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_conn, record, proxy):
+            if _validating.get():
+                return
+            with self._lock:
+                self.checkouts += 1
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(dbapi_conn, record):
+            if _validating.get():
+                return
+            with self._lock:
+                self.checkins += 1
+            record.info["forge_idle_since"] = time.monotonic()
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_conn, record, exception):
+            with self._lock:
+                self.invalidations += 1
+                self._born.pop(id(record), None)
+
+        @event.listens_for(engine, "close")
+        def on_close(dbapi_conn, record):
+            with self._lock:
+                self._born.pop(id(record), None)
+
+        @event.listens_for(engine, "engine_disposed")
+        def on_disposed(engine):
+            self.pool = engine.pool
+
+    def in_use(self) -> int:
+        """Connections currently checked out of the pool."""
+        checkedout = getattr(self.pool, "checkedout", None)
+        return checkedout() if callable(checkedout) else 0
+
+    def record_validation(self, validated: int, failed: int) -> None:
+        with self._lock:
+            self.validations += validated
+            self.validation_failures += failed
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            for i, bound in enumerate(WAIT_BUCKETS_MS):
+                if wait_ms <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def snapshot(self) -> PoolStatus:
+        """Current pool state and counters."""
+        pool = self.pool
+
+        def _call(name: str) -> Optional[int]:
+            fn = getattr(pool, name, None)
+            return fn() if callable(fn) else None
+
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - born for born in self._born.values()]
+            overflow = _call("overflow")
+            return PoolStatus(
+                pool_class=type(pool).__name__ if pool else "None",
+                size=_call("size"),
+                checked_out=_call("checkedout"),
+                checked_in=_call("checkedin"),
+                overflow_in_use=max(0, overflow) if overflow is not None else None,
+                connections=len(ages),
+                connects=self.connects,
+                checkouts=self.checkouts,
+                checkins=self.checkins,
+                invalidations=self.invalidations,
+                timeouts=self.timeouts,
+                validations=self.validations,
+                validation_failures=self.validation_failures,
+                wait_ms_avg=(
+                    self.wait_total_ms / self.wait_count if self.wait_count else 0.0
+                ),
+                wait_ms_max=self.wait_max_ms,
+                wait_histogram_ms={
+                    str(bound): count
+                    for bound, count in zip(
+                        WAIT_BUCKETS_MS + ["+inf"], self.wait_buckets
+                    )
+                },
+                connection_age_s_avg=sum(ages) / len(ages) if ages else None,
+                connection_age_s_max=max(ages) if ages else None,
+            )
+
+
+def warm_up(engine: Engine, size: int) -> int:
+    """Open `size` connections concurrently and return them to the pool."""
+    if size <= 0:
+        return 0
+    with ThreadPoolExecutor(max_workers=size, thread_name_prefix="forge-warm") as ex:
+        futures = [ex.submit(engine.raw_connection) for _ in range(size)]
+    connections = [f.result() for f in futures if f.exception() is None]
+    for connection in connections:  # * Only now, so each one is a new connection
+        connection.close()
+    return len(connections)
+
+
+async def warm_up_async(engine: AsyncEngine, size: int) -> int:
+    """Async version of `warm_up` (must run on the loop that serves the app)."""
+    if size <= 0:
+        return 0
+    results = await asyncio.gather(
+        *(engine.connect().start() for _ in range(size)), return_exceptions=True
+    )
+    connections = [r for r in results if not isinstance(r, BaseException)]
+    await asyncio.gather(*(connection.close() for connection in connections))
+    return len(connections)
+
+
+def validate_idle(engine: Engine, min_idle: float) -> Tuple[int, int]:
+    """
+    Ping the connections idle in the pool for `min_idle` seconds or more.
+
+    Broken connections are invalidated, so checkouts never get them. Returns
+    (pinged, failed). Connections are taken one at a time, in pool order, and
+    these checkouts aren't counted in the pool metrics.
+    """
+    token = _validating.set(True)
+    try:
+        return _validate_idle(engine, min_idle)
+    finally:
+        _validating.reset(token)
+
+
+def _validate_idle(engine: Engine, min_idle: float) -> Tuple[int, int]:
+    pinged = failed = 0
+    for _ in range(engine.pool.checkedin()):
+        if engine.pool.checkedin() == 0:  # * Traffic took the rest
+            break
+        connection = engine.raw_connection()
+        info = connection.record_info
+        idle_since = info.get("forge_idle_since", 0.0)
+        try:
+            if time.monotonic() - idle_since < min_idle:
+                continue
+            pinged += 1
+            idle_since = time.monotonic()
+            engine.dialect.do_ping(connection.dbapi_connection)
+        except Exception as e:
+            failed += 1
+            connection.invalidate(e)
+        finally:
+            connection.close()
+            info["forge_idle_since"] = idle_since  # * A ping isn't activity
+    return pinged, failed
+
+
+async def validate_idle_async(engine: AsyncEngine, min_idle: float) -> Tuple[int, int]:
+    """Async version of `validate_idle`."""
+    token = _validating.set(True)
+    try:
+        return await _validate_idle_async(engine, min_idle)
+    finally:
+        _validating.reset(token)
+
+
+async def _validate_idle_async(engine: AsyncEngine, min_idle: float) -> Tuple[int, int]:
+    pool = engine.sync_engine.pool
+    pinged = failed = 0
+    for _ in range(pool.checkedin()):
+        if pool.checkedin() == 0:
+            break
+        connection = await engine.connect().start()
+        info = (await connection.get_raw_connection()).record_info
+        idle_since = info.get("forge_idle_since", 0.0)
+        try:
+            if time.monotonic() - idle_since < min_idle:
+                continue
+            pinged += 1
+            idle_since = time.monotonic()
+            await connection.run_sync(
+                lambda conn: conn.dialect.do_ping(conn.connection.dbapi_connection)
+            )
+        except Exception as e:
+            failed += 1
+            await connection.invalidate(e)
+        finally:
+            await connection.close()
+            info["forge_idle_since"] = idle_since
+    return pinged, failed
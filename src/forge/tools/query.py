@@ -0,0 +1,168 @@
+"""
+QueryBuilder: the SELECT statements of the table and view read routes.
+
+Statements are built from the reflected `Table` with `select()`, so identifiers
+are quoted by SQLAlchemy and values always travel as bound parameters. Each
+shape of request (active filters, projection, ordering, paging) maps to one
+statement built on first use, reused by every request of that shape (and so
+hitting the compiled cache / the driver's prepared statement cache).
+"""
+
+import functools
+from enum import Enum as PyEnum
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field, create_model
+from sqlalchemy import Select, Table, bindparam, select
+
+from forge.tools.sql_mapping import ArrayType, JSONBType, get_eq_type
+
+# * Query options of the read routes (dropped where a column has the same name)
+OPTION_NAMES = ("limit", "offset", "order_by", "fields")
+
+
+def _option_fields() -> Dict[str, Any]:
+    return {
+        "limit": (Optional[int], Field(default=None, ge=1, description="Max rows")),
+        "offset": (
+            Optional[int],
+            Field(default=None, ge=0, description="Rows to skip"),
+        ),
+        "order_by": (
+            Optional[str],
+            Field(
+                default=None,
+                description="Columns to sort by, comma separated ('-col': descending)",
+            ),
+        ),
+        "fields": (
+            Optional[str],
+            Field(default=None, description="Columns to return, comma separated"),
+        ),
+    }
+
+
+def options_model(table: Table, name: str) -> Type[BaseModel]:
+    """Query parameters model of the read options (see `QueryBuilder.build`)."""
+    fields = {k: v for k, v in _option_fields().items() if k not in table.c}
+    return create_model(f"{name}QueryOptions", __base__=BaseModel, **fields)
+
+
+def fields_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    Response model of projected records (`fields` option): every field optional.
+
+    Routes declare `Union[model, fields_model(model)]` with `exclude_unset`, so a
+    projected record only carries the requested columns.
+    """
+    fields = {
+        name: (
+            Optional[field.annotation],
+            Field(default=None, description=field.description),
+        )
+        for name, field in model.model_fields.items()
+    }
+    return create_model(
+        f"{model.__name__}Fields", __config__=model.model_config, **fields
+    )
+
+
+class QueryBuilder:
+    """SELECT statements of one table or view, with bound parameters."""
+
+    def __init__(self, table: Table):
+        self.table = table
+        # * JSONB and array columns can't be compared for equality
+        self.filterable = frozenset(
+            c.name
+            for c in table.columns
+            if not isinstance(get_eq_type(str(c.type)), (JSONBType, ArrayType))
+        )
+        # * Pages follow the primary key unless ordered otherwise (if there is one)
+        self.default_order = tuple((c.name, False) for c in table.primary_key.columns)
+        self.statement = functools.lru_cache(maxsize=128)(self._statement)
+
+    def _statement(
+        self,
+        filters: FrozenSet[str],
+        fields: Optional[Tuple[str, ...]] = None,
+        order: Tuple[Tuple[str, bool], ...] = (),
+        limit: bool = False,
+        offset: bool = False,
+    ) -> Select:
+        """Statement of one request shape (`order`: (column, descending) pairs)."""
+        columns = self.table.c
+        statement = select(*(columns[name] for name in fields or columns.keys()))
+        statement = statement.where(
+            *(columns[name] == bindparam(f"param_{name}") for name in sorted(filters))
+        )
+        if order:
+            statement = statement.order_by(
+                *(
+                    columns[name].desc() if desc else columns[name]
+                    for name, desc in order
+                )
+            )
+        if limit:
+            statement = statement.limit(bindparam("forge_limit"))
+        if offset:
+            statement = statement.offset(bindparam("forge_offset"))
+        return statement
+
+    def build(
+        self, filters: Dict[str, Any], options: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Select, Dict[str, Any]]:
+        """
+        Statement & parameters for equality `filters` and the read `options`.
+
+        Filters set to None (or on JSONB / array columns) are ignored. Unknown
+        columns in `fields` or `order_by` raise a 400.
+        """
+        options = options or {}
+        active = {
+            name: value.value if isinstance(value, PyEnum) else value
+            for name, value in filters.items()
+            if value is not None and name in self.filterable
+        }
+        params = {f"param_{name}": value for name, value in active.items()}
+
+        fields = self.fields(options.get("fields"))
+        order = tuple(
+            (name[1:], True) if name[:1] == "-" else (name, False)
+            for name in self._names(options.get("order_by"), "order_by")
+        )
+        limit, offset = options.get("limit"), options.get("offset")
+        if limit is not None:
+            params["forge_limit"] = limit
+        if offset:
+            params["forge_offset"] = offset
+        if not order and (limit is not None or offset):
+            order = self.default_order
+
+        statement = self.statement(
+            frozenset(active), fields, order, limit is not None, bool(offset)
+        )
+        return statement, params
+
+    def fields(self, value: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Columns of a `fields` option (None: every column)."""
+        return self._names(value, "fields") or None
+
+    def _names(self, value: Optional[str], option: str) -> Tuple[str, ...]:
+        names = tuple(
+            dict.fromkeys(n.strip() for n in (value or "").split(",") if n.strip())
+        )
+        descending = option == "order_by"  # * '-col' only makes sense there
+        unknown = [
+            n
+            for n in names
+            if (n[1:] if descending and n[:1] == "-" else n) not in self.table.c
+        ]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown {option} columns {unknown} "
+                f"(available: {list(self.table.c.keys())})",
+            )
+        return names
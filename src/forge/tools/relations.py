@@ -0,0 +1,130 @@
+"""
+Foreign-key graph and batched loading of related rows.
+
+The graph is built once from the reflected metadata, with forward (referencing
+-> referenced) and reverse adjacency. `load_related` expands a page of rows
+through one relation with a single `IN (...)` query (per chunk of keys), so an
+expanded list never costs a query per row.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import ForeignKeyConstraint, MetaData, Table, select, tuple_
+from sqlalchemy.orm import Session
+
+# * Keys per IN (...) query (stays below the bind parameter limits of the drivers)
+IN_CHUNK_SIZE = 500
+
+
+class Relation:
+    """One foreign key, seen from one of its two tables."""
+
+    def __init__(
+        self,
+        name: str,
+        table: Table,
+        columns: Tuple[str, ...],
+        target: Table,
+        target_columns: Tuple[str, ...],
+        many: bool,
+    ):
+        self.name = name  # * Name used by `?expand=`
+        self.table = table  # * Table whose rows are expanded
+        self.columns = columns  # * Key columns on `table`
+        self.target = target  # * Table the related rows come from
+        self.target_columns = target_columns  # * Matching columns on `target`
+        self.many = many  # * Reverse relations yield a list per row
+
+    def __repr__(self) -> str:
+        arrow = "<-" if self.many else "->"
+        return f"Relation({self.table.key}.{self.name} {arrow} {self.target.key})"
+
+
+class FKGraph:
+    """Forward & reverse foreign-key adjacency, by table key ('schema.table')."""
+
+    def __init__(self):
+        self.forward: Dict[str, Dict[str, Relation]] = {}
+        self.reverse: Dict[str, Dict[str, Relation]] = {}
+
+    @classmethod
+    def from_metadata(cls, metadata: MetaData) -> "FKGraph":
+        graph = cls()
+        for table in metadata.tables.values():
+            for fk in table.constraints:
+                if isinstance(fk, ForeignKeyConstraint) and fk.elements:
+                    graph._add(table, fk)
+        for incoming in graph.reverse.values():
+            graph._name_reverse(incoming)
+        return graph
+
+    def _add(self, table: Table, fk: ForeignKeyConstraint) -> None:
+        columns = tuple(c.name for c in fk.columns)
+        target = fk.elements[0].column.table
+        target_columns = tuple(e.column.name for e in fk.elements)
+        # * Single-column FKs are named by their column, composite ones by constraint
+        name = columns[0] if len(columns) == 1 else fk.name or "_".join(columns)
+        self.forward.setdefault(table.key, {})[name] = Relation(
+            name, table, columns, target, target_columns, many=False
+        )
+        reverse = Relation(
+            f"{table.name}.{name}", target, target_columns, table, columns, many=True
+        )
+        self.reverse.setdefault(target.key, {})[reverse.name] = reverse
+
+    @staticmethod
+    def _name_reverse(incoming: Dict[str, Relation]) -> None:
+        """Also name reverse relations by the referencing table, when unambiguous."""
+        by_table: Dict[str, List[Relation]] = {}
+        for relation in incoming.values():
+            by_table.setdefault(relation.target.name, []).append(relation)
+        for table_name, relations in by_table.items():
+            if len(relations) == 1 and table_name not in incoming:
+                incoming[table_name] = relations[0]
+
+    def relations(self, table_key: str) -> Dict[str, Relation]:
+        """Every relation that can expand the rows of `table_key`, by name."""
+        return {**self.reverse.get(table_key, {}), **self.forward.get(table_key, {})}
+
+    def relation(self, table_key: str, name: str) -> Optional[Relation]:
+        return self.forward.get(table_key, {}).get(name) or self.reverse.get(
+            table_key, {}
+        ).get(name)
+
+
+def _key(values: Sequence[Any]) -> Any:
+    return values[0] if len(values) == 1 else tuple(values)
+
+
+def load_related(db: Session, relation: Relation, rows: Sequence[Any]) -> List[Any]:
+    """
+    Related row(s) of each row in `rows`, in the same order.
+
+    Forward relations give the referenced row (or None), reverse relations the
+    list of referencing rows. One query per `IN_CHUNK_SIZE` distinct keys.
+    """
+    row_keys = [_key([getattr(row, c) for c in relation.columns]) for row in rows]
+    keys = list(
+        dict.fromkeys(
+            k
+            for k in row_keys
+            if k is not None and not (isinstance(k, tuple) and None in k)
+        )
+    )
+
+    target_cols = [relation.target.c[c] for c in relation.target_columns]
+    match_on = target_cols[0] if len(target_cols) == 1 else tuple_(*target_cols)
+    found: Dict[Any, Any] = {}
+    for start in range(0, len(keys), IN_CHUNK_SIZE):
+        chunk = keys[start : start + IN_CHUNK_SIZE]
+        result = db.execute(select(relation.target).where(match_on.in_(chunk)))
+        for related in result:
+            key = _key([getattr(related, c) for c in relation.target_columns])
+            if relation.many:
+                found.setdefault(key, []).append(related)
+            else:
+                found[key] = related
+
+    if relation.many:
+        return [found.get(key, []) for key in row_keys]
+    return [found.get(key) for key in row_keys]
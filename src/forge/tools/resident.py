@@ -0,0 +1,168 @@
+"""
+ResidentTable: small tables served entirely from memory.
+
+The rows of a resident table are loaded once into prebuilt models, with a hash
+index (value -> row positions) per filterable column, so the read route answers
+equality filters by intersecting index entries without touching the database.
+
+A background thread reloads the table when its change marker moves (or on every
+check when there is no marker). Writes made through Forge mark it stale on
+commit; stale tables are read from the database until the reload completes.
+"""
+
+import threading
+import time
+from array import array
+from datetime import datetime
+from enum import Enum as PyEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+from sqlalchemy import Table, select, text
+from sqlalchemy.orm import Session
+
+from forge.core.logging import bold, gray, yellow
+from forge.tools.sql_mapping import ArrayType, JSONBType, get_eq_type
+
+
+class ResidentConfig(BaseModel):
+    """Resident (in-memory) serving configuration for a table."""
+
+    max_rows: int = Field(default=50_000, ge=1, description="Larger tables stay in DB")
+    check_interval: float = Field(
+        default=30.0, gt=0, description="Seconds between change marker checks"
+    )
+    marker: Optional[str] = Field(
+        default=None,
+        description="SQL returning a value that changes with the table "
+        "(default: pg_stat_user_tables counters on PostgreSQL, none elsewhere)",
+    )
+
+
+# * Row change counters of a table (kept by the statistics collector)
+_PG_MARKER = (
+    "SELECT n_tup_ins + n_tup_upd + n_tup_del FROM pg_stat_user_tables "
+    "WHERE relid = CAST(:table AS regclass)"
+)
+
+
+class ResidentTable:
+    """In-memory rows and equality indexes of one table."""
+
+    # * Invalidations stay in this worker (see `schedule_invalidation`)
+    channel = None
+
+    def __init__(
+        self,
+        table: Table,
+        session_factory: Callable[[], Session],
+        config: ResidentConfig = ResidentConfig(),
+    ):
+        self.table = table
+        self.table_key = table.key
+        self.session_factory = session_factory
+        self.config = config
+        # * Columns that can be filtered on (the read route skips JSONB & arrays)
+        self.indexed = [
+            c.name
+            for c in table.columns
+            if not isinstance(get_eq_type(str(c.type)), (JSONBType, ArrayType))
+        ]
+        # * (records, { column: { value: row positions } }), swapped as a whole
+        self.data: Tuple[List[BaseModel], Dict[str, Dict[Any, array]]] = ([], {})
+        self.loaded_at: Optional[datetime] = None
+        self.marker: Any = None
+        self.stale = True  # * Serve from the database until loaded
+        self._dirty = False  # * Written to since the current load started
+        self._to_model: Callable[[Any], BaseModel] = None
+        self._wake = threading.Event()
+
+    def start(self, to_model: Callable[[Any], BaseModel]) -> None:
+        """Load the table and keep it fresh from a daemon thread."""
+        self._to_model = to_model
+        start = time.perf_counter()
+        self._refresh()
+        if self.serving:
+            elapsed = f"({(time.perf_counter() - start) * 1000:.1f} ms)"
+            print(
+                f"\t{gray('resident:')} {bold(self.table_key)} "
+                f"{len(self.data[0])} rows {gray(elapsed)}"
+            )
+        threading.Thread(
+            target=self._run, name=f"resident-{self.table.name}", daemon=True
+        ).start()
+
+    @property
+    def serving(self) -> bool:
+        return not self.stale
+
+    def select(self, filters: Dict[str, Any]) -> List[BaseModel]:
+        """Records matching every `column == value` in `filters`, in load order."""
+        records, indexes = self.data
+        candidates = []
+        for name, value in filters.items():
+            if value is None or name not in indexes:
+                continue
+            if isinstance(value, PyEnum):
+                value = value.value
+            candidates.append(indexes[name].get(value, ()))
+        if not candidates:
+            return list(records)
+
+        candidates.sort(key=len)  # * Intersect from the most selective column
+        positions = set(candidates[0])
+        for more in candidates[1:]:
+            if not positions:
+                break
+            positions.intersection_update(more)
+        return [records[i] for i in sorted(positions)]
+
+    def invalidate(self, keys: Iterable[Any] = ()) -> None:
+        """Stop serving until reloaded (called when a write commits)."""
+        self.stale = self._dirty = True
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.config.check_interval)
+            self._wake.clear()
+            self._refresh()
+
+    def _refresh(self) -> None:
+        try:
+            with self.session_factory() as session:
+                marker = self._read_marker(session)
+                if self.stale or marker is None or marker != self.marker:
+                    self._load(session, marker)
+        except Exception as e:
+            print(f"{yellow('Resident')} {self.table_key} {yellow('not loaded:')} {e}")
+
+    def _read_marker(self, session: Session) -> Any:
+        if self.config.marker:
+            return session.execute(text(self.config.marker)).scalar()
+        if session.get_bind().dialect.name == "postgresql":
+            name = f'"{self.table.schema}"."{self.table.name}"'
+            return session.execute(text(_PG_MARKER), {"table": name}).scalar()
+        return None
+
+    def _load(self, session: Session, marker: Any) -> None:
+        self._dirty = False
+        statement = select(self.table).limit(self.config.max_rows + 1)
+        rows = session.execute(statement).all()
+        if len(rows) > self.config.max_rows:
+            raise ValueError(f"more than {self.config.max_rows} rows")
+
+        records = [self._to_model(row) for row in rows]
+        indexes: Dict[str, Dict[Any, array]] = {}
+        for name in self.indexed:
+            index: Dict[Any, array] = {}
+            for i, row in enumerate(rows):
+                value = getattr(row, name)
+                if value is not None:
+                    index.setdefault(value, array("I")).append(i)
+            indexes[name] = index
+
+        self.data = (records, indexes)
+        self.marker = marker
+        self.loaded_at = datetime.now()
+        self.stale = self._dirty  # * A write that committed meanwhile needs a reload
@@ -0,0 +1,86 @@
+"""
+Schema-per-tenant routing.
+
+Routes are generated once from a template schema. Each request is resolved to
+a tenant (header or path) and its sessions run with a `schema_translate_map`
+from the template schema to the tenant's schema, on a shared or dedicated pool.
+"""
+
+import re
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from fastapi.responses import JSONResponse
+
+if TYPE_CHECKING:
+    from forge.tools.db import TenancyConfig
+
+
+class Tenant(NamedTuple):
+    schema: str  # * The tenant's schema
+    template: str  # * The schema the routes were generated from
+
+
+# * Tenant of the current request (None: the template schema itself)
+current_tenant: ContextVar[Optional[Tenant]] = ContextVar("forge_tenant", default=None)
+
+
+def tenant_schema(schema: str) -> str:
+    """
+    Schema to use for `schema` in the current request.
+
+    For statements that `schema_translate_map` doesn't reach (e.g. `text()`).
+    """
+    tenant = current_tenant.get()
+    return tenant.schema if tenant and schema == tenant.template else schema
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class TenantRouting:
+    """ASGI middleware resolving the tenant of each request (see `current_tenant`)."""
+
+    def __init__(
+        self, app: Any, config: "TenancyConfig", is_tenant: Callable[[str], bool]
+    ):
+        self.app = app
+        self.config = config
+        self.is_tenant = is_tenant
+
+    def _valid(self, tenant: str) -> bool:
+        return (
+            bool(_IDENTIFIER.match(tenant))
+            and tenant != self.config.template_schema
+            and self.is_tenant(tenant)
+        )
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        tenant = None
+        if self.config.path:
+            _, first, rest = (scope["path"].split("/", 2) + ["", ""])[:3]
+            if first and self._valid(first):
+                tenant = first
+                path = f"/{self.config.template_schema}/{rest}"
+                scope = {**scope, "path": path, "raw_path": path.encode()}
+        if tenant is None and self.config.header:
+            name = self.config.header.lower().encode()
+            value = dict(scope["headers"]).get(name)
+            if value:
+                tenant = value.decode()
+                if not self._valid(tenant):
+                    response = JSONResponse(
+                        {"detail": f"Unknown tenant '{tenant}'"}, status_code=404
+                    )
+                    return await response(scope, receive, send)
+
+        token = current_tenant.set(
+            Tenant(tenant, self.config.template_schema) if tenant else None
+        )
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_tenant.reset(token)
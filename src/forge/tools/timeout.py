@@ -0,0 +1,290 @@
+"""
+Statement timeouts and query cancellation.
+
+Every transaction started by a Forge session gets a time limit: `SET LOCAL
+statement_timeout` on PostgreSQL (a session-level `SET` on AUTOCOMMIT
+connections, sent only when the value changes), and an interrupt timer on
+SQLite (which has no server-side timeout, so there the limit covers the whole
+transaction). The
+limit comes from the current request's `QueryScope` (per-route timeouts) or
+falls back to the session's default (`DBConfig.statement_timeout`).
+
+`CancelOnDisconnect` opens a `QueryScope` per request and cancels the queries
+running in it as soon as the client goes away.
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.orm import Session, SessionTransaction
+
+# * SQLSTATE for "query_canceled" (statement timeout or cancel request)
+PG_QUERY_CANCELED = "57014"
+
+
+class StatementTimeout(HTTPException):
+    """A statement ran longer than its route's timeout (504 Gateway Timeout)."""
+
+    def __init__(self, timeout: float, elapsed_ms: Optional[float] = None):
+        self.timeout = timeout
+        self.elapsed_ms = elapsed_ms
+        super().__init__(
+            status_code=504,
+            detail={
+                "error": "Statement timeout",
+                "timeout_s": timeout,
+                "elapsed_ms": elapsed_ms,
+            },
+        )
+
+
+class QueryCancelled(Exception):
+    """The request's client disconnected, so its queries were cancelled."""
+
+
+class QueryScope:
+    """Per-request state: the route's timeout and the connections in use."""
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout  # ^ None: use the session default, 0: no timeout
+        self.cancelled = False
+        self._connections: Set[Connection] = set()
+        self._lock = threading.Lock()
+
+    def register(self, connection: Connection) -> None:
+        if self.cancelled:  # * The client left before this transaction started
+            raise QueryCancelled("Client disconnected")
+        with self._lock:
+            self._connections.add(connection)
+
+    def unregister(self, connection: Connection) -> None:
+        with self._lock:
+            self._connections.discard(connection)
+
+    def cancel(self) -> bool:
+        """
+        Cancel every query running in this scope.
+
+        Returns False if some driver can't interrupt a running statement (e.g.
+        asyncpg), in which case the caller has to cancel the awaiting task.
+        """
+        self.cancelled = True
+        with self._lock:
+            connections = list(self._connections)
+        return all([_interrupt(connection, "cancelled") for connection in connections])
+
+
+current_scope: ContextVar[Optional[QueryScope]] = ContextVar(
+    "forge_query_scope", default=None
+)
+
+
+def _interrupt(connection: Connection, reason: str) -> bool:
+    """Ask the driver to abort the statement running on `connection`."""
+    connection.info["forge_interrupt"] = reason
+    try:
+        driver_conn = connection.connection.driver_connection
+    except Exception:
+        return True  # * Already closed / returned to the pool
+    driver_conn = getattr(driver_conn, "_conn", driver_conn)  # * aiosqlite
+    for method in ("interrupt", "cancel"):  # * sqlite3 / psycopg2
+        if callable(getattr(driver_conn, method, None)):
+            try:
+                getattr(driver_conn, method)()
+            except Exception:
+                pass  # * Nothing left to cancel
+            return True
+    return False
+
+
+# * Guards the SQLite timers: one never interrupts a connection it no longer owns
+_timer_lock = threading.Lock()
+
+
+def _timeout_sqlite(connection: Connection, info: Dict[str, Any]) -> None:
+    """Interrupt `connection`, if the calling timer is still the one armed on it."""
+    with _timer_lock:
+        if info.get("forge_timer") is threading.current_thread():
+            _interrupt(connection, "timeout")
+
+
+def _disarm(info: Dict[str, Any], timer: Optional[threading.Timer] = None) -> None:
+    """
+    Stop the SQLite timer armed on a connection (`timer` only, if given), waiting
+    for it to finish if it is running.
+    """
+    with _timer_lock:
+        if timer is None or info.get("forge_timer") is timer:
+            timer = info.pop("forge_timer", None)
+    if timer is not None:
+        timer.cancel()
+        if timer is not threading.current_thread():
+            timer.join()
+
+
+def _set_pg_timeout(connection: Connection, timeout: Optional[float]) -> None:
+    ms = int(timeout * 1000) if timeout else 0
+    # * Session-level values stay with the pooled DBAPI connection
+    dbapi_info = connection.connection.info
+    session_ms = dbapi_info.get("forge_session_timeout", 0)
+    if connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT":
+        # * No transaction for SET LOCAL to apply to
+        if ms != session_ms:
+            connection.exec_driver_sql(f"SET statement_timeout = {ms}")
+            dbapi_info["forge_session_timeout"] = ms
+    elif ms or session_ms:
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {ms}")
+
+
+def install_timeouts(session_class: type) -> None:
+    """Apply statement timeouts to the transactions of `session_class` sessions."""
+
+    @event.listens_for(session_class, "after_begin")
+    def start_timeout(
+        session: Session, transaction: SessionTransaction, connection: Connection
+    ) -> None:
+        scope = current_scope.get()
+        timeout = scope.timeout if scope else None
+        if timeout is None:
+            timeout = session.info.get("statement_timeout")
+
+        connection.info.pop("forge_interrupt", None)
+        connection.info["forge_timeout"] = timeout
+        session.info["forge_connection"] = connection
+        if scope is not None:
+            session.info["forge_scope"] = scope
+            scope.register(connection)
+
+        match connection.dialect.name:
+            case "postgresql":
+                _set_pg_timeout(connection, timeout)
+            case "sqlite" if timeout:
+                info = connection.info  # * Kept by the pool with the connection
+                timer = threading.Timer(timeout, _timeout_sqlite, (connection, info))
+                timer.daemon = True
+                info["forge_timer"] = timer
+                session.info["forge_timer"] = (info, timer)
+                timer.start()
+
+    @event.listens_for(session_class, "after_transaction_end")
+    def stop_timeout(session: Session, transaction: SessionTransaction) -> None:
+        if transaction.parent is not None:
+            return  # * Savepoint / subtransaction
+        armed = session.info.pop("forge_timer", None)
+        if armed is not None:
+            _disarm(*armed)
+        connection = session.info.pop("forge_connection", None)
+        scope = session.info.pop("forge_scope", None)
+        if scope is not None and connection is not None:
+            scope.unregister(connection)
+
+
+def watch_engine(engine: Engine) -> None:
+    """Raise `StatementTimeout` for statements aborted by their time limit."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def mark_start(conn, cursor, statement, parameters, context, executemany):
+        conn.info["forge_statement_start"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def disarm_timer(dbapi_conn, record) -> None:
+        # * Before the connection can go to another request (the session only
+        # * hears about the transaction's end once it is back in the pool)
+        _disarm(record.info)
+
+    @event.listens_for(engine, "handle_error")
+    def map_timeout(context: ExceptionContext) -> None:
+        connection = context.connection
+        if connection is None:
+            return
+        reason = connection.info.pop("forge_interrupt", None)
+        original = context.original_exception
+        sqlstate = getattr(original, "pgcode", None) or getattr(
+            original, "sqlstate", None
+        )
+        if reason == "cancelled":
+            raise QueryCancelled(
+                "Client disconnected"
+            ) from context.sqlalchemy_exception
+        if reason == "timeout" or sqlstate == PG_QUERY_CANCELED:
+            start = connection.info.get("forge_statement_start")
+            raise StatementTimeout(
+                timeout=connection.info.get("forge_timeout") or 0,
+                elapsed_ms=(time.perf_counter() - start) * 1000 if start else None,
+            ) from context.sqlalchemy_exception
+
+
+class CancelOnDisconnect:
+    """
+    ASGI middleware that cancels a request's queries when its client disconnects.
+
+    The request is read in the background (and replayed to the app), so the
+    middleware sees the `http.disconnect` message as soon as the server sends it.
+    Body chunks are passed on one at a time, as the app consumes them (so large
+    uploads keep their backpressure). Per-route timeouts are matched by the
+    longest path prefix.
+    """
+
+    def __init__(self, app: Any, timeouts: Optional[Dict[str, float]] = None):
+        self.app = app
+        self.timeouts = sorted(
+            (timeouts or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def _route_timeout(self, path: str) -> Optional[float]:
+        for prefix, timeout in self.timeouts:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return timeout
+        return None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        query_scope = QueryScope(timeout=self._route_timeout(scope["path"]))
+        token = current_scope.set(query_scope)
+        messages: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=1)
+        response_complete = False
+
+        async def tracked_send(message: Dict[str, Any]) -> None:
+            nonlocal response_complete
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                response_complete = True
+
+        app_task = asyncio.ensure_future(self.app(scope, messages.get, tracked_send))
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    # * Servers also send it once the response is complete
+                    if not response_complete and not app_task.done():
+                        # * Interrupting the queries lets the app unwind normally
+                        # * (closing its sessions); only cancel it as a last resort
+                        if not query_scope.cancel():
+                            app_task.cancel()
+                    await messages.put(message)  # * Once the app read the body
+                    return
+                await messages.put(message)  # * Waits for the app to read
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            app_task.cancel()
+            if not query_scope.cancelled:
+                raise
+        except Exception:
+            # * Failures caused by the cancellation: nobody is left to answer
+            if not query_scope.cancelled:
+                raise
+        finally:
+            watcher.cancel()
+            current_scope.reset(token)
@@ -0,0 +1,113 @@
+"""
+Shared fixtures: a small SQLite database and the Forge objects built on it.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from forge import DBConfig, DBForge, Forge, ForgeInfo, ModelForge
+
+SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, email TEXT UNIQUE NOT NULL, name TEXT);
+CREATE TABLE orders (
+    id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id), total INTEGER
+);
+CREATE TABLE pairs (a INTEGER NOT NULL, b INTEGER NOT NULL, v TEXT, PRIMARY KEY (a, b));
+CREATE VIEW user_orders AS
+    SELECT u.id AS uid, u.name AS name, o.total AS total
+    FROM users u JOIN orders o ON o.user_id = u.id;
+INSERT INTO users VALUES (1, 'a@x', 'A'), (2, 'b@x', 'B');
+INSERT INTO orders VALUES (1, 1, 10), (2, 1, 20), (3, 2, 5);
+INSERT INTO pairs VALUES (1, 1, 'x'), (1, 2, 'y');
+"""
+
+
+@pytest.fixture(autouse=True)
+def no_functions(monkeypatch):
+    # * Functions are reflected from the PostgreSQL catalogs
+    monkeypatch.setattr(ModelForge, "_load_fn", lambda self: None)
+
+
+@pytest.fixture
+def sleep_fn(monkeypatch):
+    """SQL function `forge_sleep(seconds)` (returns 1) on the sync DBForge engines."""
+
+    def register(dbapi_connection, _):
+        dbapi_connection.create_function(
+            "forge_sleep", 1, lambda s: time.sleep(s or 0) or 1
+        )
+
+    create_engine = DBForge._create_engine
+
+    def with_sleep(self, *args, **kwargs):
+        engine = create_engine(self, *args, **kwargs)
+        event.listen(engine, "connect", register)
+        return engine
+
+    monkeypatch.setattr(DBForge, "_create_engine", with_sleep)
+
+
+@pytest.fixture
+def make_database(tmp_path):
+    """`make_database(name)`: path of a new test database in the test's directory."""
+
+    def make(name: str) -> Path:
+        path = tmp_path / f"{name}.db"
+        with sqlite3.connect(path) as conn:
+            conn.executescript(SCHEMA)
+        return path
+
+    return make
+
+
+@pytest.fixture
+def db_path(make_database):
+    return make_database("forge")
+
+
+@pytest.fixture
+def make_db(db_path):
+    """`make_db(**config)`: a DBForge on the test database (sync driver by default)."""
+
+    def make(**config: Any) -> DBForge:
+        config = {
+            "db_type": "sqlite",
+            "driver_type": "sync",
+            "database": str(db_path),
+            "schema_exclude": [],
+            **config,
+        }
+        return DBForge(config=DBConfig(**config))
+
+    return make
+
+
+@pytest.fixture
+def make_forge(make_db):
+    """
+    `make_forge(db_config, forge_options, **model_forge_options)`: a Forge (on a
+    new FastAPI app) and the ModelForge of the `main` schema, no routes yet.
+    """
+
+    def make(
+        db_config: Optional[Dict[str, Any]] = None,
+        forge_options: Optional[Dict[str, Any]] = None,
+        **model_forge_options: Any,
+    ) -> Tuple[Forge, ModelForge]:
+        model_forge = ModelForge(
+            db_manager=make_db(**(db_config or {})),
+            include_schemas=["main"],
+            **model_forge_options,
+        )
+        forge = Forge(
+            app=FastAPI(), info=ForgeInfo(PROJECT_NAME="test"), **(forge_options or {})
+        )
+        return forge, model_forge
+
+    return make
@@ -0,0 +1,95 @@
+"""
+Transactional `/batch`: `$ref` resolution, rollback on failure and the size cap.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def make_client(make_forge):
+    def make(**batch_options) -> TestClient:
+        forge, model_forge = make_forge()
+        forge.gen_table_routes(model_forge)
+        forge.gen_batch_routes(model_forge, **batch_options)
+        return TestClient(forge.app)
+
+    return make
+
+
+def test_refs_use_the_results_of_earlier_operations(make_client):
+    client = make_client()
+
+    response = client.post(
+        "/batch",
+        json=[
+            {"op": "create", "target": "main.users", "data": {"email": "c@x"}},
+            {
+                "op": "create",
+                "target": "main.orders",
+                "data": {"user_id": {"$ref": "0.id"}, "total": 7},
+            },
+            {
+                "op": "update",
+                "target": "main.users",
+                "data": {"email": "c@x", "name": "C"},
+                "filters": {"id": {"$ref": "0.id"}},
+            },
+        ],
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [r["index"] for r in results] == [0, 1, 2]
+    user_id = results[0]["result"]["id"]
+    assert results[1]["result"]["user_id"] == user_id
+    user = client.get(f"/main/users/{user_id}").json()
+    assert user["name"] == "C"
+
+
+def test_failure_rolls_back_the_batch_and_reports_its_index(make_client):
+    client = make_client()
+
+    response = client.post(
+        "/batch",
+        json=[
+            {"op": "create", "target": "main.users", "data": {"email": "c@x"}},
+            {"op": "delete", "target": "main.orders", "filters": {"id": 1}},
+            {"op": "create", "target": "main.users", "data": {"email": "a@x"}},
+        ],
+    )
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert (detail["index"], detail["op"], detail["target"]) == (
+        2,
+        "create",
+        "main.users",
+    )
+    assert len(client.get("/main/users").json()) == 2
+    assert len(client.get("/main/orders").json()) == 3
+
+
+def test_unknown_target_and_unfiltered_delete_are_rejected(make_client):
+    client = make_client()
+
+    unknown = client.post("/batch", json=[{"op": "create", "target": "main.nope"}])
+    unfiltered = client.post("/batch", json=[{"op": "delete", "target": "main.orders"}])
+
+    assert unknown.status_code == 400
+    assert "Unknown table" in unknown.json()["detail"]["error"]
+    assert unfiltered.status_code == 400
+    assert len(client.get("/main/orders").json()) == 3
+
+
+def test_batches_over_max_operations_are_rejected(make_client):
+    client = make_client(max_operations=2)
+    create = {"op": "create", "target": "main.users"}
+
+    response = client.post(
+        "/batch", json=[{**create, "data": {"email": f"{i}@x"}} for i in range(3)]
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Too many operations (max 2)"
+    assert len(client.get("/main/users").json()) == 2
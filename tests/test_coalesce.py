@@ -0,0 +1,105 @@
+"""
+WriteCoalescer: concurrent inserts flushed together, failures isolated per row.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+
+from forge import CoalesceConfig, ResidentConfig
+from forge.tools.coalesce import WriteCoalescer
+from forge.tools.timeout import StatementTimeout
+
+
+@pytest.fixture
+def db_manager(make_db):
+    return make_db()
+
+
+def _commits(engine) -> list:
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    return commits
+
+
+def test_concurrent_inserts_share_one_transaction(db_manager):
+    table = db_manager.metadata.tables["main.orders"]
+    coalescer = WriteCoalescer(
+        table, db_manager.SessionLocal, CoalesceConfig(max_delay_ms=50)
+    )
+    commits = _commits(db_manager.engine)
+
+    with ThreadPoolExecutor(20) as pool:
+        rows = list(
+            pool.map(lambda i: coalescer.insert({"user_id": 1, "total": i}), range(20))
+        )
+
+    assert [row.total for row in rows] == list(range(20))  # * Each gets its own row
+    assert len({row.id for row in rows}) == 20
+    assert len(commits) < 20
+
+
+def test_a_failing_row_only_fails_itself(db_manager):
+    table = db_manager.metadata.tables["main.orders"]
+    coalescer = WriteCoalescer(
+        table, db_manager.SessionLocal, CoalesceConfig(max_delay_ms=50)
+    )
+
+    futures = [
+        coalescer.submit({"id": 1, "user_id": 1, "total": 0}),  # * Duplicate PK
+        coalescer.submit({"user_id": 1, "total": 98}),
+        coalescer.submit({"user_id": 2, "total": 99}),
+    ]
+
+    with pytest.raises(IntegrityError):
+        futures[0].result(timeout=5)
+    assert [f.result(timeout=5).total for f in futures[1:]] == [98, 99]
+
+
+def test_insert_times_out_and_drops_its_row(db_manager):
+    table = db_manager.metadata.tables["main.orders"]
+    release = threading.Event()
+
+    def stalled_session():
+        release.wait(5)
+        return db_manager.SessionLocal()
+
+    coalescer = WriteCoalescer(
+        table, stalled_session, CoalesceConfig(max_delay_ms=1, timeout=0.2)
+    )
+    first = coalescer.submit({"user_id": 1, "total": 1})  # * Holds up the worker
+    time.sleep(0.05)
+
+    with pytest.raises(StatementTimeout):
+        coalescer.insert({"user_id": 1, "total": 2})
+    release.set()
+
+    assert first.result(timeout=5).total == 1
+    with db_manager.SessionLocal() as session:
+        totals = [row.total for row in session.execute(table.select())]
+    assert 2 not in totals
+
+
+def test_coalesced_creates_invalidate_the_resident_copy(make_forge):
+    forge, model_forge = make_forge(
+        write_coalesce={"main.orders": CoalesceConfig(max_delay_ms=5)},
+        resident={"main.orders": ResidentConfig(check_interval=60)},
+    )
+    forge.gen_table_routes(model_forge)
+    client = TestClient(forge.app)
+    resident = forge.table_handlers["main.orders"].resident
+    for _ in range(100):
+        if resident.serving:
+            break
+        time.sleep(0.01)
+    assert resident.serving
+
+    created = client.post("/main/orders", json={"user_id": 1, "total": 7})
+
+    assert created.status_code == 200, created.text
+    assert len(client.get("/main/orders").json()) == 4
@@ -0,0 +1,88 @@
+"""
+A slow view must not stall the event loop: its query runs on the DB executor,
+so `/health/ping` keeps answering while it's in flight.
+"""
+
+import asyncio
+import sqlite3
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from forge import DBConfig, DBForge, Forge, ForgeInfo, ModelForge
+
+SLOW_S = 1.5  # * Run time of the slow view
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    path = tmp_path / "slow.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY)")
+        conn.execute("CREATE VIEW slow_view AS SELECT forge_sleep(0) AS x")
+    # * Functions are reflected from the PostgreSQL catalogs
+    monkeypatch.setattr(ModelForge, "_load_fn", lambda self: None)
+
+    def register_sleep(dbapi_connection, _):
+        dbapi_connection.create_function(
+            "forge_sleep", 1, lambda s: time.sleep(s or 0) or 1
+        )
+
+    # * Every engine DBForge creates gets the function on its connections
+    monkeypatch.setattr(
+        DBForge,
+        "_create_engine",
+        _with_connect_hook(DBForge._create_engine, register_sleep),
+    )
+    db_manager = DBForge(
+        config=DBConfig(
+            db_type="sqlite", driver_type="sync", database=str(path), schema_exclude=[]
+        )
+    )
+    model_forge = ModelForge(db_manager=db_manager, include_schemas=["main"])
+    with sqlite3.connect(path) as conn:  # * Now make it slow
+        conn.execute("DROP VIEW slow_view")
+        conn.execute(f"CREATE VIEW slow_view AS SELECT forge_sleep({SLOW_S}) AS x")
+
+    app = FastAPI()
+    forge = Forge(app=app, info=ForgeInfo(PROJECT_NAME="test"))
+    forge.gen_health_routes(model_forge)
+    forge.gen_view_routes(model_forge)
+    return app
+
+
+def _with_connect_hook(create_engine, hook):
+    def wrapper(self, *args, **kwargs):
+        engine = create_engine(self, *args, **kwargs)
+        event.listen(engine, "connect", hook)
+        return engine
+
+    return wrapper
+
+
+def test_slow_view_does_not_stall_ping(app):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            start = time.perf_counter()
+            slow = asyncio.create_task(client.get("/main/slow_view"))
+            await asyncio.sleep(0.2)  # * Let the slow query start
+
+            ping = await client.get("/health/ping")
+            ping_s = time.perf_counter() - start  # * A stalled loop makes it >= SLOW_S
+
+            response = await slow
+            slow_s = time.perf_counter() - start
+        return ping, ping_s, response, slow_s
+
+    ping, ping_s, response, slow_s = asyncio.run(scenario())
+
+    assert ping.status_code == 200 and ping.text == "pong"
+    assert response.status_code == 200 and response.json() == [{"x": 1}]
+    assert slow_s >= SLOW_S
+    assert ping_s < 0.2 + SLOW_S / 5, f"ping took {ping_s:.3f}s behind a {SLOW_S}s view"
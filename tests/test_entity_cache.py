@@ -0,0 +1,170 @@
+"""
+EntityCache: cached PK lookups, invalidated by committed writes (and channels).
+"""
+
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from forge import EntityCacheConfig, SocketChannel
+from forge.tools.entity_cache import EntityCache, cache_key
+
+
+@pytest.fixture
+def forged(make_forge, tmp_path):
+    forge, model_forge = make_forge(
+        entity_cache={"main.users": EntityCacheConfig(max_entries=2, ttl=0.5)},
+        cache_channel=SocketChannel(str(tmp_path / "channel")),
+    )
+    forge.gen_table_routes(model_forge)
+    return forge, model_forge
+
+
+@pytest.fixture
+def client(forged):
+    return TestClient(forged[0].app)
+
+
+@pytest.fixture
+def cache(forged):
+    return forged[1].entity_caches["main.users"]
+
+
+@pytest.fixture
+def statements(forged):
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.strip() != "SELECT 1":
+            executed.append(statement)
+
+    event.listen(forged[1].db_manager.engine, "before_cursor_execute", record)
+    return executed
+
+
+def test_repeated_lookups_are_served_from_the_cache(client, cache, statements):
+    assert client.get("/main/users/2").json()["email"] == "b@x"
+    queried = len(statements)
+
+    assert client.get("/main/users/2").json()["email"] == "b@x"
+    batch = client.post("/main/users/batch-get", json=[2, 1, 99]).json()
+    assert [u and u["id"] for u in batch] == [2, 1, None]
+    queried_batch = len(statements)
+    client.post("/main/users/batch-get", json=[2, 1])
+
+    assert queried == 1 and len(statements) == queried_batch
+    stats = cache.stats()
+    assert stats.hits >= 3 and stats.entries == 2 and stats.memory_bytes > 0
+
+
+def test_committed_writes_invalidate(client):
+    client.get("/main/users/2")
+
+    updated = client.put("/main/users?id=2", json={"email": "new@x"})
+    assert updated.status_code == 200, updated.text
+    assert client.get("/main/users/2").json()["email"] == "new@x"
+
+    client.delete("/main/users?id=2")
+    assert client.get("/main/users/2").status_code == 404
+
+
+def test_rolled_back_writes_do_not_invalidate(client, cache):
+    client.get("/main/users/2")
+    invalidations = cache.invalidations
+
+    failed = client.put("/main/users?id=2", json={"email": "a@x"})  # * Not unique
+
+    assert failed.status_code == 400
+    assert cache.invalidations == invalidations
+    assert client.get("/main/users/2").json()["email"] == "b@x"
+
+
+def test_entries_expire(client, statements):
+    client.get("/main/users/1")
+    time.sleep(0.6)
+    statements.clear()
+
+    client.get("/main/users/1")
+
+    assert statements
+
+
+def test_reads_started_before_an_invalidation_are_not_cached(cache):
+    generation = cache.generation()
+    cache.invalidate([])
+
+    cache.put("key", "stale", generation)
+
+    assert cache.get("key") is None
+
+
+def test_other_workers_are_told_through_the_channel(client, tmp_path):
+    other = SocketChannel(str(tmp_path / "channel"))
+    other_cache = EntityCache("main.users")
+    other.register(other_cache)
+    other.start()
+    other_cache.put(cache_key((2,)), "stale", other_cache.generation())
+
+    client.put("/main/users?id=2", json={"email": "new@x"})
+
+    for _ in range(100):
+        if other_cache.get(cache_key((2,))) is None:
+            break
+        time.sleep(0.01)
+    assert other_cache.get(cache_key((2,))) is None
+
+
+def _listening_cache(directory):
+    channel = SocketChannel(str(directory))
+    cache = EntityCache("main.t")
+    channel.register(cache)
+    channel.start()
+    keys = [cache_key((i,)) for i in range(5000)]
+    for key in keys:
+        cache.put(key, "value", cache.generation())
+    return cache, keys
+
+
+def _wait_empty(cache) -> bool:
+    for _ in range(100):
+        if not cache.stats().entries:
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_socket_channel_sends_large_invalidations_in_chunks(tmp_path):
+    sender = SocketChannel(str(tmp_path))
+    cache, keys = _listening_cache(tmp_path)
+
+    sender.publish([("main.t", keys)])
+
+    assert _wait_empty(cache)
+
+
+def test_socket_channel_clears_the_table_when_a_send_fails(tmp_path):
+    sender = SocketChannel(str(tmp_path))
+    cache, keys = _listening_cache(tmp_path)
+    real_socket, sent = sender._socket, []
+
+    class KeysTooLong:
+        def sendto(self, payload, peer):
+            sent.append(json.loads(payload))
+            if sent[-1][1] is not None:
+                raise OSError("Message too long")
+            return real_socket.sendto(payload, peer)
+
+    sender._socket = KeysTooLong()
+    sender.publish([("main.t", keys[:3])])
+
+    assert _wait_empty(cache)
+    assert sent == [["main.t", keys[:3]], ["main.t", None]]
+
+
+def test_cache_keys_follow_the_column_type(forged):
+    crud = forged[0].table_handlers["main.users"]
+
+    assert crud._pk_key(("7",)) == crud._pk_key((7,))
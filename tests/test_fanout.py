@@ -0,0 +1,88 @@
+"""
+`/fanout`: calls run concurrently (up to `max_concurrency`), errors stay per call.
+"""
+
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+NAP_S = 0.3  # * Run time of the `nap` view
+
+
+@pytest.fixture
+def make_client(db_path, make_forge, sleep_fn):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE VIEW nap AS SELECT forge_sleep({NAP_S}) AS x")
+
+    def make(**fanout_options) -> TestClient:
+        forge, model_forge = make_forge()
+        forge.gen_view_routes(model_forge)
+        forge.gen_fanout_routes(model_forge, **fanout_options)
+        return TestClient(forge.app)
+
+    return make
+
+
+def _naps(count: int) -> list:
+    return [
+        {"name": f"nap{i}", "kind": "view", "target": "main.nap"} for i in range(count)
+    ]
+
+
+def _timed_post(client: TestClient, calls: list):
+    start = time.perf_counter()
+    response = client.post("/fanout", json=calls)
+    return response, time.perf_counter() - start
+
+
+def test_calls_run_concurrently_and_report_their_own_errors(make_client):
+    client = make_client()
+    calls = _naps(3) + [
+        {
+            "name": "orders",
+            "kind": "view",
+            "target": "main.user_orders",
+            "params": {"uid": 2},
+        },
+        {"name": "missing", "kind": "fn", "target": "main.nope"},
+    ]
+
+    response, elapsed = _timed_post(client, calls)
+
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert results["nap0"]["result"] == [{"x": 1}]
+    assert results["orders"]["result"] == [{"uid": 2, "name": "B", "total": 5}]
+    assert results["missing"]["result"] is None
+    assert results["missing"]["error"] == "Unknown fn 'main.nope'"
+    assert elapsed < 2 * NAP_S
+
+
+def test_max_concurrency_bounds_the_calls_running_at_once(make_client):
+    client = make_client(max_concurrency=1)
+
+    response, elapsed = _timed_post(client, _naps(3))
+
+    assert response.status_code == 200, response.text
+    assert elapsed >= 3 * NAP_S
+
+
+def test_requests_over_max_calls_or_with_repeated_names_are_rejected(make_client):
+    client = make_client(max_calls=2)
+
+    too_many = client.post("/fanout", json=_naps(3))
+    repeated = client.post("/fanout", json=_naps(1) * 2)
+
+    assert too_many.status_code == 400
+    assert too_many.json()["detail"] == "Too many calls (max 2)"
+    assert repeated.status_code == 400
+
+
+def test_the_route_serves_several_event_loops(make_client):
+    client = make_client(max_concurrency=1)
+
+    for other in (client, TestClient(client.app), TestClient(client.app)):
+        response = other.post("/fanout", json=_naps(2))
+        assert response.status_code == 200, response.text
@@ -0,0 +1,124 @@
+"""
+Function batches: one unnest statement per batch, results in input order.
+
+SQLite has no unnest: `json_each` over the bound arrays stands in for it.
+"""
+
+import json
+import sqlite3
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import create_model
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from forge.gen.fn import (
+    FunctionBase,
+    FunctionMetadata,
+    FunctionParameter,
+    FunctionType,
+    FunctionVolatility,
+    ObjectType,
+    SecurityType,
+    _execute_fn_batch,
+    create_fn_models,
+    fn_batch_statement,
+    gen_fn_route,
+)
+
+PRICE = FunctionMetadata(
+    schema="app",
+    name="price",
+    return_type="numeric",
+    parameters=[
+        FunctionParameter(name="qty", type="integer"),
+        FunctionParameter(name="sku", type="text"),
+    ],
+    type=FunctionType.SCALAR,
+    object_type=ObjectType.FUNCTION,
+    volatility=FunctionVolatility.STABLE,
+    security_type=SecurityType.INVOKER,
+    is_strict=False,
+)
+
+# * (ordinality, result) rows of `qty * 10`, out of input order
+UNNEST = text(
+    "SELECT CAST(key AS INTEGER) + 1 AS forge_ord, value * 10 AS f "
+    "FROM json_each(:qty) ORDER BY key DESC"
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # * Arrays are bound as JSON for json_each
+    monkeypatch.setitem(sqlite3.adapters, (list, sqlite3.PrepareProtocol), json.dumps)
+    with Session(create_engine("sqlite://")) as session:
+        yield session
+
+
+@pytest.fixture
+def inputs():
+    In, _, _ = create_fn_models(PRICE)
+    return [In(qty=qty, sku="x") for qty in (1, 2, 3)]
+
+
+def test_batch_statement_unnests_every_parameter():
+    statement = str(fn_batch_statement(PRICE))
+
+    assert "unnest(CAST(:qty AS integer[]), CAST(:sku AS text[]))" in statement
+    assert "WITH ORDINALITY" in statement and "app.price(" in statement
+    assert "tenant_a.price(" in str(fn_batch_statement(PRICE, "tenant_a"))
+
+
+def test_array_parameters_have_no_batch_statement():
+    ids = PRICE.model_copy(
+        update={"parameters": [FunctionParameter(name="ids", type="integer[]")]}
+    )
+    no_params = PRICE.model_copy(update={"parameters": []})
+
+    assert fn_batch_statement(ids) is None
+    assert fn_batch_statement(no_params) is None
+
+
+def test_scalar_results_follow_the_input_order(db, inputs):
+    _, Out, _ = create_fn_models(PRICE)
+
+    results = _execute_fn_batch(db, UNNEST, None, inputs, Out, is_scalar=True)
+
+    assert [out.result for out in results] == [10, 20, 30]
+
+
+def test_set_results_are_grouped_per_input(db, inputs):
+    Out = create_model("Out", __base__=FunctionBase, v=(int, ...))
+    statement = text(
+        "SELECT CAST(key AS INTEGER) + 1 AS forge_ord, value AS v FROM json_each(:qty) "
+        "WHERE value != 2 UNION ALL SELECT 1, 99"
+    )
+
+    results = _execute_fn_batch(db, statement, None, inputs, Out, is_set=True)
+
+    assert [[out.v for out in rows] for rows in results] == [[1, 99], [], [3]]
+
+
+def test_without_a_batch_statement_each_input_is_called(db, inputs):
+    _, Out, _ = create_fn_models(PRICE)
+    fallback = text("SELECT :qty * 2 AS r")
+
+    results = _execute_fn_batch(db, None, fallback, inputs, Out, is_scalar=True)
+
+    assert [out.result for out in results] == [2, 4, 6]
+
+
+def test_batch_route_input_limit():
+    router = APIRouter()
+    gen_fn_route(PRICE, router, lambda: None)
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/fn/price/batch", json=[{"qty": 1, "sku": "x"}] * 10_001
+    )
+
+    assert response.status_code == 400
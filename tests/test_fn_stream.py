@@ -0,0 +1,113 @@
+"""
+Streamed set-returning functions: rows sent as they are read, then the session closed.
+"""
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import create_model
+from sqlalchemy import text
+
+import forge.gen.fn as fn
+from forge.gen.fn import (
+    FunctionBase,
+    FunctionMetadata,
+    FunctionParameter,
+    FunctionType,
+    FunctionVolatility,
+    ObjectType,
+    SecurityType,
+    _stream_fn,
+    fn_statement,
+    gen_fn_route,
+)
+
+USERS = text(
+    "SELECT id, email FROM users ORDER BY id LIMIT :forge_limit OFFSET :forge_offset"
+)
+
+Out = create_model("Out", __base__=FunctionBase, id=(int, ...), email=(str, ...))
+
+REPORT = FunctionMetadata(
+    schema="app",
+    name="report",
+    return_type="TABLE(id integer, email text)",
+    parameters=[FunctionParameter(name="since", type="integer")],
+    type=FunctionType.TABLE,
+    object_type=ObjectType.FUNCTION,
+    volatility=FunctionVolatility.STABLE,
+    security_type=SecurityType.INVOKER,
+    is_strict=False,
+)
+
+
+@pytest.fixture(params=["sync", "async"])
+def db_manager(request, make_db):
+    return make_db(driver_type=request.param)
+
+
+@pytest.fixture
+def client(db_manager):
+    app = FastAPI()
+
+    @app.get("/users")
+    async def users(limit: int = -1, offset: int = 0):
+        return await _stream_fn(
+            db_manager.open_session(read=True),
+            USERS,
+            {"forge_limit": limit, "forge_offset": offset},
+            Out,
+        )
+
+    @app.get("/broken")
+    async def broken():
+        return await _stream_fn(
+            db_manager.open_session(read=True), text("SELECT nope FROM users"), {}, Out
+        )
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def _checked_out(db_manager) -> int:
+    if db_manager.is_async:
+        return db_manager.async_engine.sync_engine.pool.checkedout()
+    return db_manager.engine.pool.checkedout()
+
+
+def _ids(response) -> list:
+    assert response.status_code == 200, response.text
+    return [user["id"] for user in response.json()]
+
+
+def test_rows_are_streamed_as_a_json_array(client, db_manager):
+    assert _ids(client.get("/users")) == [1, 2]
+    assert _ids(client.get("/users?limit=1&offset=1")) == [2]
+    assert _ids(client.get("/users?offset=5")) == []
+    assert _checked_out(db_manager) == 0
+
+
+def test_rows_are_read_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(fn, "STREAM_CHUNK_ROWS", 1)
+
+    assert _ids(client.get("/users")) == [1, 2]
+
+
+def test_statement_errors_fail_before_the_response_starts(client, db_manager):
+    assert client.get("/broken").status_code == 500
+    assert _checked_out(db_manager) == 0
+
+
+def test_set_function_routes_take_paging_and_stream(db_manager):
+    router = APIRouter()
+    gen_fn_route(
+        REPORT, router, db_manager.read_dependency, open_session=db_manager.open_session
+    )
+    app = FastAPI()
+    app.include_router(router)
+
+    operation = app.openapi()["paths"]["/fn/report"]["post"]
+
+    assert {p["name"] for p in operation["parameters"]} == {"limit", "offset", "stream"}
+    assert str(fn_statement(REPORT, paged=True)).endswith(
+        "LIMIT :forge_limit OFFSET :forge_offset"
+    )
@@ -0,0 +1,145 @@
+"""
+Background procedure jobs: concurrency limits, lifecycle and the `/jobs` routes.
+"""
+
+import functools
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from forge import JobConfig
+from forge.gen.fn import (
+    FunctionMetadata,
+    FunctionParameter,
+    FunctionType,
+    FunctionVolatility,
+    ObjectType,
+    SecurityType,
+    gen_fn_route,
+)
+from forge.gen.jobs import gen_job_routes
+from forge.tools.db import PoolConfig
+from forge.tools.jobs import JobQueue, JobState
+
+# * Counts to :n (several seconds for 50M, interruptible)
+COUNT = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < :n) "
+    "SELECT count(*) FROM c"
+)
+SLOW, QUICK = {"n": 50_000_000}, {"n": 10}
+
+# * SQLite has no procedures: its jobs fail
+NIGHTLY = FunctionMetadata(
+    schema="main",
+    name="nightly",
+    return_type="void",
+    parameters=[FunctionParameter(name="d", type="integer")],
+    type=FunctionType.SCALAR,
+    object_type=ObjectType.PROCEDURE,
+    volatility=FunctionVolatility.VOLATILE,
+    security_type=SecurityType.INVOKER,
+    is_strict=False,
+)
+
+
+@pytest.fixture
+def make_queue(make_db):
+    db_manager = make_db()
+    queues = []
+
+    def make(**config) -> JobQueue:
+        factory = db_manager.background_sessionmaker(
+            "jobs", PoolConfig(pool_size=2, max_overflow=0), autocommit=True
+        )
+        queue = JobQueue(
+            functools.partial(db_manager.new_session, factory), JobConfig(**config)
+        )
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        for job in list(queue.jobs.values()):
+            queue.cancel(job.id)
+        queue._executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def make_client(make_db):
+    def make(queue: JobQueue) -> TestClient:
+        router = APIRouter()
+        gen_job_routes(router, queue)
+        gen_fn_route(NIGHTLY, router, make_db().db_dependency, job_queue=queue)
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    return make
+
+
+def _wait(job, state: JobState, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while job.state != state:
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_jobs_of_a_procedure_wait_for_its_limit(make_queue):
+    queue = make_queue(workers=2, per_procedure=1)
+
+    slow = queue.submit("a", COUNT, SLOW)
+    waiting = queue.submit("a", COUNT, QUICK)
+    other = queue.submit("b", COUNT, QUICK)
+
+    assert _wait(other, JobState.SUCCEEDED)
+    assert slow.state == JobState.RUNNING and waiting.state == JobState.QUEUED
+
+    assert queue.cancel(slow.id) is slow
+    assert _wait(slow, JobState.CANCELLED) and slow.error == "Cancelled"
+    assert _wait(waiting, JobState.SUCCEEDED)
+    assert queue.counts()["succeeded"] == 2
+
+
+def test_queued_jobs_are_dropped_when_cancelled(make_queue):
+    queue = make_queue(workers=1)
+    queue.submit("a", COUNT, SLOW)
+    queued = queue.submit("a", COUNT, QUICK)
+
+    queue.cancel(queued.id)
+
+    assert queued.state == JobState.CANCELLED
+    assert not queue._pending
+    assert queue.cancel("nope") is None
+
+
+def test_job_routes(make_queue, make_client):
+    client = make_client(make_queue())
+
+    submitted = client.post("/proc/nightly/jobs", json={"d": 1})
+
+    assert submitted.status_code == 202, submitted.text
+    job_id = submitted.json()["id"]
+    for _ in range(300):
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["state"] == "failed":
+            break
+        time.sleep(0.01)
+    assert status["state"] == "failed" and status["error"]
+    assert [j["id"] for j in client.get("/jobs?state=failed").json()] == [job_id]
+    assert client.get("/jobs/stats").json()["failed"] == 1
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+
+
+def test_full_queue_is_503(make_queue, make_client):
+    queue = make_queue(workers=1, max_queued=1)
+    client = make_client(queue)
+    queue.submit("a", COUNT, SLOW)
+    queue.submit("a", COUNT, QUICK)  # * Waits for the first one
+
+    assert client.post("/proc/nightly/jobs", json={"d": 1}).status_code == 503
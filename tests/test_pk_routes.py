@@ -0,0 +1,76 @@
+"""
+Primary key routes: `GET /{table}/{pk}` and `POST /{table}/batch-get`.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import forge.gen as gen
+
+
+@pytest.fixture
+def forged(make_forge):
+    forge, model_forge = make_forge()
+    forge.gen_table_routes(model_forge)
+    return forge, model_forge
+
+
+@pytest.fixture
+def client(forged):
+    return TestClient(forged[0].app)
+
+
+@pytest.fixture
+def statements(forged):
+    """SQL statements run from here on (besides pings)."""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.strip() != "SELECT 1":
+            executed.append(statement)
+
+    event.listen(forged[1].db_manager.engine, "before_cursor_execute", record)
+    return executed
+
+
+def test_get_by_primary_key(client):
+    assert client.get("/main/users/2").json()["email"] == "b@x"
+    assert client.get("/main/pairs/1/2").json()["v"] == "y"
+
+
+def test_missing_key_is_404_and_malformed_key_is_422(client):
+    assert client.get("/main/users/99").status_code == 404
+    assert client.get("/main/users/abc").status_code == 422
+
+
+def test_batch_get_keeps_order_duplicates_and_gaps(client, statements):
+    response = client.post("/main/users/batch-get", json=[2, 99, 1, 2])
+
+    assert response.status_code == 200, response.text
+    assert [u and u["id"] for u in response.json()] == [2, None, 1, 2]
+    assert len(statements) == 1
+
+
+def test_batch_get_composite_keys(client):
+    response = client.post(
+        "/main/pairs/batch-get",
+        json=[{"a": 1, "b": 2}, {"a": 9, "b": 9}, {"a": 1, "b": 1}],
+    )
+
+    assert [p and p["v"] for p in response.json()] == ["y", None, "x"]
+
+
+def test_batch_get_queries_distinct_keys_in_chunks(client, statements, monkeypatch):
+    monkeypatch.setattr(gen, "IN_CHUNK_SIZE", 2)
+
+    response = client.post("/main/users/batch-get", json=[1, 2, 3, 1, 2])
+
+    assert [u and u["id"] for u in response.json()] == [1, 2, None, 1, 2]
+    assert len(statements) == 2
+
+
+def test_batch_get_key_limit(client):
+    response = client.post("/main/users/batch-get", json=list(range(10_001)))
+
+    assert response.status_code == 400
@@ -0,0 +1,96 @@
+"""
+List options of the table and view routes: `fields`, `order_by`, `limit`, `offset`.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def forged(make_forge):
+    forge, model_forge = make_forge()
+    forge.gen_table_routes(model_forge)
+    forge.gen_view_routes(model_forge)
+    return forge, model_forge
+
+
+@pytest.fixture
+def client(forged):
+    return TestClient(forged[0].app)
+
+
+def _get(client, path: str, **params) -> list:
+    response = client.get(path, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_fields_trim_the_rows_and_keep_nulls(client):
+    client.post("/main/users", json={"id": 3, "email": "c@x"})
+
+    assert _get(client, "/main/orders", fields="id") == [
+        {"id": 1},
+        {"id": 2},
+        {"id": 3},
+    ]
+    assert _get(client, "/main/users", fields="id,name", id=3) == [
+        {"id": 3, "name": None}
+    ]
+
+
+def test_tables_page_in_primary_key_order(client):
+    assert [o["id"] for o in _get(client, "/main/orders", limit=2)] == [1, 2]
+    assert [o["id"] for o in _get(client, "/main/orders", offset=2)] == [3]
+
+
+def test_order_by_descending_with_filters(client):
+    orders = _get(client, "/main/orders", order_by="-total", user_id=1)
+
+    assert [o["id"] for o in orders] == [2, 1]
+
+
+def test_view_options(client):
+    assert _get(client, "/main/user_orders", fields="name,total", order_by="total") == [
+        {"name": "B", "total": 5},
+        {"name": "A", "total": 10},
+        {"name": "A", "total": 20},
+    ]
+    totals = _get(client, "/main/user_orders", order_by="-total", limit=2)
+    assert [o["total"] for o in totals] == [20, 10]
+    totals = _get(client, "/main/user_orders", order_by="total", limit=1, offset=1)
+    assert [o["total"] for o in totals] == [10]
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/main/orders", {"fields": "nope"}),
+        ("/main/orders", {"order_by": "-nope"}),
+        ("/main/user_orders", {"fields": "id,nope"}),
+        ("/main/user_orders", {"order_by": "nope"}),
+    ],
+)
+def test_unknown_columns_are_400(client, path, params):
+    assert client.get(path, params=params).status_code == 400
+
+
+def test_statements_are_reused_across_values(forged):
+    query_builder = forged[0].table_handlers["main.orders"].query_builder
+
+    first, _ = query_builder.build({"user_id": 1}, {"limit": 5})
+    second, params = query_builder.build({"user_id": 2}, {"limit": 9})
+
+    assert first is second
+    assert params == {"param_user_id": 2, "forge_limit": 9}
+
+
+def test_openapi_documents_trimmed_rows(forged):
+    operation = forged[0].app.openapi()["paths"]["/main/orders"]["get"]
+    items = operation["responses"]["200"]["content"]["application/json"]["schema"][
+        "items"
+    ]
+
+    assert any(ref["$ref"].endswith("Fields") for ref in items["anyOf"])
+    assert {"fields", "order_by", "limit", "offset"} <= {
+        p["name"] for p in operation["parameters"]
+    }
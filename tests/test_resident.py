@@ -0,0 +1,107 @@
+"""
+Resident tables: list reads served from memory, dropped on writes and reloaded.
+"""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+
+from forge import ResidentConfig
+
+MARKER = "SELECT count(*) FROM users"
+
+
+@pytest.fixture
+def make_forged(make_forge):
+    def make(**resident_options):
+        config = ResidentConfig(check_interval=0.1, marker=MARKER, **resident_options)
+        forge, model_forge = make_forge(resident={"main.users": config})
+        forge.gen_table_routes(model_forge)
+        return forge, model_forge
+
+    return make
+
+
+@pytest.fixture
+def forged(make_forged):
+    return make_forged()
+
+
+@pytest.fixture
+def client(forged):
+    return TestClient(forged[0].app)
+
+
+@pytest.fixture
+def resident(forged):
+    resident = forged[0].table_handlers["main.users"].resident
+    assert _wait(lambda: resident.serving)
+    return resident
+
+
+@pytest.fixture
+def statements(forged):
+    """SQL statements run from here on (besides pings and the marker)."""
+    executed = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.strip() not in ("SELECT 1", MARKER):
+            executed.append(statement)
+
+    event.listen(forged[1].db_manager.engine, "before_cursor_execute", record)
+    return executed
+
+
+def _wait(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def _ids(response) -> list:
+    assert response.status_code == 200, response.text
+    return [user["id"] for user in response.json()]
+
+
+def test_reads_are_served_from_memory(client, resident, statements):
+    assert _ids(client.get("/main/users")) == [1, 2]
+    assert _ids(client.get("/main/users?email=b@x")) == [2]
+    assert _ids(client.get("/main/users?email=b@x&id=1")) == []
+    assert _ids(client.get("/main/users?name=A&id=1")) == [1]
+    assert not statements
+
+
+def test_reads_with_options_go_to_the_database(client, resident, statements):
+    assert _ids(client.get("/main/users?limit=1")) == [1]
+    assert statements
+
+
+def test_writes_stop_serving_until_reloaded(client, resident):
+    created = client.post("/main/users", json={"id": 3, "email": "c@x"})
+    assert created.status_code == 200, created.text
+
+    assert _ids(client.get("/main/users")) == [1, 2, 3]  # * From the database
+    assert _wait(lambda: resident.serving)
+    assert _ids(client.get("/main/users?id=3")) == [3]
+
+
+def test_outside_writes_are_picked_up_by_the_marker(client, forged, resident):
+    with forged[1].db_manager.engine.begin() as conn:
+        conn.execute(text("INSERT INTO users VALUES (4, 'd@x', 'D')"))
+
+    assert _wait(lambda: 4 in _ids(client.get("/main/users?id=4")))
+
+
+def test_tables_over_max_rows_stay_in_the_database(make_forged):
+    forge, _ = make_forged(max_rows=1)
+    resident = forge.table_handlers["main.users"].resident
+
+    time.sleep(0.3)
+
+    assert not resident.serving
+    assert _ids(TestClient(forge.app).get("/main/users")) == [1, 2]
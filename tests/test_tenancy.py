@@ -0,0 +1,122 @@
+"""
+Tenant routing: requests run in the tenant's schema (SQLite: attached databases).
+"""
+
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+import forge.tools.db as db_module
+from forge import DBForge, TenancyConfig
+
+TENANTS = ("tenant_a", "tenant_b")
+
+
+@pytest.fixture
+def attached(make_database, monkeypatch):
+    """Every DBForge engine attaches one database per tenant (as its schemas)."""
+    paths = {tenant: make_database(tenant) for tenant in TENANTS}
+    for tenant, path in paths.items():
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE users SET name = ?", (tenant,))
+
+    def attach(dbapi_connection, _):
+        for tenant, path in paths.items():
+            dbapi_connection.execute(f"ATTACH DATABASE '{path}' AS {tenant}")
+
+    create_engine = DBForge._create_engine
+
+    def with_tenants(self, *args, **kwargs):
+        engine = create_engine(self, *args, **kwargs)
+        event.listen(engine, "connect", attach)
+        return engine
+
+    monkeypatch.setattr(DBForge, "_create_engine", with_tenants)
+    return paths
+
+
+@pytest.fixture
+def make_client(make_forge, attached):
+    def make(**tenancy_options) -> TestClient:
+        tenancy = TenancyConfig(
+            template_schema="main", tenant_pattern=r"tenant_\w+", **tenancy_options
+        )
+        forge, model_forge = make_forge(db_config={"tenancy": tenancy})
+        forge.gen_table_routes(model_forge)
+        forge.gen_view_routes(model_forge)
+        return TestClient(forge.app)
+
+    return make
+
+
+def _names(response) -> list:
+    assert response.status_code == 200, response.text
+    return sorted({user["name"] for user in response.json()})
+
+
+def test_header_selects_the_tenant_schema(make_client):
+    client = make_client()
+
+    assert _names(client.get("/main/users")) == ["A", "B"]
+    assert _names(client.get("/main/users", headers={"X-Tenant": "tenant_a"})) == [
+        "tenant_a"
+    ]
+    assert _names(client.get("/main/users", headers={"X-Tenant": "tenant_b"})) == [
+        "tenant_b"
+    ]
+    orders = client.get("/main/user_orders", headers={"X-Tenant": "tenant_a"})
+    assert {order["name"] for order in orders.json()} == {"tenant_a"}
+
+
+def test_unknown_tenants_and_the_template_are_rejected(make_client):
+    client = make_client()
+
+    assert client.get("/main/users", headers={"X-Tenant": "tenant_zz"}).status_code == (
+        404
+    )
+    assert client.get("/main/users", headers={"X-Tenant": "main"}).status_code == 404
+
+
+def test_path_prefix_selects_the_tenant_and_writes_go_there(make_client, attached):
+    client = make_client(path=True)
+
+    created = client.post(
+        "/tenant_a/users", json={"id": 9, "email": "z@x", "name": "Z"}
+    )
+
+    assert created.status_code == 200, created.text
+    assert _names(client.get("/tenant_b/users")) == ["tenant_b"]
+    assert client.get("/nope/users").status_code == 404
+    with sqlite3.connect(attached["tenant_a"]) as conn:
+        assert conn.execute("SELECT name FROM users WHERE id = 9").fetchall() == [
+            ("Z",)
+        ]
+    assert 9 not in {user["id"] for user in client.get("/main/users").json()}
+
+
+def test_new_schemas_are_found_without_blocking(make_db, attached, monkeypatch):
+    db_manager = make_db(
+        tenancy=TenancyConfig(template_schema="main", tenant_pattern=r"tenant_\w+")
+    )
+    assert db_manager.is_tenant("tenant_a")
+
+    class SlowInspector:
+        def get_schema_names(self):
+            time.sleep(0.3)
+            return ["main", "tenant_a", "tenant_new"]
+
+    monkeypatch.setattr(db_module, "inspect", lambda engine: SlowInspector())
+    db_manager._schemas = (0.0, db_manager._schemas[1])  # * Due for a refresh
+
+    start = time.perf_counter()
+    assert not db_manager.is_tenant("tenant_new")  # * Refreshing in the background
+    assert time.perf_counter() - start < 0.1
+
+    for _ in range(100):
+        if db_manager.is_tenant("tenant_new"):
+            break
+        time.sleep(0.01)
+    assert db_manager.is_tenant("tenant_new")
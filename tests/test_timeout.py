@@ -0,0 +1,169 @@
+"""
+Statement timeouts (SQLite interrupt timers) and `CancelOnDisconnect`.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import forge.gen.view as view
+from forge.tools.timeout import CancelOnDisconnect, _timeout_sqlite
+
+# * Several seconds of work on SQLite (interruptible, unlike a Python function)
+SPIN = (
+    "WITH RECURSIVE r(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM r "
+    "WHERE x < 50000000) SELECT count(*) AS n FROM r"
+)
+
+
+def _no_session():
+    raise RuntimeError("not sampled")
+
+
+@pytest.fixture
+def spin_view(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE VIEW spin AS {SPIN}")
+
+
+@pytest.fixture
+def make_app(make_forge, spin_view, monkeypatch):
+    # * Route generation samples every view: skip the slow one
+    create_view_model = view.create_view_model
+
+    def no_sample(table, schema, db_dependency):
+        if table.name == "spin":
+            return create_view_model(table, schema, _no_session)
+        return create_view_model(table, schema, db_dependency)
+
+    monkeypatch.setattr(view, "create_view_model", no_sample)
+
+    def make(**forge_options):
+        forge, model_forge = make_forge(
+            db_config={"statement_timeout": 0.2}, forge_options=forge_options
+        )
+        forge.gen_view_routes(model_forge)
+        return forge.app
+
+    return make
+
+
+def test_slow_statement_times_out(make_app):
+    client = TestClient(make_app())
+
+    start = time.perf_counter()
+    response = client.get("/main/spin")
+
+    assert response.status_code == 504
+    assert response.json()["detail"]["timeout_s"] == 0.2
+    assert time.perf_counter() - start < 2
+    assert client.get("/main/user_orders").status_code == 200
+
+
+def test_route_timeout_overrides_the_default(make_app):
+    client = TestClient(make_app(statement_timeouts={"/main/spin": 0.5}))
+
+    response = client.get("/main/spin")
+
+    assert response.status_code == 504
+    assert response.json()["detail"]["timeout_s"] == 0.5
+
+
+def test_client_disconnect_cancels_the_query(make_app):
+    app = make_app(statement_timeouts={"/main/spin": 60})
+    messages = []
+
+    async def receive():
+        if not messages:
+            messages.append("request")
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(0.3)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message["type"])
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/main/spin",
+        "raw_path": b"/main/spin",
+        "query_string": b"",
+        "headers": [],
+    }
+    start = time.perf_counter()
+    asyncio.run(app(scope, receive, send))
+
+    assert time.perf_counter() - start < 3
+    assert "http.response.start" not in messages  # * Nobody left to answer
+
+
+def test_timer_is_disarmed_before_checkin(make_db):
+    db_manager = make_db(statement_timeout=5)
+
+    with db_manager.SessionLocal() as session:
+        session.execute(text("SELECT 1"))
+        info, timer = session.info["forge_timer"]
+        assert info["forge_timer"] is timer
+        session.commit()
+
+    assert "forge_timer" not in info
+    assert not timer.is_alive()
+
+
+def test_stale_timer_does_not_interrupt_the_next_user(make_db):
+    db_manager = make_db(statement_timeout=5)
+
+    with db_manager.SessionLocal() as session:
+        connection = session.connection()
+        stale = threading.Thread(
+            target=_timeout_sqlite, args=(connection, connection.info)
+        )
+        stale.start()
+        stale.join()
+
+        assert "forge_interrupt" not in connection.info
+        assert session.execute(text("SELECT 1")).scalar() == 1
+
+
+def test_request_body_is_read_as_the_app_consumes_it():
+    chunks = 50
+    received = []
+
+    async def app(scope, receive, send):
+        while True:
+            await asyncio.sleep(0.01)  # * A slow consumer
+            if not (await receive()).get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        received.append(len(received))
+        if len(received) > chunks:
+            await asyncio.sleep(10)  # * No disconnect
+        return {
+            "type": "http.request",
+            "body": b"x",
+            "more_body": len(received) < chunks,
+        }
+
+    async def send(message):
+        pass
+
+    async def scenario():
+        task = asyncio.ensure_future(
+            CancelOnDisconnect(app)({"type": "http", "path": "/"}, receive, send)
+        )
+        await asyncio.sleep(0.05)
+        read_ahead = len(received)
+        await task
+        return read_ahead
+
+    assert asyncio.run(scenario()) < 10
+    assert len(received) >= chunks
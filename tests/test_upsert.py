@@ -0,0 +1,70 @@
+"""
+Bulk upsert (`POST /{table}/upsert`): conflict targets, repeated keys and order.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(make_forge):
+    forge, model_forge = make_forge()
+    forge.gen_table_routes(model_forge)
+    return TestClient(forge.app)
+
+
+def test_updates_existing_and_inserts_new_rows_in_input_order(client):
+    response = client.post(
+        "/main/users/upsert",
+        json=[
+            {"id": 5, "email": "e@x", "name": "E"},
+            {"id": 1, "email": "a2@x", "name": "A2"},
+        ],
+    )
+
+    assert response.status_code == 200, response.text
+    assert [(u["id"], u["email"]) for u in response.json()] == [
+        (5, "e@x"),
+        (1, "a2@x"),
+    ]
+    users = {u["id"]: u["email"] for u in client.get("/main/users").json()}
+    assert users == {1: "a2@x", 2: "b@x", 5: "e@x"}
+
+
+def test_conflict_target_falls_back_to_a_unique_constraint(client):
+    # * No primary key in the record: resolved on the unique email
+    response = client.post("/main/users/upsert", json=[{"email": "b@x", "name": "B2"}])
+
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"id": 2, "email": "b@x", "name": "B2"}]
+
+
+def test_composite_primary_key(client):
+    response = client.post(
+        "/main/pairs/upsert?chunk_size=1",
+        json=[{"a": 1, "b": 2, "v": "z"}, {"a": 9, "b": 9}],
+    )
+
+    assert response.status_code == 200, response.text
+    assert [p["v"] for p in response.json()] == ["z", None]
+
+
+def test_repeated_keys_last_one_wins(client):
+    response = client.post(
+        "/main/users/upsert",
+        json=[
+            {"id": 2, "email": "b2@x"},
+            {"id": 5, "email": "e@x", "name": "E"},
+            {"id": 2, "email": "b3@x"},
+        ],
+    )
+
+    assert response.status_code == 200, response.text
+    assert [u["email"] for u in response.json()] == ["b3@x", "e@x", "b3@x"]
+
+
+def test_record_without_a_conflict_target_is_rejected(client):
+    response = client.post("/main/orders/upsert", json=[{"user_id": 1, "total": 1}])
+
+    assert response.status_code == 400
+    assert client.get("/main/orders").json()[-1]["id"] == 3  # * Nothing written